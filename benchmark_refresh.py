@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+刷新性能测试脚本
+在临时数据库中生成大量目标和任务，测量主窗口刷新实际使用的数据缓存路径
+（首次整表加载、之后的内存筛选排序），以及 v1 刷新查询索引对按状态查询的收益和对写入的开销
+
+有索引和无索引两种情况修改相同的行，先各预热一轮，之后多轮交替测量并取中位数，
+避免先后顺序、缓存冷热和随机选行带来的偏差
+"""
+
+import os
+import sys
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(__file__))
+
+from src.utils.config import GOAL_CONFIG, DAILY_TASK_CONFIG
+from src.utils.database import open_database_manager, close_database_manager
+from src.utils.data_cache import DataCache
+from src.utils.data_manager import is_active_goal, is_active_daily_task, goals_order_key, daily_tasks_order_key
+from src.utils.migrations import V1_TABLES, V1_INDEXES
+
+ROW_COUNT = 100000
+REPEAT = 20
+UPDATE_COUNT = 2000
+ROUNDS = 5
+SEED = 1
+ACTIVE_RATIO = 0.02  # 长期使用后绝大多数目标/任务为已完成的历史数据
+
+# v1 为按状态查询未完成目标/任务创建的部分覆盖索引
+REFRESH_INDEXES = ["idx_goals_active_type_priority", "idx_daily_tasks_active_created"]
+
+# 与上面两个索引对应的按状态查询
+ACTIVE_QUERIES = (
+    ("未完成目标", """
+        SELECT id, title, description, status, priority, created_at FROM goals
+        WHERE goal_type = ? AND status != '已完成'
+        ORDER BY priority, created_at DESC
+    """, (GOAL_CONFIG["goal_types"][0],)),
+    ("未完成任务", """
+        SELECT id, title, description, status, priority, experience_reward, created_at FROM daily_tasks
+        WHERE status != '已完成'
+        ORDER BY created_at DESC
+    """, ()),
+)
+
+
+def populate(db_path, row_count):
+    """创建无索引的旧版数据库并写入测试数据"""
+    connection = sqlite3.connect(db_path)
+    for create_sql in V1_TABLES.values():
+        connection.execute(create_sql)
+
+    random.seed(42)
+    start = datetime(2020, 1, 1)
+
+    def status(options, completed):
+        return completed if random.random() > ACTIVE_RATIO else random.choice([o for o in options if o != completed])
+
+    def created_at(i):
+        return (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S")
+
+    connection.executemany(
+        "INSERT INTO goals (title, goal_type, description, status, priority, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ((f"目标{i}", random.choice(GOAL_CONFIG["goal_types"]), f"描述{i}",
+          status(GOAL_CONFIG["status_options"], "已完成"), random.choice(GOAL_CONFIG["priority_levels"]),
+          created_at(i), created_at(i)) for i in range(row_count))
+    )
+    connection.executemany(
+        "INSERT INTO daily_tasks (title, description, priority, status, experience_reward, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ((f"任务{i}", f"描述{i}", random.choice(DAILY_TASK_CONFIG["priority_levels"]),
+          status(DAILY_TASK_CONFIG["status_options"], "已完成"), 10, created_at(i), created_at(i)) for i in range(row_count))
+    )
+    connection.commit()
+    connection.close()
+
+
+def refresh_queries(cache):
+    """主窗口两个列表的刷新（与 DataManager.refresh_goals / refresh_daily_tasks 相同的筛选和排序）"""
+    goal_type = GOAL_CONFIG["goal_types"][0]
+    return (
+        ("目标列表", cache.goals, lambda: cache.goals.select(
+            lambda record: record.goal_type == goal_type and is_active_goal(record),
+            key=goals_order_key, reverse=True)),
+        ("计划列表", cache.daily_tasks, lambda: cache.daily_tasks.select(
+            is_active_daily_task, key=daily_tasks_order_key, reverse=True)),
+    )
+
+
+def measure_refresh(cache):
+    """测量首次加载（整表读入缓存）与之后刷新（内存筛选排序）的平均耗时（毫秒）"""
+    timings = {}
+    for name, entity_cache, refresh in refresh_queries(cache):
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            entity_cache.invalidate()
+            refresh()
+        cold_ms = (time.perf_counter() - start) / REPEAT * 1000
+
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            rows = refresh()
+        warm_ms = (time.perf_counter() - start) / REPEAT * 1000
+        timings[name] = (cold_ms, warm_ms, len(rows))
+    return timings
+
+
+def set_refresh_indexes(db_manager, present):
+    """创建或删除 v1 的刷新查询索引"""
+    with db_manager.transaction() as connection:
+        for index_name in REFRESH_INDEXES:
+            if present:
+                connection.execute(V1_INDEXES[index_name])
+            else:
+                connection.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+def measure_active_queries(db_manager):
+    """测量按状态查询未完成目标/任务的平均耗时（毫秒）"""
+    timings = {}
+    for name, sql, params in ACTIVE_QUERIES:
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            db_manager.connection.execute(sql, params).fetchall()
+        timings[name] = (time.perf_counter() - start) / REPEAT * 1000
+    return timings
+
+
+def measure_updates(db_manager, rows):
+    """
+    测量逐条修改状态（每条一个事务，与界面操作相同）的平均耗时（毫秒）
+
+    先逐条切换选中行的状态（已完成的目标改为进行中，任务在未完成/已完成之间切换），
+    再逐条改回原状态，测量后数据与测量前相同，因此每一轮、每种索引情况做的是同样的工作。
+    """
+    flipped = [(row_id, "进行中", "已完成" if task_status == "未完成" else "未完成") for row_id, task_status in rows]
+    restored = [(row_id, "已完成", task_status) for row_id, task_status in rows]
+    start = time.perf_counter()
+    for changes in (flipped, restored):
+        for row_id, goal_status, task_status in changes:
+            with db_manager.transaction() as connection:
+                connection.execute("UPDATE goals SET status = ? WHERE id = ?", (goal_status, row_id))
+                connection.execute("UPDATE daily_tasks SET status = ? WHERE id = ?", (task_status, row_id))
+    return (time.perf_counter() - start) / (2 * len(rows)) * 1000
+
+
+def run_benchmark(row_count=ROW_COUNT):
+    """运行性能测试"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "benchmark.db")
+        print(f"📦 生成测试数据: 目标 {row_count} 行, 任务 {row_count} 行")
+        populate(db_path, row_count)
+
+        # 打开时按结构版本自动升级到最新
+        db_manager = open_database_manager(db_path)
+        try:
+            refresh = measure_refresh(DataCache())
+
+            # 两种情况修改同一批行（目标为已完成），改完即恢复
+            rows = [(row["id"], row["task_status"]) for row in db_manager.execute_query("""
+                SELECT goals.id, daily_tasks.status AS task_status
+                FROM goals JOIN daily_tasks ON daily_tasks.id = goals.id
+                WHERE goals.status = '已完成' ORDER BY goals.id
+            """)]
+            rows = random.Random(SEED).sample(rows, min(UPDATE_COUNT, len(rows)))
+
+            # 预热：两种情况各跑一轮不计时
+            for present in (True, False):
+                set_refresh_indexes(db_manager, present)
+                measure_active_queries(db_manager)
+                measure_updates(db_manager, rows)
+
+            # 交替先后顺序，多轮测量
+            queries = {True: [], False: []}
+            updates = {True: [], False: []}
+            for round_index in range(ROUNDS):
+                for present in ((True, False) if round_index % 2 == 0 else (False, True)):
+                    set_refresh_indexes(db_manager, present)
+                    queries[present].append(measure_active_queries(db_manager))
+                    updates[present].append(measure_updates(db_manager, rows))
+            set_refresh_indexes(db_manager, True)
+        finally:
+            close_database_manager()
+
+    print("\n" + "=" * 50)
+    for name, (cold_ms, warm_ms, rows) in refresh.items():
+        print(f"{name}（{rows} 行）: 首次加载 {cold_ms:.1f} ms，之后刷新 {warm_ms:.2f} ms")
+    print(f"以下为 {ROUNDS} 轮交替测量的中位数")
+    for name, _, _ in ACTIVE_QUERIES:
+        with_ms = statistics.median(timing[name] for timing in queries[True])
+        without_ms = statistics.median(timing[name] for timing in queries[False])
+        print(f"按状态查询{name}: 有刷新查询索引 {with_ms:.3f} ms，无索引 {without_ms:.3f} ms")
+    print(f"修改状态（每条一个事务）: 有刷新查询索引 {statistics.median(updates[True]):.3f} ms，"
+          f"无索引 {statistics.median(updates[False]):.3f} ms")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("刷新性能测试")
+    print("=" * 50)
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else ROW_COUNT)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+人生成就系统(Life Achievement System,LAS)
+命令行入口：不启动图形界面，可在定时任务、脚本中使用
+
+示例：
+    python las.py tasks list
+    python las.py tasks done --all
+    python las.py summary add --date 2025.08.01 "今天完成了..."
+    python las.py stats
+    python las.py export backup/ --format csv
+"""
+
+import argparse
+import os
+import sys
+from datetime import date
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(__file__))
+
+from src.utils.config import GOAL_CONFIG, DAILY_TASK_CONFIG, LEVEL_SYSTEM_CONFIG, API_SERVER_CONFIG
+from src.utils.database import open_database_manager, close_database_manager
+from src.utils.data_manager import format_level_info
+from src.utils.las_service import get_las_service
+from src.utils.search_manager import ENTITY_NAMES
+from src.utils.bulk_importer import format_import_report
+from src.utils.data_exporter import EXPORT_FORMATS, EXPORT_TABLES
+from src.utils.summary_store import get_summary_store, open_summary_store
+from src.utils.api_server import ApiServer
+
+
+def print_goals(goals):
+    for goal in goals:
+        print(f"{goal.id}\t[{goal.status or '进行中'}]\t{goal.goal_type}\t{goal.priority or ''}\t{goal.title}")
+    print(f"共 {len(goals)} 个目标")
+
+
+def print_daily_tasks(tasks):
+    for task in tasks:
+        mark = "✓" if task.status == '已完成' else "✗"
+        print(f"{task.id}\t{mark} {task.status}\t{task.priority or ''}\t{task.title}")
+    print(f"共 {len(tasks)} 个任务")
+
+
+def print_import_report(report):
+    # 新增行数和吞吐量已由导入器输出，这里只列出无效的行
+    for line in format_import_report(report).splitlines()[1:]:
+        print(f"⚠️ {line}")
+    return 1 if report["skipped"] else 0
+
+
+def cmd_goals(service, args):
+    if args.action == "list":
+        print_goals(service.list_goals(args.type, args.all))
+    elif args.action == "add":
+        goal_id = service.add_goal(args.title, args.type or GOAL_CONFIG["goal_types"][0], args.description, args.priority)
+        if not goal_id:
+            print("❌ 添加目标失败")
+            return 1
+        print(f"✅ 目标已添加: {goal_id}")
+    elif args.action == "import":
+        return print_import_report(service.import_goals(args.file))
+    elif args.action == "done":
+        for goal_id in args.ids:
+            result = service.complete_goal(goal_id)
+            if result is None:
+                print(f"❌ 未找到目标 {goal_id}")
+            else:
+                print(f"🎉 目标 '{result[0]}' 已完成，获得经验值: {result[1]}")
+    elif args.action == "reopen":
+        for goal_id in args.ids:
+            if service.reopen_goal(goal_id) is None:
+                print(f"❌ 未找到目标 {goal_id}")
+    elif args.action == "delete":
+        for goal_id in args.ids:
+            if not service.delete_goal(goal_id):
+                print(f"❌ 未找到目标 {goal_id}")
+    return 0
+
+
+def cmd_tasks(service, args):
+    if args.action == "list":
+        print_daily_tasks(service.list_daily_tasks(args.all))
+    elif args.action == "add":
+        task_id = service.add_daily_task(args.title, args.description, args.priority)
+        if not task_id:
+            print("❌ 添加任务失败")
+            return 1
+        print(f"✅ 任务已添加: {task_id}")
+    elif args.action == "import":
+        return print_import_report(service.import_daily_tasks(args.file))
+    elif args.action == "done":
+        task_ids = args.ids
+        if args.all:
+            task_ids = [task.id for task in service.list_daily_tasks()]
+        results = service.complete_daily_tasks(task_ids)
+        for task_id in task_ids:
+            if task_id not in results:
+                print(f"❌ 未找到任务 {task_id}")
+        total = sum(exp for _, exp in results.values())
+        print(f"🎉 完成 {len(results)} 个任务，获得经验值: {total}")
+    elif args.action == "undo":
+        for task_id in args.ids:
+            if not service.reopen_daily_task(task_id):
+                print(f"❌ 未找到任务 {task_id}")
+    elif args.action == "delete":
+        for task_id in args.ids:
+            if not service.delete_daily_task(task_id):
+                print(f"❌ 未找到任务 {task_id}")
+    return 0
+
+
+def cmd_summary(service, args):
+    if args.action == "add":
+        content = sys.stdin.read() if args.content == "-" else args.content
+        summary_id = service.add_summary(args.date, content)
+        print("✅ 总结已保存" if summary_id else "当天已保存过相同的总结")
+    elif args.action == "import":
+        service.import_summaries()
+    elif args.action == "render":
+        print(f"✅ 已生成: {get_summary_store().render_year(args.year)}")
+    return 0
+
+
+def cmd_level(service, args):
+    experience, level = service.level_info()
+    print(format_level_info(level, experience, LEVEL_SYSTEM_CONFIG["exp_per_level"]))
+    return 0
+
+
+def cmd_xp(service, args):
+    result = service.add_experience(args.amount)
+    if result is None:
+        print("❌ 未找到用户基本信息")
+        return 1
+    print(f"经验值: {result[0]}, 等级: {result[1]}")
+    return 0
+
+
+def cmd_stats(service, args):
+    print(service.statistics_text())
+    return 0
+
+
+def cmd_reset(service, args):
+    print(f"🔄 已开始新的一天: {service.daily_reset()}")
+    return 0
+
+
+def cmd_search(service, args):
+    results = service.search(" ".join(args.query), args.limit)
+    for result in results:
+        print(f"[{ENTITY_NAMES.get(result['entity'], result['entity'])} {result['entity_id']}] "
+              f"{result['title'] or ''}: {result['snippet']}")
+    print(f"找到 {len(results)} 条结果")
+    return 0
+
+
+def cmd_export(service, args):
+    service.export_data(args.out_dir, args.format, args.tables)
+    return 0
+
+
+def cmd_serve(service, args):
+    ApiServer(service, args.host, args.port).serve_forever()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="las", description="人生成就系统命令行")
+    parser.add_argument("--db", help="数据库文件路径（默认与图形界面相同）；总结md文件写在同一目录")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    goals = commands.add_parser("goals", help="目标").add_subparsers(dest="action", required=True)
+    goals_list = goals.add_parser("list", help="列出目标（默认只列出未完成的）")
+    goals_list.add_argument("--type", choices=GOAL_CONFIG["goal_types"])
+    goals_list.add_argument("--all", action="store_true", help="包括已完成的目标")
+    goals_add = goals.add_parser("add", help="添加目标")
+    goals_add.add_argument("title")
+    goals_add.add_argument("--type", choices=GOAL_CONFIG["goal_types"])
+    goals_add.add_argument("--priority", choices=GOAL_CONFIG["priority_levels"])
+    goals_add.add_argument("--description", default="")
+    goals.add_parser("import", help="从CSV/JSONL文件批量导入（列：title, goal_type, description, status, priority, created_at）"
+                     ).add_argument("file")
+    for action, help_text in (("done", "标记完成"), ("reopen", "标记进行中"), ("delete", "删除")):
+        goals.add_parser(action, help=help_text).add_argument("ids", type=int, nargs="+")
+
+    tasks = commands.add_parser("tasks", help="每日任务").add_subparsers(dest="action", required=True)
+    tasks.add_parser("list", help="列出今天未完成的任务").add_argument("--all", action="store_true", help="包括已完成的任务")
+    tasks_add = tasks.add_parser("add", help="添加任务")
+    tasks_add.add_argument("title")
+    tasks_add.add_argument("--priority", choices=DAILY_TASK_CONFIG["priority_levels"])
+    tasks_add.add_argument("--description", default="")
+    tasks.add_parser("import", help="从CSV/JSONL文件批量导入（列：title, description, priority, created_at）"
+                     ).add_argument("file")
+    tasks_done = tasks.add_parser("done", help="完成任务（同一事务）")
+    tasks_done.add_argument("ids", type=int, nargs="*")
+    tasks_done.add_argument("--all", action="store_true", help="完成今天所有未完成的任务")
+    for action, help_text in (("undo", "撤销今天的完成"), ("delete", "删除")):
+        tasks.add_parser(action, help=help_text).add_argument("ids", type=int, nargs="+")
+
+    summary = commands.add_parser("summary", help="总结").add_subparsers(dest="action", required=True)
+    summary_add = summary.add_parser("add", help="保存总结")
+    summary_add.add_argument("content", help="总结内容，- 表示从标准输入读取")
+    summary_add.add_argument("--date", default=None, help="日期 YYYY.MM.DD，默认今天")
+    summary.add_parser("import", help="导入doc目录下旧的总结文件")
+    summary.add_parser("render", help="重新生成某年的md文件").add_argument("year")
+
+    commands.add_parser("level", help="当前等级")
+    commands.add_parser("xp", help="手动增加经验值").add_argument("amount", type=int)
+    commands.add_parser("stats", help="数据统计")
+    commands.add_parser("reset", help="执行每日重置")
+    search = commands.add_parser("search", help="搜索总结、目标和每日任务")
+    search.add_argument("query", nargs="+")
+    search.add_argument("--limit", type=int)
+    export = commands.add_parser("export", help="导出数据（每张表一个文件）")
+    export.add_argument("out_dir")
+    export.add_argument("--format", choices=EXPORT_FORMATS, default="jsonl")
+    export.add_argument("--tables", nargs="+", choices=EXPORT_TABLES, help="只导出这些表（默认全部）")
+    serve = commands.add_parser("serve", help="启动本地HTTP/JSON接口（Ctrl+C 停止）")
+    serve.add_argument("--host", default=API_SERVER_CONFIG["host"])
+    serve.add_argument("--port", type=int, default=API_SERVER_CONFIG["port"])
+    return parser
+
+
+def render_summaries():
+    """命令结束时生成有新总结的年份的md文件（每年一次）"""
+    try:
+        for md_path in get_summary_store().render_dirty():
+            print(f"📝 已生成: {md_path}")
+    except Exception as e:
+        print(f"❌ 生成md文件失败: {e}")
+
+
+COMMANDS = {
+    "goals": cmd_goals,
+    "tasks": cmd_tasks,
+    "summary": cmd_summary,
+    "level": cmd_level,
+    "xp": cmd_xp,
+    "stats": cmd_stats,
+    "reset": cmd_reset,
+    "search": cmd_search,
+    "export": cmd_export,
+    "serve": cmd_serve,
+}
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "summary" and args.action == "add" and args.date is None:
+        args.date = date.today().strftime("%Y.%m.%d")
+    if args.command == "tasks" and args.action == "done" and not (args.ids or args.all):
+        print("❌ 请指定任务ID或 --all")
+        return 2
+
+    if args.db:
+        open_database_manager(args.db)
+        open_summary_store(os.path.dirname(os.path.abspath(args.db)))
+    try:
+        return COMMANDS[args.command](get_las_service(), args)
+    except (ValueError, OSError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        render_summaries()
+        close_database_manager()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,7 @@
 import tkinter as tk
 import os
 import sys
+import time
 
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(__file__))
@@ -17,6 +18,7 @@ from src.gui.main_window import MainWindowGUI
 from src.utils.system_manager import SystemManager, WindowManager
 from src.utils.event_manager import EventManager, EventHandlers
 from src.utils.summary_manager import SummaryManager
+from src.utils.experience_manager import XP_SOURCE_MANUAL
 
 
 class LASSystem:
@@ -36,13 +38,21 @@ class LASSystem:
         self.summary_manager = SummaryManager(self)
         
         # 初始化系统
+        phase_start = time.perf_counter()
         self.system_manager.init_system()
+        init_ms = (time.perf_counter() - phase_start) * 1000
         
         # 创建GUI
+        phase_start = time.perf_counter()
         self.gui = MainWindowGUI(self)
+        gui_ms = (time.perf_counter() - phase_start) * 1000
         
         # 加载数据
+        phase_start = time.perf_counter()
         self.system_manager.load_data()
+        load_ms = (time.perf_counter() - phase_start) * 1000
+        
+        print(f"⏱️ 启动耗时: 系统初始化 {init_ms:.1f}ms | 创建界面 {gui_ms:.1f}ms | 加载数据 {load_ms:.1f}ms")
         
     def add_event_listener(self, listener):
         """添加事件监听器"""
@@ -52,18 +62,26 @@ class LASSystem:
         """移除事件监听器"""
         self.system_manager.main_system.event_manager.remove_event_listener(listener)
     
-    def notify_data_changed(self, event_type="data_changed"):
+    def notify_data_changed(self, event_type="data_changed", entity=None, ids=None, changes=None):
         """通知所有监听器数据已变更"""
-        self.system_manager.main_system.event_manager.notify_data_changed(event_type)
+        self.system_manager.main_system.event_manager.notify_data_changed(event_type, entity, ids, changes)
     
-    def register_window_for_updates(self, window):
+    def register_window_for_updates(self, window, event_types=None):
         """注册窗口以接收更新通知"""
-        self.system_manager.main_system.event_manager.register_window_for_updates(window)
+        self.system_manager.main_system.event_manager.register_window_for_updates(window, event_types)
+        
+    def update_user_experience(self, exp_gain, source=XP_SOURCE_MANUAL, entity_id=None):
+        """更新用户经验值"""
+        return self.data_manager.update_user_experience(exp_gain, source, entity_id)
         
     def on_data_changed(self, event_type="data_changed"):
         """处理数据变更事件"""
         self.event_handlers.on_data_changed(event_type)
     
+    def on_data_batch(self, events):
+        """处理合并后的一批数据变更事件"""
+        self.event_handlers.on_data_batch(events)
+    
     def on_goal_type_changed(self):
         """目标类型选择改变时的处理"""
         self.event_handlers.on_goal_type_changed()
@@ -100,6 +118,10 @@ class LASSystem:
         """获取当前日期字符串"""
         return self.system_manager.get_current_date_str()
     
+    def import_summary_files(self):
+        """导入旧的总结文件"""
+        self.summary_manager.import_summary_files()
+        
     def save_summary(self):
         """保存总结"""
         self.summary_manager.save_summary_with_validation()
@@ -110,6 +132,8 @@ class LASSystem:
             self.root.mainloop()
         except Exception as e:
             print(f"系统运行出错: {e}")
+        finally:
+            self.system_manager.shutdown()
 
 
 if __name__ == "__main__":
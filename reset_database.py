@@ -13,52 +13,24 @@ from pathlib import Path
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(__file__))
 
-from src.utils.config import DATABASE_NAME, DATABASE_TABLES, DEFAULT_DATA
+from src.utils.config import DATABASE_NAME
+from src.utils.database import DatabaseManager
+from src.utils.migrations import get_schema_version, LATEST_VERSION, V1_TABLES
 
 def reset_database():
     """重置数据库"""
     try:
         print("🔄 开始重置数据库...")
         
-        # 删除现有数据库文件
-        if os.path.exists(DATABASE_NAME):
-            os.remove(DATABASE_NAME)
-            print(f"✅ 已删除现有数据库文件: {DATABASE_NAME}")
+        # 删除现有数据库文件（包括WAL模式的日志文件）
+        for path in (DATABASE_NAME, DATABASE_NAME + "-wal", DATABASE_NAME + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+                print(f"✅ 已删除现有数据库文件: {path}")
         
-        # 确保数据库目录存在
-        os.makedirs(os.path.dirname(DATABASE_NAME), exist_ok=True)
-        
-        # 创建新的数据库连接
-        connection = sqlite3.connect(DATABASE_NAME)
-        connection.row_factory = sqlite3.Row
-        
-        # 创建表
-        cursor = connection.cursor()
-        for table_name, create_sql in DATABASE_TABLES.items():
-            cursor.execute(create_sql)
-            print(f"✅ 表 {table_name} 创建成功")
-        
-        # 初始化默认数据
-        cursor.execute("SELECT COUNT(*) FROM basic_info")
-        count = cursor.fetchone()[0]
-        
-        if count == 0:
-            from datetime import datetime
-            basic_info_data = DEFAULT_DATA["basic_info"]
-            cursor.execute("""
-                INSERT INTO basic_info (id, start_date, experience, level, created_at, updated_at)
-                VALUES (1, ?, ?, ?, ?, ?)
-            """, (
-                basic_info_data["start_date"],
-                basic_info_data["experience"],
-                basic_info_data["level"],
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            ))
-            print("✅ 默认数据初始化完成")
-        
-        connection.commit()
-        connection.close()
+        # 创建新数据库：执行全部迁移并初始化默认数据
+        db_manager = DatabaseManager(DATABASE_NAME)
+        db_manager.close()
         
         print("✅ 数据库重置完成！")
         return True
@@ -84,13 +56,19 @@ def verify_database():
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
         tables = [row[0] for row in cursor.fetchall()]
         
-        expected_tables = list(DATABASE_TABLES.keys())
+        expected_tables = list(V1_TABLES.keys())
         missing_tables = set(expected_tables) - set(tables)
         
         if missing_tables:
             print(f"❌ 缺少表: {missing_tables}")
             return False
         
+        # 检查结构版本
+        schema_version = get_schema_version(connection)
+        if schema_version < LATEST_VERSION:
+            print(f"❌ 数据库结构版本过旧: v{schema_version}（最新 v{LATEST_VERSION}）")
+            return False
+        
         # 检查基本数据
         cursor.execute("SELECT COUNT(*) FROM basic_info")
         count = cursor.fetchone()[0]
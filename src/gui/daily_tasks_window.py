@@ -4,18 +4,52 @@
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox
-from datetime import datetime, date
+from tkinter import ttk, messagebox, filedialog
 import sys
 import os
 
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from src.utils.config import DAILY_TASK_CONFIG, WINDOW_CONFIG
-from src.utils.database import execute_insert, execute_query, execute_update
+from src.utils.config import WINDOW_CONFIG
+from src.utils.database import fetch_page_by_created, fetch_rows_by_ids
+from src.utils.data_cache import get_data_cache
+from src.utils.completion_manager import DAILY_TASKS_WITH_STATUS_SQL, day_key
+from src.utils.event_manager import DAILY_TASK_EVENTS, DataChangeEvent, collect_patch_ids
+from src.utils.bulk_importer import format_import_report
+from src.gui.paged_tree import PagedTreeview
+
+# 管理窗口列表按创建时间排序，其它字段的修改都可以原地更新
+WINDOW_ORDER_FIELDS = ("created_at",)
+
+
+def fetch_task_page(after_key, limit):
+    """计划管理窗口的分页查询（状态为当天的完成状态）"""
+    return fetch_page_by_created("daily_tasks", after_key, limit, DAILY_TASKS_WITH_STATUS_SQL, (day_key(),),
+                                 "t.id", "t.created_at")
+
+
+def fetch_task_rows(task_ids):
+    """按ID读取计划管理窗口的行（状态为当天的完成状态）"""
+    return fetch_rows_by_ids("daily_tasks", task_ids, DAILY_TASKS_WITH_STATUS_SQL, (day_key(),), "t.id")
+
+
+def task_window_row(task):
+    """将任务记录转换为计划管理窗口的行 (id, values, tags)"""
+    status_icon = "✓" if task['status'] == "已完成" else "✗"
+    return task['id'], (
+        task['id'],
+        task['title'],
+        task['description'],
+        task['priority'],
+        f"{status_icon} {task['status']}"
+    ), ()
+
 
 class DailyTasksWindow:
+    # 只关心每日任务相关的数据变更事件
+    event_types = DAILY_TASK_EVENTS
+    
     def __init__(self, parent):
         self.parent = parent
         self.window = tk.Toplevel(parent.root)
@@ -101,7 +135,8 @@ class DailyTasksWindow:
         right_buttons.pack(side=tk.RIGHT, fill=tk.Y, padx=(10, 0))
         
         ttk.Button(right_buttons, text="添加任务", command=self.add_task, width=12).pack(fill=tk.X, pady=(0, 3))
-        ttk.Button(right_buttons, text="清空", command=self.clear_form, width=12).pack(fill=tk.X)
+        ttk.Button(right_buttons, text="清空", command=self.clear_form, width=12).pack(fill=tk.X, pady=(0, 3))
+        ttk.Button(right_buttons, text="批量导入", command=self.import_daily_tasks, width=12).pack(fill=tk.X)
         
     def create_tasks_list(self, parent):
         """创建任务列表"""
@@ -132,7 +167,11 @@ class DailyTasksWindow:
         
         # 滚动条
         scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tasks_tree.yview)
-        self.tasks_tree.configure(yscrollcommand=scrollbar.set)
+        
+        # 分页加载：按 created_at 索引分页查询，滚动到底部时再加载下一页
+        self.tasks_pager = PagedTreeview(
+            self.tasks_tree, scrollbar, fetch_task_page, task_window_row, fetch_rows=fetch_task_rows
+        )
         
         self.tasks_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -154,6 +193,20 @@ class DailyTasksWindow:
         ttk.Button(button_frame, text="删除任务", command=self.delete_selected_task, width=12).pack(fill=tk.X, pady=(0, 3))
         ttk.Button(button_frame, text="关闭", command=self.window.destroy, width=12).pack(fill=tk.X, pady=(0, 3))
         
+    def import_daily_tasks(self):
+        """从 CSV / JSONL 文件批量导入每日任务（后台执行，导入完成后列表只刷新一次）"""
+        path = filedialog.askopenfilename(
+            parent=self.window, title="批量导入每日任务",
+            filetypes=[("CSV / JSONL", "*.csv *.jsonl *.ndjson"), ("所有文件", "*.*")]
+        )
+        if not path:
+            return
+        self.parent.background_runner.submit(
+            self.parent.service.import_daily_tasks, path,
+            on_success=lambda report: messagebox.showinfo("导入完成", format_import_report(report)),
+            on_error=lambda e: messagebox.showerror("错误", f"批量导入每日任务失败: {e}")
+        )
+    
     def add_task(self):
         """添加任务"""
         title = self.title_var.get().strip()
@@ -165,38 +218,12 @@ class DailyTasksWindow:
             return
         
         try:
-            # 根据优先级计算经验值奖励
-            priority_levels = DAILY_TASK_CONFIG["priority_levels"]
-            experience_rewards = DAILY_TASK_CONFIG["experience_reward"]
-            try:
-                priority_index = priority_levels.index(priority)
-                exp_reward = experience_rewards[priority_index]
-            except (ValueError, IndexError):
-                exp_reward = experience_rewards[1]  # 默认使用中等优先级奖励
-            
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            query = """
-                INSERT INTO daily_tasks (title, description, status, priority, 
-                                       experience_reward, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
-            task_id = execute_insert(query, (
-                title, description, "未完成", priority,
-                exp_reward, current_time, current_time
-            ))
+            # 插入任务（经验值奖励按优先级计算，提交后由业务服务通知数据变更）
+            task_id = self.parent.service.add_daily_task(title, description, priority)
             
             if task_id:
                 # 清空表单
                 self.clear_form()
-                
-                # 通知所有监听器数据已变更
-                if hasattr(self.parent, 'notify_data_changed'):
-                    print("📢 通知数据变更：每日任务已添加")
-                    self.parent.notify_data_changed("daily_task_added")
-                
-                # 立即刷新任务列表
-                self.refresh_tasks()
-                
                 print("✅ 每日任务添加成功")
             else:
                 messagebox.showerror("错误", "添加任务失败")
@@ -211,33 +238,11 @@ class DailyTasksWindow:
         self.priority_var.set("中")
         
     def refresh_tasks(self):
-        """刷新任务列表"""
+        """刷新任务列表（只重新读取已加载的分页，增量同步）"""
         try:
             print("🔄 开始刷新每日任务列表...")
-            # 清空现有数据
-            for item in self.tasks_tree.get_children():
-                self.tasks_tree.delete(item)
-            
-            # 查询所有任务
-            query = "SELECT * FROM daily_tasks ORDER BY created_at DESC"
-            tasks = execute_query(query)
-            
-            print(f"📊 查询到 {len(tasks)} 个任务")
-            
-            # 添加到树形视图
-            for task in tasks:
-                status_icon = "✓" if task['status'] == "已完成" else "✗"
-                status_text = f"{status_icon} {task['status']}"
-                
-                self.tasks_tree.insert("", "end", values=(
-                    task['id'],
-                    task['title'],
-                    task['description'],
-                    task['priority'],
-                    status_text
-                ))
-            
-            print("✅ 每日任务列表刷新完成")
+            self.tasks_pager.refresh()
+            print(f"✅ 每日任务列表刷新完成（已加载 {len(self.tasks_pager.records)} 个任务）")
                 
         except Exception as e:
             print(f"❌ 刷新每日任务列表失败: {e}")
@@ -245,22 +250,27 @@ class DailyTasksWindow:
     
     def on_data_changed(self, event_type="data_changed"):
         """处理数据变更事件"""
-        print(f"📅 每日任务窗口收到数据变更通知: {event_type}")
+        self.on_data_batch([DataChangeEvent(event_type)])
+    
+    def on_data_batch(self, events):
+        """处理合并后的一批数据变更事件：能局部更新时只更新变更行，否则只刷新一次"""
+        print(f"📅 每日任务窗口收到数据变更通知: {events}")
         
-        if event_type in ["daily_task_changed", "data_changed"]:
-            try:
-                # 检查窗口是否仍然存在
-                if hasattr(self, 'window') and self.window.winfo_exists():
-                    print("🔄 刷新每日任务列表...")
+        try:
+            # 检查窗口是否仍然存在
+            if hasattr(self, 'window') and self.window.winfo_exists():
+                task_ids = collect_patch_ids(events, WINDOW_ORDER_FIELDS)
+                if task_ids is None:
                     self.refresh_tasks()
-                    print("✅ 每日任务列表刷新完成")
-                else:
-                    print("⚠️ 窗口已不存在，跳过刷新")
-            except tk.TclError:
-                print("⚠️ 窗口已被销毁，跳过刷新")
-            except Exception as e:
-                print(f"❌ 刷新每日任务列表失败: {e}")
-                messagebox.showerror("错误", f"刷新每日任务列表失败: {e}")
+                elif self.tasks_pager.patch_ids(task_ids):
+                    print(f"✅ 每日任务列表已局部更新: {sorted(task_ids)}")
+            else:
+                print("⚠️ 窗口已不存在，跳过刷新")
+        except tk.TclError:
+            print("⚠️ 窗口已被销毁，跳过刷新")
+        except Exception as e:
+            print(f"❌ 刷新每日任务列表失败: {e}")
+            messagebox.showerror("错误", f"刷新每日任务列表失败: {e}")
     
     def on_task_select(self, event):
         """处理任务选择事件"""
@@ -302,41 +312,12 @@ class DailyTasksWindow:
         # 获取选中的任务ID
         item = self.tasks_tree.item(selected[0])
         task_id = item['values'][0]
-        task_title = item['values'][1]
-        # 根据优先级获取经验值奖励
-        task_priority = item['values'][3]  # 优先级在索引3
-        priority_levels = DAILY_TASK_CONFIG["priority_levels"]
-        experience_rewards = DAILY_TASK_CONFIG["experience_reward"]
-        
-        # 根据优先级获取对应的经验值奖励
-        try:
-            priority_index = priority_levels.index(task_priority)
-            exp_reward = experience_rewards[priority_index]
-        except (ValueError, IndexError):
-            # 如果优先级不在列表中或索引超出范围，使用默认值
-            exp_reward = DAILY_TASK_CONFIG["experience_reward"][1]  # 默认使用中等优先级奖励
-
         try:
-            # 更新任务状态
-            query = "UPDATE daily_tasks SET status = '已完成', completed_at = ?, updated_at = ? WHERE id = ?"
-            execute_update(query, (
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                task_id
-            ))
-
-            # 给予经验值奖励
-            if hasattr(self.parent, 'update_user_experience'):
-                self.parent.update_user_experience(exp_reward)
+            # 更新任务状态并给予经验值奖励（同一事务提交；当天已完成过的任务不重复奖励）
+            result = self.parent.service.complete_daily_task(task_id)
+            if result and result[1]:
+                task_title, exp_reward = result
                 messagebox.showinfo("任务完成", f"恭喜！任务 '{task_title}' 已完成！\n获得经验值: {exp_reward}")
-            
-            # 通知所有监听器数据已变更
-            if hasattr(self.parent, 'notify_data_changed'):
-                print("📢 通知数据变更：每日任务已完成")
-                self.parent.notify_data_changed("daily_task_changed")
-            
-            # 立即刷新任务列表
-            self.refresh_tasks()
         except Exception as e:
             messagebox.showerror("错误", f"更新任务状态失败: {e}")
     
@@ -352,17 +333,8 @@ class DailyTasksWindow:
         task_id = item['values'][0]
 
         try:
-            # 更新任务状态
-            query = "UPDATE daily_tasks SET status = '未完成', updated_at = ? WHERE id = ?"
-            execute_update(query, (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), task_id))
-
-            # 通知所有监听器数据已变更
-            if hasattr(self.parent, 'notify_data_changed'):
-                print("📢 通知数据变更：每日任务状态已更新")
-                self.parent.notify_data_changed("daily_task_changed")
-            
-            # 立即刷新任务列表
-            self.refresh_tasks()
+            # 更新任务状态并撤销当天的完成记录
+            self.parent.service.reopen_daily_task(task_id)
         except Exception as e:
             messagebox.showerror("错误", f"更新任务状态失败: {e}")
     
@@ -381,17 +353,8 @@ class DailyTasksWindow:
         if messagebox.askyesno("确认", f"确定要删除任务 '{task_title}' 吗？"):
             try:
                 # 删除任务
-                query = "DELETE FROM daily_tasks WHERE id = ?"
-                execute_update(query, (task_id,))
-                
+                self.parent.service.delete_daily_task(task_id)
                 messagebox.showinfo("成功", "任务已删除！")
-                # 通知所有监听器数据已变更
-                if hasattr(self.parent, 'notify_data_changed'):
-                    print("📢 通知数据变更：每日任务已删除")
-                    self.parent.notify_data_changed("daily_task_deleted")
-                
-                # 立即刷新任务列表
-                self.refresh_tasks()
             except Exception as e:
                 messagebox.showerror("错误", f"删除任务失败: {e}")
 
@@ -400,6 +363,7 @@ class EditDailyTaskWindow:
     def __init__(self, parent, task_id):
         self.parent = parent
         self.task_id = task_id
+        self.original = {}
         self.window = tk.Toplevel(parent.window)
         self.window.title("编辑每日任务")
         self.window.geometry(WINDOW_CONFIG["daily_tasks_window"]["edit_geometry"])
@@ -448,11 +412,10 @@ class EditDailyTaskWindow:
     def load_task_data(self):
         """加载任务数据"""
         try:
-            query = "SELECT * FROM daily_tasks WHERE id = ?"
-            result = execute_query(query, (self.task_id,))
+            task = get_data_cache().daily_tasks.get(self.task_id)
             
-            if result:
-                task = result[0]
+            if task:
+                self.original = task
                 self.title_entry.insert(0, task['title'] or "")
                 self.description_entry.insert(0, task['description'] or "")
                 self.status_var.set(task['status'] or "未完成")
@@ -476,35 +439,11 @@ class EditDailyTaskWindow:
             return
             
         try:
-            # 根据优先级计算经验值奖励
-            priority_levels = DAILY_TASK_CONFIG["priority_levels"]
-            experience_rewards = DAILY_TASK_CONFIG["experience_reward"]
-            try:
-                priority_index = priority_levels.index(priority)
-                exp_reward = experience_rewards[priority_index]
-            except (ValueError, IndexError):
-                exp_reward = experience_rewards[1]  # 默认使用中等优先级奖励
-            
-            # 更新任务
-            query = """
-                UPDATE daily_tasks 
-                SET title = ?, description = ?, status = ?, 
-                    priority = ?, experience_reward = ?, updated_at = ?
-                WHERE id = ?
-            """
-            execute_update(query, (
-                title, description, status, priority, exp_reward,
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S"), self.task_id
-            ))
-            
-            # 通知所有监听器数据已变更
-            if hasattr(self.parent, 'parent') and hasattr(self.parent.parent, 'notify_data_changed'):
-                print("📢 通知数据变更：每日任务已编辑")
-                self.parent.parent.notify_data_changed("daily_task_edited")
-            elif hasattr(self.parent, 'notify_data_changed'):
-                print("📢 通知数据变更：每日任务已编辑")
-                self.parent.notify_data_changed("daily_task_edited")
-            
+            # 更新任务（经验值奖励按优先级重新计算，手动修改状态时同步当天的完成记录，只上报实际修改的字段）
+            if self.parent.parent.service.update_daily_task(
+                self.task_id, title, description, status, priority, self.original
+            ) is False:
+                messagebox.showerror("错误", "任务不存在，可能已被删除")
             self.window.destroy()
         except Exception as e:
             messagebox.showerror("错误", f"保存任务失败: {e}")
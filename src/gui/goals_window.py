@@ -4,8 +4,7 @@
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox
-from datetime import datetime, date
+from tkinter import ttk, messagebox, filedialog
 import sys
 import os
 
@@ -13,9 +12,33 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from src.utils.config import GOAL_CONFIG, WINDOW_CONFIG
-from src.utils.database import execute_insert, execute_query, execute_update
+from src.utils.database import fetch_page_by_created, fetch_rows_by_ids
+from src.utils.data_cache import get_data_cache
+from src.utils.event_manager import GOAL_EVENTS, DataChangeEvent, collect_patch_ids
+from src.utils.bulk_importer import format_import_report
+from src.gui.paged_tree import PagedTreeview
+
+# 管理窗口列表按创建时间排序，其它字段的修改都可以原地更新
+WINDOW_ORDER_FIELDS = ("created_at",)
+
+
+def goal_window_row(goal):
+    """将目标记录转换为目标管理窗口的行 (id, values, tags)"""
+    return goal['id'], (
+        goal['id'],
+        goal['title'],
+        goal['goal_type'],
+        goal['description'],
+        goal['status'],
+        goal['priority'],
+        goal['created_at']
+    ), ()
+
 
 class GoalsWindow:
+    # 只关心目标相关的数据变更事件
+    event_types = GOAL_EVENTS
+    
     def __init__(self, parent):
         self.parent = parent
         self.window = tk.Toplevel(parent.root)
@@ -108,7 +131,8 @@ class GoalsWindow:
         right_buttons.pack(side=tk.RIGHT, fill=tk.Y, padx=(10, 0))
         
         ttk.Button(right_buttons, text="添加目标", command=self.add_goal, width=12).pack(fill=tk.X, pady=(0, 3))
-        ttk.Button(right_buttons, text="清空", command=self.clear_form, width=12).pack(fill=tk.X)
+        ttk.Button(right_buttons, text="清空", command=self.clear_form, width=12).pack(fill=tk.X, pady=(0, 3))
+        ttk.Button(right_buttons, text="批量导入", command=self.import_goals, width=12).pack(fill=tk.X)
         
     def create_goals_list(self, parent):
         """创建目标列表"""
@@ -141,7 +165,14 @@ class GoalsWindow:
         
         # 滚动条
         scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.goals_tree.yview)
-        self.goals_tree.configure(yscrollcommand=scrollbar.set)
+        
+        # 分页加载：按 created_at 索引分页查询，滚动到底部时再加载下一页
+        self.goals_pager = PagedTreeview(
+            self.goals_tree, scrollbar,
+            lambda after_key, limit: fetch_page_by_created("goals", after_key, limit),
+            goal_window_row,
+            fetch_rows=lambda goal_ids: fetch_rows_by_ids("goals", goal_ids)
+        )
         
         self.goals_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -162,6 +193,20 @@ class GoalsWindow:
         ttk.Button(button_frame, text="删除目标", command=self.delete_selected_goal, width=12).pack(fill=tk.X, pady=(0, 3))
         ttk.Button(button_frame, text="关闭", command=self.window.destroy, width=12).pack(fill=tk.X)
         
+    def import_goals(self):
+        """从 CSV / JSONL 文件批量导入目标（后台执行，导入完成后列表只刷新一次）"""
+        path = filedialog.askopenfilename(
+            parent=self.window, title="批量导入目标",
+            filetypes=[("CSV / JSONL", "*.csv *.jsonl *.ndjson"), ("所有文件", "*.*")]
+        )
+        if not path:
+            return
+        self.parent.background_runner.submit(
+            self.parent.service.import_goals, path,
+            on_success=lambda report: messagebox.showinfo("导入完成", format_import_report(report)),
+            on_error=lambda e: messagebox.showerror("错误", f"批量导入目标失败: {e}")
+        )
+    
     def add_goal(self):
         """添加目标"""
         title = self.title_var.get().strip()
@@ -178,29 +223,12 @@ class GoalsWindow:
             return
         
         try:
-            # 插入目标
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            query = """
-                INSERT INTO goals (title, goal_type, description, status, priority, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
-            goal_id = execute_insert(query, (
-                title, goal_type, description, "进行中", priority,
-                current_time, current_time
-            ))
+            # 插入目标（提交后由业务服务通知数据变更）
+            goal_id = self.parent.service.add_goal(title, goal_type, description, priority)
             
             if goal_id:
                 # 清空表单
                 self.clear_form()
-                
-                # 通知所有监听器数据已变更
-                if hasattr(self.parent, 'notify_data_changed'):
-                    print("📢 通知数据变更：目标已添加")
-                    self.parent.notify_data_changed("goal_added")
-                
-                # 立即刷新目标列表
-                self.refresh_goals()
-                
                 print("✅ 目标添加成功")
             else:
                 messagebox.showerror("错误", "添加目标失败")
@@ -216,32 +244,11 @@ class GoalsWindow:
         self.priority_var.set(GOAL_CONFIG["priority_levels"][1])
         
     def refresh_goals(self):
-        """刷新目标列表"""
+        """刷新目标列表（只重新读取已加载的分页，增量同步）"""
         try:
             print("🔄 开始刷新目标列表...")
-            # 清空现有数据
-            for item in self.goals_tree.get_children():
-                self.goals_tree.delete(item)
-            
-            # 查询所有目标
-            query = "SELECT * FROM goals ORDER BY created_at DESC"
-            goals = execute_query(query)
-            
-            print(f"📊 查询到 {len(goals)} 个目标")
-            
-            # 添加到树形视图
-            for goal in goals:
-                self.goals_tree.insert("", "end", values=(
-                    goal['id'],
-                    goal['title'],
-                    goal['goal_type'],
-                    goal['description'],
-                    goal['status'],
-                    goal['priority'],
-                    goal['created_at']
-                ))
-            
-            print("✅ 目标列表刷新完成")
+            self.goals_pager.refresh()
+            print(f"✅ 目标列表刷新完成（已加载 {len(self.goals_pager.records)} 个目标）")
                 
         except Exception as e:
             print(f"❌ 刷新目标列表失败: {e}")
@@ -249,22 +256,27 @@ class GoalsWindow:
     
     def on_data_changed(self, event_type="data_changed"):
         """处理数据变更事件"""
-        print(f"🎯 目标窗口收到数据变更通知: {event_type}")
+        self.on_data_batch([DataChangeEvent(event_type)])
+    
+    def on_data_batch(self, events):
+        """处理合并后的一批数据变更事件：能局部更新时只更新变更行，否则只刷新一次"""
+        print(f"🎯 目标窗口收到数据变更通知: {events}")
         
-        if event_type in ["goal_changed", "data_changed"]:
-            try:
-                # 检查窗口是否仍然存在
-                if hasattr(self, 'window') and self.window.winfo_exists():
-                    print("🔄 刷新目标列表...")
+        try:
+            # 检查窗口是否仍然存在
+            if hasattr(self, 'window') and self.window.winfo_exists():
+                goal_ids = collect_patch_ids(events, WINDOW_ORDER_FIELDS)
+                if goal_ids is None:
                     self.refresh_goals()
-                    print("✅ 目标列表刷新完成")
-                else:
-                    print("⚠️ 窗口已不存在，跳过刷新")
-            except tk.TclError:
-                print("⚠️ 窗口已被销毁，跳过刷新")
-            except Exception as e:
-                print(f"❌ 刷新目标列表失败: {e}")
-                messagebox.showerror("错误", f"刷新目标列表失败: {e}")
+                elif self.goals_pager.patch_ids(goal_ids):
+                    print(f"✅ 目标列表已局部更新: {sorted(goal_ids)}")
+            else:
+                print("⚠️ 窗口已不存在，跳过刷新")
+        except tk.TclError:
+            print("⚠️ 窗口已被销毁，跳过刷新")
+        except Exception as e:
+            print(f"❌ 刷新目标列表失败: {e}")
+            messagebox.showerror("错误", f"刷新目标列表失败: {e}")
     
     def on_goal_select(self, event):
         """处理目标选择事件"""
@@ -307,38 +319,12 @@ class GoalsWindow:
         # 获取选中的目标ID
         item = self.goals_tree.item(selected[0])
         goal_id = item['values'][0]
-        goal_title = item['values'][1]
-        
-        # 根据优先级获取经验值奖励
-        goal_priority = item['values'][5]  # 优先级在索引5
-        priority_levels = GOAL_CONFIG["priority_levels"]
-        experience_rewards = GOAL_CONFIG["experience_reward"]
-        
-        # 根据优先级获取对应的经验值奖励
-        try:
-            priority_index = priority_levels.index(goal_priority)
-            exp_reward = experience_rewards[priority_index]
-        except (ValueError, IndexError):
-            # 如果优先级不在列表中或索引超出范围，使用默认值
-            exp_reward = experience_rewards[1]  # 默认使用中等优先级奖励
-
         try:
-            # 更新目标状态
-            query = "UPDATE goals SET status = '已完成', updated_at = ? WHERE id = ?"
-            execute_update(query, (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), goal_id))
-
-            # 给予经验值奖励
-            if hasattr(self.parent, 'update_user_experience'):
-                self.parent.update_user_experience(exp_reward)
+            # 更新目标状态并按优先级给予经验值奖励（同一事务提交，已完成的目标不重复奖励）
+            result = self.parent.service.complete_goal(goal_id)
+            if result and result[1]:
+                goal_title, exp_reward = result
                 messagebox.showinfo("目标完成", f"恭喜！目标 '{goal_title}' 已完成！\n获得经验值: {exp_reward}")
-            
-            # 通知所有监听器数据已变更
-            if hasattr(self.parent, 'notify_data_changed'):
-                print("📢 通知数据变更：目标状态已更新")
-                self.parent.notify_data_changed("goal_changed")
-            
-            # 立即刷新目标列表
-            self.refresh_goals()
         except Exception as e:
             messagebox.showerror("错误", f"更新目标状态失败: {e}")
     
@@ -355,16 +341,7 @@ class GoalsWindow:
 
         try:
             # 更新目标状态
-            query = "UPDATE goals SET status = '进行中', updated_at = ? WHERE id = ?"
-            execute_update(query, (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), goal_id))
-
-            # 通知所有监听器数据已变更
-            if hasattr(self.parent, 'notify_data_changed'):
-                print("📢 通知数据变更：目标状态已更新")
-                self.parent.notify_data_changed("goal_changed")
-            
-            # 立即刷新目标列表
-            self.refresh_goals()
+            self.parent.service.reopen_goal(goal_id)
         except Exception as e:
             messagebox.showerror("错误", f"更新目标状态失败: {e}")
     
@@ -383,17 +360,8 @@ class GoalsWindow:
         if messagebox.askyesno("确认", f"确定要删除目标 '{goal_title}' 吗？"):
             try:
                 # 删除目标
-                query = "DELETE FROM goals WHERE id = ?"
-                execute_update(query, (goal_id,))
-                
+                self.parent.service.delete_goal(goal_id)
                 messagebox.showinfo("成功", "目标已删除！")
-                # 通知所有监听器数据已变更
-                if hasattr(self.parent, 'notify_data_changed'):
-                    print("📢 通知数据变更：目标已删除")
-                    self.parent.notify_data_changed("goal_deleted")
-                
-                # 立即刷新目标列表
-                self.refresh_goals()
             except Exception as e:
                 messagebox.showerror("错误", f"删除目标失败: {e}")
 
@@ -402,6 +370,7 @@ class EditGoalWindow:
     def __init__(self, parent, goal_id):
         self.parent = parent
         self.goal_id = goal_id
+        self.original = {}
         self.window = tk.Toplevel(parent.window)
         self.window.title("编辑目标")
         self.window.geometry(WINDOW_CONFIG["goals_window"]["edit_geometry"])
@@ -453,11 +422,10 @@ class EditGoalWindow:
     def load_goal_data(self):
         """加载目标数据"""
         try:
-            query = "SELECT * FROM goals WHERE id = ?"
-            result = execute_query(query, (self.goal_id,))
+            goal = get_data_cache().goals.get(self.goal_id)
             
-            if result:
-                goal = result[0]
+            if goal:
+                self.original = goal
                 self.title_entry.insert(0, goal['title'] or "")
                 self.type_var.set(goal['goal_type'] or GOAL_CONFIG["goal_types"][0])
                 self.description_entry.insert(0, goal['description'] or "")
@@ -483,26 +451,11 @@ class EditGoalWindow:
             return
             
         try:
-            # 更新目标
-            query = """
-                UPDATE goals 
-                SET title = ?, goal_type = ?, description = ?, status = ?, 
-                    priority = ?, updated_at = ?
-                WHERE id = ?
-            """
-            execute_update(query, (
-                title, goal_type, description, status, priority,
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S"), self.goal_id
-            ))
-            
-            # 通知所有监听器数据已变更
-            if hasattr(self.parent, 'parent') and hasattr(self.parent.parent, 'notify_data_changed'):
-                print("📢 通知数据变更：目标已编辑")
-                self.parent.parent.notify_data_changed("goal_edited")
-            elif hasattr(self.parent, 'notify_data_changed'):
-                print("📢 通知数据变更：目标已编辑")
-                self.parent.notify_data_changed("goal_edited")
-            
+            # 更新目标（只上报实际修改的字段）
+            if self.parent.parent.service.update_goal(
+                self.goal_id, title, goal_type, description, status, priority, self.original
+            ) is False:
+                messagebox.showerror("错误", "目标不存在，可能已被删除")
             self.window.destroy()
         except Exception as e:
             messagebox.showerror("错误", f"保存目标失败: {e}")
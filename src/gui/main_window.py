@@ -5,7 +5,7 @@
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk
 from datetime import datetime, date
 import sys
 import os
@@ -13,10 +13,12 @@ import os
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from src.utils.database import execute_query, execute_update
-from src.utils.data_manager import format_level_info, format_level_only, calculate_level
+from src.utils.data_manager import format_level_only
+from src.utils.level_state import get_level_state
+from src.utils.search_manager import get_search_manager, ENTITY_NAMES
 
-from src.utils.config import UI_CONFIG, LIFE_COUNTDOWN_CONFIG
+from src.utils.config import UI_CONFIG, LIFE_COUNTDOWN_CONFIG, LEVEL_SYSTEM_CONFIG
+from src.gui.tree_sync import TreeviewSync
 
 
 class MainWindowGUI:
@@ -33,10 +35,16 @@ class MainWindowGUI:
         self.countdown_label = None
         self.goals_tree = None
         self.daily_tasks_tree = None
+        self.goals_tree_sync = None
+        self.daily_tasks_tree_sync = None
         self.summary_content_text = None
         self.stats_text = None
         self.goal_type_var = None
         self.summary_date_var = None
+        self.search_var = None
+        self.search_tree = None
+        self.search_status_label = None
+        self.search_generation = 0
         
         # 创建界面
         self.create_gui()
@@ -118,6 +126,11 @@ class MainWindowGUI:
         notebook.add(stats_frame, text="数据统计")
         self.create_stats_tab(stats_frame)
         
+        # 搜索选项卡
+        search_frame = ttk.Frame(notebook)
+        notebook.add(search_frame, text="搜索")
+        self.create_search_tab(search_frame)
+        
     def create_goals_tab(self, parent):
         """创建目标选项卡"""
         # 目标类型选择
@@ -138,6 +151,7 @@ class MainWindowGUI:
         # 创建树形视图
         columns = ("事项", "子项", "量化指标", "完成")
         self.goals_tree = ttk.Treeview(goals_list_frame, columns=columns, show="headings", height=8)
+        self.goals_tree_sync = TreeviewSync(self.goals_tree)
         
         # 设置列宽度，确保内容能够完整显示
         column_widths = {
@@ -176,6 +190,7 @@ class MainWindowGUI:
         # 创建树形视图
         columns = ("事项", "子项", "完成")
         self.daily_tasks_tree = ttk.Treeview(tasks_list_frame, columns=columns, show="headings", height=8)
+        self.daily_tasks_tree_sync = TreeviewSync(self.daily_tasks_tree)
         
         # 设置列宽度，确保内容能够完整显示
         column_widths = {
@@ -237,6 +252,7 @@ class MainWindowGUI:
         
         ttk.Button(button_frame, text="保存总结", command=self.main_system.save_summary).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(button_frame, text="清空内容", command=self.main_system.clear_summary_form).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="导入旧总结", command=self.main_system.import_summary_files).pack(side=tk.LEFT, padx=(0, 5))
         
     def create_stats_tab(self, parent):
         """创建数据统计选项卡"""
@@ -253,6 +269,75 @@ class MainWindowGUI:
         
         self.stats_text.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
         
+    def create_search_tab(self, parent):
+        """创建搜索选项卡"""
+        # 关键词输入
+        query_frame = ttk.LabelFrame(parent, text="关键词", padding=5)
+        query_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(query_frame, textvariable=self.search_var)
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        search_entry.bind('<Return>', lambda event: self.run_search())
+        ttk.Button(query_frame, text="搜索", command=self.run_search).pack(side=tk.LEFT, padx=(5, 0))
+        
+        # 搜索结果
+        results_frame = ttk.LabelFrame(parent, text="搜索结果", padding=5)
+        results_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
+        
+        columns = ("类型", "标题", "内容")
+        self.search_tree = ttk.Treeview(results_frame, columns=columns, show="headings", height=8)
+        
+        column_widths = {
+            "类型": 60,
+            "标题": 120,
+            "内容": 260
+        }
+        
+        for col in columns:
+            self.search_tree.heading(col, text=col)
+            self.search_tree.column(col, width=column_widths.get(col, 100))
+        
+        # 滚动条
+        scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=self.search_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.search_tree.configure(yscrollcommand=scrollbar.set)
+        
+        self.search_tree.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
+        
+        self.search_status_label = ttk.Label(parent, text="")
+        self.search_status_label.pack(fill=tk.X, padx=5, pady=(0, 5))
+        
+    def run_search(self):
+        """在后台线程中搜索，结果回到Tk线程显示"""
+        query = self.search_var.get().strip()
+        # 只显示最后一次搜索的结果
+        self.search_generation += 1
+        generation = self.search_generation
+        if not query:
+            self.show_search_results(generation, query, [])
+            return
+        
+        self.search_status_label.config(text="搜索中...")
+        self.main_system.background_runner.submit(
+            get_search_manager().search, query,
+            on_success=lambda results: self.show_search_results(generation, query, results),
+            on_error=lambda e: self.search_status_label.config(text=f"搜索失败: {e}")
+        )
+        
+    def show_search_results(self, generation, query, results):
+        """显示搜索结果"""
+        if generation != self.search_generation:
+            return
+        self.search_tree.delete(*self.search_tree.get_children())
+        for result in results:
+            self.search_tree.insert("", tk.END, values=(
+                ENTITY_NAMES.get(result['entity'], result['entity']),
+                result['title'] or "",
+                result['snippet']
+            ))
+        self.search_status_label.config(text=f"找到 {len(results)} 条结果" if query else "")
+        
     def update_time_display(self):
         """更新时间显示"""
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -284,31 +369,29 @@ class MainWindowGUI:
         self.root.after(UI_CONFIG["refresh_interval"], self.update_time_display)
         
     def load_user_level(self):
-        """加载用户等级信息"""
+        """加载用户等级信息，并订阅等级变化"""
+        level_state = get_level_state()
+        level_state.subscribe(self.on_level_changed)
         try:
-            # 从数据库获取当前经验值
-            query = "SELECT experience FROM basic_info WHERE id = 1"
-            result = execute_query(query)
-            
-            if result:
-                current_exp = result[0]['experience'] or 0
-                # 计算当前等级
-                current_level = calculate_level(current_exp, 100)
-                level_info = format_level_only(current_level)
-                
-                # 更新等级显示
-                self.level_label.config(text="Lv."+level_info)
-
-            else:
-                # 如果没有找到用户信息，使用默认值
-                level_info = format_level_only(1)
-                self.level_label.config(text="Lv."+level_info)
-            
+            experience, level = level_state.snapshot()
         except Exception as e:
             print(f"加载用户等级信息失败: {e}")
             # 使用默认值
-            level_info = format_level_only(1)
-            self.level_label.config(text="Lv."+level_info)
+            experience, level = LEVEL_SYSTEM_CONFIG["default_exp"], LEVEL_SYSTEM_CONFIG["default_level"]
+        self.show_user_level(experience, level)
+    
+    def on_level_changed(self, experience, level):
+        """等级变化通知：可能在提交奖励的工作线程（如本地接口）中调用，此时转交Tk线程更新标签"""
+        runner = getattr(self.main_system, 'background_runner', None)
+        if runner is not None and not runner.in_ui_thread():
+            # 显示时重新读取最新值，多个线程的通知先后到达也不会显示旧值
+            runner.call_in_ui(lambda: self.show_user_level(*get_level_state().snapshot()))
+        else:
+            self.show_user_level(experience, level)
+    
+    def show_user_level(self, experience, level):
+        """更新等级显示"""
+        self.level_label.config(text="Lv." + format_level_only(level))
     
     def calculate_life_countdown(self):
         """计算倒计时"""
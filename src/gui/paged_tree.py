@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+分页加载 Treeview 模块
+只加载首屏附近的数据，滚动到底部时再按键集分页加载下一页
+"""
+
+from src.utils.config import UI_CONFIG
+from src.gui.tree_sync import TreeviewSync
+
+
+class PagedTreeview:
+    """
+    分页加载的 Treeview
+
+    - 打开时只加载第一页，打开速度与表的总行数无关
+    - 滚动接近底部时按 (created_at, id) 键集加载下一页，不使用 OFFSET
+    - 数据变更后只重新读取已加载的范围，并通过 TreeviewSync 增量更新
+    """
+
+    def __init__(self, tree, scrollbar, fetch_page, to_row, page_size=None, fetch_rows=None):
+        """
+        Args:
+            tree: ttk.Treeview
+            scrollbar: 与 tree 关联的纵向滚动条
+            fetch_page: fetch_page(after_key, limit) -> 行字典列表
+            to_row: to_row(record) -> (row_id, values, tags)
+            page_size: 每页行数
+            fetch_rows: fetch_rows(row_ids) -> 行字典列表，用于按ID局部更新
+        """
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.fetch_page = fetch_page
+        self.to_row = to_row
+        self.fetch_rows = fetch_rows
+        self.page_size = page_size or UI_CONFIG["page_size"]
+        self.sync = TreeviewSync(tree)
+        self.records = []
+        self.exhausted = False
+        self._prefetch_pending = False
+
+        self.tree.configure(yscrollcommand=self._on_scroll)
+
+    @property
+    def last_key(self):
+        """已加载的最后一行的分页键"""
+        if not self.records:
+            return None
+        last = self.records[-1]
+        return last['created_at'], last['id']
+
+    def load_first_page(self):
+        """重新从第一页开始加载"""
+        self.records = self.fetch_page(None, self.page_size)
+        self.exhausted = len(self.records) < self.page_size
+        self._render()
+
+    def load_next_page(self):
+        """加载下一页"""
+        if self.exhausted:
+            return
+        page = self.fetch_page(self.last_key, self.page_size)
+        self.exhausted = len(page) < self.page_size
+        if page:
+            self.records.extend(page)
+            self._render()
+
+    def refresh(self):
+        """数据变更后重新读取已加载的范围（至少一页）"""
+        limit = max(len(self.records), self.page_size)
+        self.records = self.fetch_page(None, limit)
+        self.exhausted = len(self.records) < limit
+        self._render()
+
+    def patch(self, records, removed_ids=()):
+        """
+        原地更新已加载的行，不重新读取已加载范围
+
+        Args:
+            records: 变更后的行字典列表
+            removed_ids: 已删除（或不再属于该列表）的行ID
+
+        Returns:
+            是否已完成更新；有行尚未加载时返回 False，调用方应改用 refresh()
+        """
+        loaded = {record['id']: index for index, record in enumerate(self.records)}
+        if any(record['id'] not in loaded for record in records):
+            return False
+
+        for record in records:
+            self.records[loaded[record['id']]] = record
+        removed = set(removed_ids)
+        if removed:
+            self.records = [record for record in self.records if record['id'] not in removed]
+
+        self.sync.patch((self.to_row(record) for record in records), removed)
+        return True
+
+    def patch_ids(self, row_ids):
+        """
+        按ID重新读取变更行并原地更新，无法局部更新时退回 refresh()
+
+        Returns:
+            是否为局部更新
+        """
+        if self.fetch_rows is not None:
+            records = self.fetch_rows(row_ids)
+            found = {record['id'] for record in records}
+            if self.patch(records, [row_id for row_id in row_ids if row_id not in found]):
+                return True
+        self.refresh()
+        return False
+
+    def _render(self):
+        self.sync.sync(self.to_row(record) for record in self.records)
+
+    def _on_scroll(self, first, last):
+        """滚动回调：更新滚动条，接近底部时预取下一页"""
+        self.scrollbar.set(first, last)
+        if not self.exhausted and not self._prefetch_pending and float(last) >= UI_CONFIG["page_prefetch"]:
+            # 同一空闲周期内只预取一次
+            self._prefetch_pending = True
+            self.tree.after_idle(self._prefetch)
+
+    def _prefetch(self):
+        self._prefetch_pending = False
+        try:
+            self.load_next_page()
+        except Exception as e:
+            print(f"❌ 加载下一页失败: {e}")
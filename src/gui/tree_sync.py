@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Treeview 增量同步模块
+按行ID对比新旧数据，只插入、更新、移动或删除发生变化的行
+"""
+
+from bisect import bisect_left
+
+
+def _rows_in_order(children, position):
+    """
+    已有行中已按目标顺序排列的最多的行（按目标位置的最长递增子序列），这些行不需要移动
+
+    Args:
+        children: Treeview 中现有行的 iid（按当前顺序）
+        position: iid -> 目标位置
+    """
+    tail_keys = []  # tail_keys[k]：长度为 k+1 的递增子序列的最小结尾（目标位置）
+    tails = []  # 对应结尾在 children 中的下标
+    previous = [None] * len(children)
+    for index, iid in enumerate(children):
+        key = position[iid]
+        length = bisect_left(tail_keys, key)
+        previous[index] = tails[length - 1] if length else None
+        if length == len(tails):
+            tail_keys.append(key)
+            tails.append(index)
+        else:
+            tail_keys[length] = key
+            tails[length] = index
+
+    in_order = set()
+    index = tails[-1] if tails else None
+    while index is not None:
+        in_order.add(children[index])
+        index = previous[index]
+    return in_order
+
+
+class TreeviewSync:
+    """
+    Treeview 增量同步器
+
+    - 每一行以数据库ID作为 Treeview 的 iid
+    - 刷新时与上一次同步的内容对比，未变化的行不产生任何Tk调用
+    - 行不会被删除重建，因此选中状态和滚动位置得以保留
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._rows = {}  # iid -> (values, tags)
+
+    def sync(self, rows):
+        """
+        将 Treeview 同步为给定的行
+
+        Args:
+            rows: 按显示顺序排列的 (row_id, values, tags) 序列
+
+        Returns:
+            (插入数, 更新数, 移动数, 删除数)
+        """
+        tree = self.tree
+        inserted = updated = moved = deleted = 0
+
+        desired = []
+        desired_rows = {}
+        for row_id, values, tags in rows:
+            iid = str(row_id)
+            if iid in desired_rows:
+                continue
+            desired.append(iid)
+            desired_rows[iid] = (tuple(values), tuple(tags))
+
+        # 以 Treeview 的实际内容为准，防止外部修改导致缓存失效
+        children = list(tree.get_children())
+        existing = set(children)
+        self._rows = {iid: row for iid, row in self._rows.items() if iid in existing}
+
+        # 删除不再存在的行
+        removed = [iid for iid in children if iid not in desired_rows]
+        if removed:
+            tree.delete(*removed)
+            deleted = len(removed)
+            removed_set = set(removed)
+            children = [iid for iid in children if iid not in removed_set]
+            for iid in removed:
+                self._rows.pop(iid, None)
+
+        # 当前顺序与目标顺序只对比一次：保持相对顺序的最多的行留在原处，其余的行移到目标位置
+        in_order = _rows_in_order(children, {iid: index for index, iid in enumerate(desired)})
+
+        # 按目标顺序插入、更新和移动；每行放在目标顺序中前一行之后（last 为前一行在 children 中的位置）
+        last = -1
+        for iid in desired:
+            values, tags = desired_rows[iid]
+
+            if iid in existing:
+                if self._rows.get(iid) != (values, tags):
+                    tree.item(iid, values=values, tags=tags)
+                    updated += 1
+                if iid in in_order:
+                    # 不移动的行总在前一行之后
+                    last = children.index(iid, last + 1)
+                else:
+                    old_index = children.index(iid)
+                    del children[old_index]
+                    if old_index < last:
+                        last -= 1
+                    last += 1
+                    children.insert(last, iid)
+                    tree.move(iid, "", last)
+                    moved += 1
+            else:
+                last += 1
+                tree.insert("", last, iid=iid, values=values, tags=tags)
+                children.insert(last, iid)
+                inserted += 1
+
+            self._rows[iid] = (values, tags)
+
+        return inserted, updated, moved, deleted
+
+    def patch(self, rows, removed_ids=()):
+        """
+        只更新指定行，不改变其它行及行的顺序
+
+        Args:
+            rows: 需要更新的 (row_id, values, tags) 序列
+            removed_ids: 需要删除的行ID
+
+        Returns:
+            不在 Treeview 中、无法原地更新的行ID列表（调用方应改为整表同步）
+        """
+        tree = self.tree
+        missing = []
+
+        removed = [str(row_id) for row_id in removed_ids if tree.exists(str(row_id))]
+        if removed:
+            tree.delete(*removed)
+            for iid in removed:
+                self._rows.pop(iid, None)
+
+        for row_id, values, tags in rows:
+            iid = str(row_id)
+            if not tree.exists(iid):
+                missing.append(row_id)
+                continue
+            row = (tuple(values), tuple(tags))
+            if self._rows.get(iid) != row:
+                tree.item(iid, values=row[0], tags=row[1])
+                self._rows[iid] = row
+
+        return missing
+
+    def clear(self):
+        """清空 Treeview"""
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self._rows = {}
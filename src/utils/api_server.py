@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地接口模块
+基于 asyncio 的本机 HTTP/JSON 接口，供同一台机器上的其它工具读写目标、每日任务、经验值和总结
+"""
+
+import asyncio
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from itertools import islice
+from urllib.parse import urlsplit, parse_qs
+from src.utils.database import get_database_manager
+from src.utils.data_cache import get_data_cache
+from src.utils.level_state import get_level_state
+from src.utils.completion_manager import day_key
+from src.utils.summary_store import get_summary_store
+from src.utils.las_service import get_las_service
+from src.utils.config import API_SERVER_CONFIG
+
+# 列表接口依赖的数据版本，以及版本变化时需要失效的本进程缓存
+GOAL_VERSIONS = ("goal",)
+DAILY_TASK_VERSIONS = ("daily_task", "task_completion")
+EXPERIENCE_VERSIONS = ("experience",)
+SUMMARY_VERSIONS = ("summary",)
+STATS_VERSIONS = GOAL_VERSIONS + DAILY_TASK_VERSIONS + EXPERIENCE_VERSIONS
+
+
+class ApiError(Exception):
+    """返回给客户端的错误"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Route:
+    """
+    接口路由
+
+    Attributes:
+        method: HTTP方法
+        pattern: 路径正则（分组作为处理函数的位置参数）
+        handler: handler(query, body, *分组) -> (状态码, 数据)
+        versions: 列表接口依赖的数据版本实体，用于生成 ETag；None 表示不支持 ETag
+    """
+
+    def __init__(self, method, pattern, handler, versions=None):
+        self.method = method
+        self.pattern = re.compile(pattern + "$")
+        self.handler = handler
+        self.versions = versions
+
+
+def record_to_dict(record):
+    return record._asdict() if hasattr(record, "_asdict") else dict(record)
+
+
+def query_flag(query, name):
+    return query.get(name, "") in ("1", "true", "yes")
+
+
+def body_field(body, name, required=True, default=None):
+    if not isinstance(body, dict):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "请求体必须是JSON对象")
+    if required and name not in body:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"缺少字段: {name}")
+    return body.get(name, default)
+
+
+class ApiServer:
+    """
+    本地接口服务器
+
+    - 只监听本机地址；配置了 token 时需带 Authorization: Bearer <token>
+    - 读写通过业务服务完成，数据库操作在固定数量的工作线程中执行，
+      每个线程复用自己的数据库连接（见 DatabaseManager 连接池），不阻塞事件循环
+    - 列表接口返回 ETag（由 data_versions 中的版本号生成），客户端带 If-None-Match 轮询时，
+      数据未变化只需读取版本号并返回 304
+    - POST /api/batch 一次提交多个请求，在同一个工作线程中依次执行，只往返一次
+    - 其它进程（如图形界面）修改数据后版本号变化，本进程的数据缓存随之失效；
+      本进程的写入已通过事件同步到缓存，不会使缓存失效
+    """
+
+    def __init__(self, service=None, host=None, port=None, token=None, db_workers=None):
+        self.service = service or get_las_service()
+        self.host = host or API_SERVER_CONFIG["host"]
+        self.port = port or API_SERVER_CONFIG["port"]
+        self.token = token if token is not None else API_SERVER_CONFIG["token"]
+        self.executor = ThreadPoolExecutor(
+            max_workers=db_workers or API_SERVER_CONFIG["db_workers"],
+            thread_name_prefix="las-api"
+        )
+        self.routes = self._build_routes()
+        self._external_versions = {}  # 实体 -> 上次看到的其它进程造成的版本号
+        self._versions_lock = threading.Lock()
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    def _build_routes(self):
+        return [
+            Route("GET", r"/api/goals", self.list_goals, GOAL_VERSIONS),
+            Route("POST", r"/api/goals", self.add_goal),
+            Route("POST", r"/api/goals/(\d+)/complete", self.complete_goal),
+            Route("POST", r"/api/goals/(\d+)/reopen", self.reopen_goal),
+            Route("DELETE", r"/api/goals/(\d+)", self.delete_goal),
+            Route("GET", r"/api/tasks", self.list_daily_tasks, DAILY_TASK_VERSIONS),
+            Route("POST", r"/api/tasks", self.add_daily_task),
+            Route("POST", r"/api/tasks/complete", self.complete_daily_tasks),
+            Route("POST", r"/api/tasks/(\d+)/complete", self.complete_daily_task),
+            Route("POST", r"/api/tasks/(\d+)/undo", self.reopen_daily_task),
+            Route("DELETE", r"/api/tasks/(\d+)", self.delete_daily_task),
+            Route("GET", r"/api/level", self.get_level, EXPERIENCE_VERSIONS),
+            Route("POST", r"/api/xp", self.add_experience),
+            Route("GET", r"/api/summaries", self.list_summaries, SUMMARY_VERSIONS),
+            Route("POST", r"/api/summaries", self.add_summary),
+            Route("GET", r"/api/stats", self.get_stats, STATS_VERSIONS),
+            Route("GET", r"/api/search", self.search),
+        ]
+
+    # ==================== 接口处理（工作线程中执行） ====================
+
+    def list_goals(self, query, body):
+        goals = self.service.list_goals(query.get("type"), query_flag(query, "all"))
+        return HTTPStatus.OK, {"goals": [record_to_dict(goal) for goal in goals]}
+
+    def add_goal(self, query, body):
+        goal_id = self.service.add_goal(
+            body_field(body, "title"), body_field(body, "goal_type"),
+            body_field(body, "description", False, ""), body_field(body, "priority", False)
+        )
+        if not goal_id:
+            raise ApiError(HTTPStatus.INTERNAL_SERVER_ERROR, "添加目标失败")
+        return HTTPStatus.CREATED, {"id": goal_id}
+
+    def complete_goal(self, query, body, goal_id):
+        result = self.service.complete_goal(int(goal_id))
+        if result is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"未找到目标 {goal_id}")
+        return HTTPStatus.OK, {"id": int(goal_id), "title": result[0], "experience": result[1]}
+
+    def reopen_goal(self, query, body, goal_id):
+        if self.service.reopen_goal(int(goal_id)) is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"未找到目标 {goal_id}")
+        return HTTPStatus.OK, {"id": int(goal_id)}
+
+    def delete_goal(self, query, body, goal_id):
+        if not self.service.delete_goal(int(goal_id)):
+            raise ApiError(HTTPStatus.NOT_FOUND, f"未找到目标 {goal_id}")
+        return HTTPStatus.NO_CONTENT, None
+
+    def list_daily_tasks(self, query, body):
+        tasks = self.service.list_daily_tasks(query_flag(query, "all"))
+        return HTTPStatus.OK, {"day": day_key(), "tasks": [record_to_dict(task) for task in tasks]}
+
+    def add_daily_task(self, query, body):
+        task_id = self.service.add_daily_task(
+            body_field(body, "title"), body_field(body, "description", False, ""),
+            body_field(body, "priority", False)
+        )
+        if not task_id:
+            raise ApiError(HTTPStatus.INTERNAL_SERVER_ERROR, "添加任务失败")
+        return HTTPStatus.CREATED, {"id": task_id}
+
+    def complete_daily_tasks(self, query, body):
+        task_ids = body_field(body, "ids")
+        if not isinstance(task_ids, list) or not all(isinstance(task_id, int) for task_id in task_ids):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "ids 必须是整数列表")
+        results = self.service.complete_daily_tasks(task_ids)
+        return HTTPStatus.OK, {"completed": [
+            {"id": task_id, "title": title, "experience": experience}
+            for task_id, (title, experience) in results.items()
+        ]}
+
+    def complete_daily_task(self, query, body, task_id):
+        result = self.service.complete_daily_task(int(task_id))
+        if result is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"未找到任务 {task_id}")
+        return HTTPStatus.OK, {"id": int(task_id), "title": result[0], "experience": result[1]}
+
+    def reopen_daily_task(self, query, body, task_id):
+        if not self.service.reopen_daily_task(int(task_id)):
+            raise ApiError(HTTPStatus.NOT_FOUND, f"未找到任务 {task_id}")
+        return HTTPStatus.OK, {"id": int(task_id)}
+
+    def delete_daily_task(self, query, body, task_id):
+        if not self.service.delete_daily_task(int(task_id)):
+            raise ApiError(HTTPStatus.NOT_FOUND, f"未找到任务 {task_id}")
+        return HTTPStatus.NO_CONTENT, None
+
+    def get_level(self, query, body):
+        experience, level = self.service.level_info()
+        return HTTPStatus.OK, {"experience": experience, "level": level}
+
+    def add_experience(self, query, body):
+        amount = body_field(body, "amount")
+        if not isinstance(amount, int):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "amount 必须是整数")
+        result = self.service.add_experience(amount)
+        if result is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, "未找到用户基本信息")
+        return HTTPStatus.OK, {"experience": result[0], "level": result[1]}
+
+    def list_summaries(self, query, body):
+        year = query.get("year") or day_key()[:4]
+        if not year.isdigit():
+            raise ApiError(HTTPStatus.BAD_REQUEST, "year 必须是年份")
+        limit = int(query.get("limit") or 100)
+        rows = islice(get_summary_store().iter_year(year), limit)
+        return HTTPStatus.OK, {"year": year, "summaries": list(rows)}
+
+    def add_summary(self, query, body):
+        summary_id = self.service.add_summary(body_field(body, "date"), body_field(body, "content"))
+        return (HTTPStatus.CREATED, {"id": summary_id}) if summary_id else (HTTPStatus.OK, {"id": None, "duplicate": True})
+
+    def get_stats(self, query, body):
+        return HTTPStatus.OK, {"text": self.service.statistics_text()}
+
+    def search(self, query, body):
+        return HTTPStatus.OK, {"results": self.service.search(query.get("q", ""), int(query.get("limit") or 0) or None)}
+
+    # ==================== 分发 ====================
+
+    def current_versions(self, entities):
+        """
+        读取数据版本号（用于 ETag）
+
+        只有其它进程造成的版本号（见 get_external_data_versions）与上次不同的实体才使本进程的缓存失效，
+        本进程的写入已通过事件同步到缓存。
+        """
+        db_manager = get_database_manager()
+        versions = db_manager.get_data_versions(entities)
+        external_versions = db_manager.get_external_data_versions(entities)
+        with self._versions_lock:
+            changed = {entity for entity, version in zip(entities, external_versions)
+                       if self._external_versions.get(entity) != version}
+            for entity, version in zip(entities, external_versions):
+                self._external_versions[entity] = version
+        cache = get_data_cache()
+        if "goal" in changed:
+            cache.goals.invalidate()
+        if changed & {"daily_task", "task_completion"}:
+            cache.daily_tasks.invalidate()
+        if "experience" in changed:
+            get_level_state().reload()
+        return versions
+
+    def make_etag(self, entities):
+        """ETag：当天日期（每日任务的状态按天变化）+ 各实体版本号"""
+        versions = ".".join(str(version) for version in self.current_versions(entities))
+        return f'"{day_key()}-{versions}"'
+
+    def dispatch(self, method, target, body=None, if_none_match=None):
+        """
+        处理一个请求（在工作线程中执行）
+
+        Returns:
+            (状态码, 数据, ETag)
+        """
+        parts = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        path_matched = False
+        for route in self.routes:
+            match = route.pattern.match(parts.path)
+            if not match:
+                continue
+            path_matched = True
+            if route.method != method:
+                continue
+
+            try:
+                etag = None
+                if route.versions:
+                    etag = self.make_etag(route.versions)
+                    if if_none_match and (if_none_match.strip() == "*" or etag in
+                                          [tag.strip() for tag in if_none_match.split(",")]):
+                        return HTTPStatus.NOT_MODIFIED, None, etag
+                status, payload = route.handler(query, body, *match.groups())
+                return status, payload, etag
+            except ApiError as e:
+                return e.status, {"error": e.message}, None
+            except ValueError as e:
+                return HTTPStatus.BAD_REQUEST, {"error": str(e)}, None
+            except Exception as e:
+                print(f"❌ 接口 {method} {parts.path} 失败: {e}")
+                return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}, None
+
+        if path_matched:
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"不支持 {method}"}, None
+        return HTTPStatus.NOT_FOUND, {"error": f"未知接口 {parts.path}"}, None
+
+    def dispatch_batch(self, body):
+        """依次处理一批请求：{"requests": [{"method", "path", "body", "if_none_match"}, ...]}"""
+        requests = body_field(body, "requests")
+        if not isinstance(requests, list):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "requests 必须是列表")
+        if len(requests) > API_SERVER_CONFIG["max_batch_size"]:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"单次最多 {API_SERVER_CONFIG['max_batch_size']} 个请求")
+
+        responses = []
+        for request in requests:
+            if not isinstance(request, dict) or "path" not in request:
+                responses.append({"status": HTTPStatus.BAD_REQUEST, "body": {"error": "缺少字段: path"}})
+                continue
+            status, payload, etag = self.dispatch(
+                request.get("method", "GET").upper(), request["path"],
+                request.get("body"), request.get("if_none_match")
+            )
+            response = {"status": int(status), "body": payload}
+            if etag:
+                response["etag"] = etag
+            responses.append(response)
+        return HTTPStatus.OK, {"responses": responses}
+
+    # ==================== HTTP（事件循环中执行） ====================
+
+    async def read_request(self, reader):
+        """读取一个HTTP请求，连接关闭时返回 None"""
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "请求行格式错误")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= 100:
+                raise ApiError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "请求头过多")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        body = None
+        length = int(headers.get("content-length") or 0)
+        if length > API_SERVER_CONFIG["max_body_bytes"]:
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "请求体过大")
+        if length:
+            raw = await reader.readexactly(length)
+            try:
+                body = json.loads(raw.decode("utf-8"))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                raise ApiError(HTTPStatus.BAD_REQUEST, "请求体不是有效的JSON")
+        return method.upper(), target, version, headers, body
+
+    async def handle_request(self, method, target, headers, body):
+        if self.token and headers.get("authorization") != f"Bearer {self.token}":
+            return HTTPStatus.UNAUTHORIZED, {"error": "未授权"}, None
+
+        loop = asyncio.get_running_loop()
+        if method == "POST" and urlsplit(target).path == "/api/batch":
+            try:
+                status, payload = await loop.run_in_executor(self.executor, self.dispatch_batch, body)
+            except ApiError as e:
+                return e.status, {"error": e.message}, None
+            return status, payload, None
+        return await loop.run_in_executor(
+            self.executor, self.dispatch, method, target, body, headers.get("if-none-match")
+        )
+
+    def write_response(self, writer, status, payload, etag, keep_alive):
+        status = HTTPStatus(status)
+        data = b""
+        if payload is not None and status not in (HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED):
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(data)}",
+            "Cache-Control: no-cache",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if etag:
+            head.append(f"ETag: {etag}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+
+    async def handle_connection(self, reader, writer):
+        """处理一个连接（支持 keep-alive，同一连接上依次处理多个请求）"""
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except ApiError as e:
+                    self.write_response(writer, e.status, {"error": e.message}, None, False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                method, target, version, headers, body = request
+                status, payload, etag = await self.handle_request(method, target, headers, body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                self.write_response(writer, status, payload, etag, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            # 客户端断开，或服务器停止时结束仍保持着的连接
+            pass
+        finally:
+            writer.close()
+
+    # ==================== 启动与停止 ====================
+
+    async def start(self):
+        """在当前事件循环中开始监听"""
+        self._server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        print(f"🌐 本地接口已启动: http://{self.host}:{self.port}/api/")
+        return self._server
+
+    def serve_forever(self):
+        """在当前线程中运行，直到 Ctrl+C（命令行使用）"""
+        async def run():
+            server = await self.start()
+            async with server:
+                await server.serve_forever()
+        try:
+            asyncio.run(run())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.executor.shutdown(wait=True)
+
+    def start_in_thread(self):
+        """在后台线程中运行自己的事件循环（图形界面使用），监听成功后返回"""
+        started = threading.Event()
+        errors = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self.start())
+            except Exception as e:
+                errors.append(e)
+                self._loop.close()
+                started.set()
+                return
+            started.set()
+            self._loop.run_forever()
+            # 关闭监听并结束仍保持着的连接
+            self._server.close()
+            pending = asyncio.all_tasks(self._loop)
+            for task in pending:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="las-api-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+
+    def stop(self, timeout=1):
+        """停止后台线程中的服务器"""
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量导入模块
+从 CSV / JSONL 文件批量导入目标和每日任务
+"""
+
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from src.utils.database import get_database_manager
+from src.utils.config import GOAL_CONFIG, DAILY_TASK_CONFIG
+
+# 每个事务插入的行数
+BULK_BATCH_SIZE = 500
+
+# 报告中最多保留的错误信息条数
+MAX_REPORTED_ERRORS = 20
+
+# 列名别名（与管理窗口的列标题一致）
+FIELD_ALIASES = {
+    "标题": "title",
+    "类型": "goal_type",
+    "描述": "description",
+    "状态": "status",
+    "优先级": "priority",
+    "创建时间": "created_at",
+}
+
+GOAL_INSERT = """
+    INSERT INTO goals (title, goal_type, description, status, priority, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+DAILY_TASK_INSERT = """
+    INSERT INTO daily_tasks (title, description, status, priority,
+                           experience_reward, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def iter_records(path):
+    """
+    逐行读取 CSV（首行为列名）或 JSONL（每行一个JSON对象）文件
+
+    Yields:
+        (行号, {列名: 值})，无法解析的行为 (行号, None)
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+    elif extension in (".jsonl", ".ndjson"):
+        with open(path, encoding='utf-8-sig') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = None
+                yield line_number, record if isinstance(record, dict) else None
+    else:
+        raise ValueError(f"不支持的文件格式: {extension or path}（仅支持 .csv / .jsonl）")
+
+
+def normalize_record(record):
+    """列名转为数据库字段名，值转为去掉首尾空白的字符串"""
+    normalized = {}
+    for name, value in record.items():
+        if name is None:
+            continue
+        name = name.strip()
+        normalized[FIELD_ALIASES.get(name, name.lower())] = "" if value is None else str(value).strip()
+    return normalized
+
+
+def check_choice(field, value, options):
+    """取值必须是 options 之一（批量导入和 LASService 的增改共用）"""
+    if value not in options:
+        raise ValueError(f"{field} 必须是 {'/'.join(options)} 之一，而不是 '{value or ''}'")
+    return value
+
+
+def choice_field(record, field, config, options_key, default_key):
+    """取值必须是配置中的选项之一，为空时使用默认值"""
+    return check_choice(field, record.get(field) or config[default_key], config[options_key])
+
+
+def created_at_field(record, current_time):
+    """可选的创建时间（保留原来的时间），格式 YYYY-MM-DD HH:MM:SS"""
+    value = record.get("created_at")
+    if not value:
+        return current_time
+    try:
+        datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        raise ValueError(f"created_at 格式应为 YYYY-MM-DD HH:MM:SS，而不是 '{value}'")
+    return value
+
+
+def goal_row(record, current_time):
+    """校验一条目标记录，返回插入 goals 的参数"""
+    title = record.get("title")
+    if not title:
+        raise ValueError("缺少标题")
+    goal_type = check_choice("goal_type", record.get("goal_type"), GOAL_CONFIG["goal_types"])
+    return (
+        title, goal_type, record.get("description", ""),
+        choice_field(record, "status", GOAL_CONFIG, "status_options", "default_status"),
+        choice_field(record, "priority", GOAL_CONFIG, "priority_levels", "default_priority"),
+        created_at_field(record, current_time), current_time
+    )
+
+
+def daily_task_row(record, current_time):
+    """校验一条每日任务记录，返回插入 daily_tasks 的参数（经验值奖励按优先级）"""
+    title = record.get("title")
+    if not title:
+        raise ValueError("缺少标题")
+    priority = choice_field(record, "priority", DAILY_TASK_CONFIG, "priority_levels", "default_priority")
+    exp_reward = DAILY_TASK_CONFIG["experience_reward"][DAILY_TASK_CONFIG["priority_levels"].index(priority)]
+    return (
+        title, record.get("description", ""), DAILY_TASK_CONFIG["default_status"], priority,
+        exp_reward, created_at_field(record, current_time), current_time
+    )
+
+
+def format_import_report(report):
+    """导入报告 -> 提示文本"""
+    lines = [f"新增 {report['inserted']} 行，跳过 {report['skipped']} 行，"
+             f"耗时 {report['seconds']:.2f}s（{report['rows_per_second']:.0f} 行/秒）"]
+    lines.extend(report["errors"])
+    if report["skipped"] > len(report["errors"]):
+        lines.append(f"……另有 {report['skipped'] - len(report['errors'])} 行无效")
+    return "\n".join(lines)
+
+
+class BulkImporter:
+    """
+    目标 / 每日任务批量导入器
+
+    - 文件逐行读取并校验，只在内存中保留当前一批；每批在一个事务中 executemany 插入
+    - 校验失败的行跳过并记录行号和原因，不影响其它行
+    - 导入的目标状态直接写入（导入"已完成"的目标不奖励经验值）；每日任务总是以未完成导入
+    - 不发送数据变更通知，由调用方在导入结束后统一通知一次
+    """
+
+    def __init__(self, db_manager=None, batch_size=BULK_BATCH_SIZE):
+        self.db_manager = db_manager or get_database_manager()
+        self.batch_size = batch_size
+
+    def _save_batch(self, insert_sql, rows):
+        """插入一批行（同一事务），返回插入的行数"""
+        with self.db_manager.transaction():
+            return self.db_manager.connection.executemany(insert_sql, rows).rowcount
+
+    def import_file(self, path, table):
+        """
+        导入一个文件
+
+        Args:
+            table: 'goals' 或 'daily_tasks'
+
+        Returns:
+            {'parsed', 'inserted', 'skipped', 'errors', 'seconds', 'rows_per_second'}
+        """
+        if table == "goals":
+            insert_sql, make_row = GOAL_INSERT, goal_row
+        elif table == "daily_tasks":
+            insert_sql, make_row = DAILY_TASK_INSERT, daily_task_row
+        else:
+            raise ValueError(f"不支持导入到 {table}")
+
+        start_time = time.perf_counter()
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        report = {"parsed": 0, "inserted": 0, "skipped": 0, "errors": []}
+        pending = []
+        for line_number, record in iter_records(path):
+            report["parsed"] += 1
+            try:
+                if record is None:
+                    raise ValueError("不是有效的JSON对象")
+                pending.append(make_row(normalize_record(record), current_time))
+            except ValueError as e:
+                report["skipped"] += 1
+                if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                    report["errors"].append(f"第 {line_number} 行: {e}")
+                continue
+            if len(pending) >= self.batch_size:
+                report["inserted"] += self._save_batch(insert_sql, pending)
+                pending = []
+        if pending:
+            report["inserted"] += self._save_batch(insert_sql, pending)
+
+        report["seconds"] = time.perf_counter() - start_time
+        report["rows_per_second"] = report["inserted"] / report["seconds"] if report["seconds"] > 0 else 0
+        print(f"✅ 批量导入 {table} 完成: {os.path.basename(path)} 新增 {report['inserted']} 行, "
+              f"跳过 {report['skipped']} 行, 耗时 {report['seconds']:.2f}s "
+              f"({report['rows_per_second']:.0f} 行/秒)")
+        return report
+
+    def import_goals(self, path):
+        """批量导入目标"""
+        return self.import_file(path, "goals")
+
+    def import_daily_tasks(self, path):
+        """批量导入每日任务"""
+        return self.import_file(path, "daily_tasks")
+
+
+# 全局批量导入器实例
+_bulk_importer = None
+
+def get_bulk_importer():
+    """获取批量导入器实例"""
+    global _bulk_importer
+    if _bulk_importer is None:
+        _bulk_importer = BulkImporter()
+    return _bulk_importer
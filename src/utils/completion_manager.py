@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+每日任务完成记录模块
+每次完成任务写入一条 task_completions 记录，任务当天的状态由当天是否有完成记录决定
+"""
+
+from datetime import datetime, timedelta
+from src.utils.database import get_database_manager
+from src.utils.config import DAILY_TASK_CONFIG
+
+# 每日任务及其当天状态（参数：日期），status/completed_at 来自当天的完成记录
+DAILY_TASKS_WITH_STATUS_SQL = """
+    SELECT t.id, t.title, t.description, t.priority,
+           CASE WHEN c.task_id IS NULL THEN '未完成' ELSE '已完成' END AS status,
+           t.experience_reward, t.created_at, t.updated_at, c.completed_at
+    FROM daily_tasks t
+    LEFT JOIN task_completions c ON c.task_id = t.id AND c.completed_on = ?
+"""
+
+
+def logical_date(moment=None):
+    """
+    某一时刻（默认现在）所属的逻辑日期
+
+    每天 DAILY_TASK_CONFIG["auto_reset_hour"] 点开始新的一天，此前仍算前一天；
+    任务的当天状态、每日重置和经验值日汇总都按逻辑日期划分
+    """
+    moment = moment or datetime.now()
+    return (moment - timedelta(hours=DAILY_TASK_CONFIG["auto_reset_hour"])).date()
+
+
+def day_key(day=None):
+    """日期键，例如 2025-08-01；默认今天（逻辑日期）"""
+    return (day or logical_date()).strftime("%Y-%m-%d")
+
+
+class CompletionManager:
+    """
+    每日任务完成记录管理器
+
+    - 完成任务时写入 (task_id, 日期) 唯一的记录，同一天重复完成不会重复记录
+    - 每日重置不再改写任务表，新的一天没有完成记录，任务自然变为"未完成"
+    - 历史记录保留，可用于按日统计和连续完成天数
+    """
+
+    def __init__(self, db_manager=None):
+        self.db_manager = db_manager or get_database_manager()
+
+    def record_completion(self, task_id, experience=0, completed_at=None):
+        """
+        记录任务完成
+
+        Returns:
+            是否新增了记录（当天已完成过时返回 False）
+        """
+        completed_at = completed_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor = self.db_manager.connection.execute(
+            "INSERT OR IGNORE INTO task_completions (task_id, completed_on, completed_at, experience) "
+            "VALUES (?, ?, ?, ?)",
+            (task_id, day_key(logical_date(datetime.strptime(completed_at, "%Y-%m-%d %H:%M:%S"))),
+             completed_at, experience)
+        )
+        return cursor.rowcount > 0
+
+    def remove_completion(self, task_id, day=None):
+        """撤销任务在某天（默认今天）的完成记录"""
+        return self.db_manager.execute_update(
+            "DELETE FROM task_completions WHERE task_id = ? AND completed_on = ?",
+            (task_id, day_key(day))
+        )
+
+    def is_completed(self, task_id, day=None):
+        """任务在某天（默认今天）是否已完成"""
+        rows = self.db_manager.execute_query(
+            "SELECT 1 FROM task_completions WHERE completed_on = ? AND task_id = ?",
+            (day_key(day), task_id)
+        )
+        return bool(rows)
+
+    def completed_task_ids(self, day=None):
+        """某天（默认今天）已完成的任务ID集合"""
+        rows = self.db_manager.execute_query(
+            "SELECT task_id FROM task_completions WHERE completed_on = ?", (day_key(day),)
+        )
+        return {row['task_id'] for row in rows}
+
+    def get_daily_counts(self, days=30):
+        """最近若干天每天完成的任务数和获得的经验值（按日期升序）"""
+        start_day = day_key(logical_date() - timedelta(days=days - 1))
+        return self.db_manager.execute_query(
+            "SELECT completed_on AS day, COUNT(*) AS completed, SUM(experience) AS experience "
+            "FROM task_completions WHERE completed_on >= ? GROUP BY completed_on ORDER BY completed_on",
+            (start_day,)
+        )
+
+    def get_streak(self, task_id, day=None):
+        """任务截至某天（默认今天）的连续完成天数；当天尚未完成时从前一天算起"""
+        rows = self.db_manager.execute_query(
+            "SELECT completed_on FROM task_completions WHERE task_id = ? AND completed_on <= ? "
+            "ORDER BY completed_on DESC",
+            (task_id, day_key(day))
+        )
+        completed_days = [row['completed_on'] for row in rows]
+        current = day or logical_date()
+        if completed_days and completed_days[0] != day_key(current):
+            current -= timedelta(days=1)
+
+        streak = 0
+        for completed_on in completed_days:
+            if completed_on != day_key(current):
+                break
+            streak += 1
+            current -= timedelta(days=1)
+        return streak
+
+
+# 全局完成记录管理器实例
+_completion_manager = None
+
+def get_completion_manager():
+    """获取完成记录管理器实例"""
+    global _completion_manager
+    if _completion_manager is None:
+        _completion_manager = CompletionManager()
+    return _completion_manager
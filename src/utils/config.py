@@ -21,6 +21,13 @@ def get_app_path():
 # ==================== 数据库配置 ====================
 DATABASE_NAME = os.path.join(get_app_path(), "doc", "las_database.db")
 
+DATABASE_CONFIG = {
+    "journal_mode": "WAL",         # WAL模式：读写互不阻塞
+    "synchronous": "NORMAL",       # WAL模式下NORMAL即可保证一致性
+    "busy_timeout": 5000,          # 锁等待超时（毫秒）
+    "iter_chunk_size": 500         # iter_query 每次从游标读取的行数
+}
+
 # ==================== 窗口配置 ====================
 WINDOW_CONFIG = {
     # 主窗口配置
@@ -86,6 +93,27 @@ DAILY_TASK_CONFIG = {
     "enable_daily_reset": True
 }
 
+# ==================== 定时任务配置 ====================
+SCHEDULER_CONFIG = {
+    "max_wait_seconds": 300  # 调度线程单次最长睡眠时间，醒来后按当前时间重新检查（应对休眠、改时间）
+}
+
+# ==================== 本地接口配置 ====================
+API_SERVER_CONFIG = {
+    "enabled": False,         # 启动图形界面时是否同时启动本地接口
+    "host": "127.0.0.1",      # 只监听本机
+    "port": 8765,
+    "token": None,            # 设置后请求需带 Authorization: Bearer <token>
+    "db_workers": 2,          # 处理数据库请求的线程数（每个线程复用自己的数据库连接）
+    "max_batch_size": 50,     # /api/batch 单次最多包含的请求数
+    "max_body_bytes": 1 << 20
+}
+
+# ==================== 后台任务配置 ====================
+BACKGROUND_CONFIG = {
+    "max_workers": 2         # 后台工作线程数（回调在队列非空时才排定到Tk线程处理，不轮询）
+}
+
 # ==================== 总结配置 ====================
 # 总结相关配置已移除，使用默认配置
 
@@ -96,49 +124,13 @@ UI_CONFIG = {
     "tree_height": 200,
     "text_height": 150,
     "refresh_interval": 1000,  # 24小时刷新间隔（毫秒）
+    "page_size": 200,          # 管理窗口列表每页加载的行数
+    "page_prefetch": 0.9,      # 滚动到该位置（0~1）时加载下一页
+    "event_debounce_ms": 0,    # 数据变更事件合并延迟（毫秒），0表示在下一个空闲周期分发
     "time_format": "%Y.%m.%d %H:%M:%S",
     "date_format": "%Y-%m-%d"
 }
 
-# ==================== 数据库表配置 ====================
-DATABASE_TABLES = {
-    "basic_info": '''
-        CREATE TABLE IF NOT EXISTS basic_info (
-            id INTEGER PRIMARY KEY,
-            start_date TEXT,
-            experience INTEGER DEFAULT 0,
-            level INTEGER DEFAULT 1,
-            created_at TEXT,
-            updated_at TEXT
-        )
-    ''',
-    "goals": '''
-        CREATE TABLE IF NOT EXISTS goals (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT,
-            goal_type TEXT,
-            description TEXT,
-            status TEXT DEFAULT '进行中',
-            priority TEXT DEFAULT '中',
-            created_at TEXT,
-            updated_at TEXT
-        )
-    ''',
-    "daily_tasks": '''
-        CREATE TABLE IF NOT EXISTS daily_tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT,
-            description TEXT,
-            priority TEXT DEFAULT '中',
-            status TEXT DEFAULT '未完成',
-            experience_reward INTEGER DEFAULT 10,
-            created_at TEXT,
-            updated_at TEXT
-        )
-    ''',
-
-}
-
 # ==================== 默认数据配置 ====================
 DEFAULT_DATA = {
     "basic_info": {
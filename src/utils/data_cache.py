@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据缓存模块
+在内存中缓存目标和每日任务，主窗口列表与编辑窗口从缓存读取，不再各自查询数据库
+"""
+
+import threading
+from collections import namedtuple
+
+from src.utils.database import iter_query, get_database_manager
+from src.utils.completion_manager import DAILY_TASKS_WITH_STATUS_SQL, day_key
+
+
+GOAL_FIELDS = ("id", "title", "goal_type", "description", "status", "priority", "created_at", "updated_at")
+DAILY_TASK_FIELDS = ("id", "title", "description", "priority", "status", "experience_reward",
+                     "created_at", "updated_at", "completed_at")
+
+
+def _record_type(name, fields):
+    """创建紧凑的行记录类型（namedtuple），同时支持 record['字段'] 的字典式读取"""
+    base = namedtuple(name, fields)
+
+    class Record(base):
+        __slots__ = ()
+
+        def __getitem__(self, key):
+            if isinstance(key, str):
+                return getattr(self, key)
+            return base.__getitem__(self, key)
+
+        def get(self, key, default=None):
+            return getattr(self, key, default)
+
+    Record.__name__ = Record.__qualname__ = name
+    return Record
+
+
+GoalRecord = _record_type("GoalRecord", GOAL_FIELDS)
+DailyTaskRecord = _record_type("DailyTaskRecord", DAILY_TASK_FIELDS)
+
+
+# 数据版本实体 -> 其它进程修改后需要通知的事件（不带ID，缓存收到后整表失效）
+EXTERNAL_CHANGE_EVENTS = {
+    "goal": "goal_changed",
+    "daily_task": "daily_task_changed",
+    "task_completion": "daily_task_changed",
+    "experience": "experience_changed",
+}
+
+
+class EntityCache:
+    """
+    单个表的读穿透缓存
+
+    - 第一次读取时整表加载，之后所有读取都在内存中完成
+    - 记录以 namedtuple 保存，按ID索引
+    - 管理窗口的分页列表直接按 created_at 索引查询数据库（database.fetch_page_by_created），不经过缓存，
+      打开时不必先整表加载
+    - 写入后通过 apply_changes / reload / remove 同步，整表失效后下次读取时重新加载
+    """
+
+    def __init__(self, table_name, record_type, select_sql=None, id_column="id", params=None):
+        """
+        Args:
+            table_name: 表名
+            record_type: 记录类型
+            select_sql: 加载用的查询（默认读取 record_type 的全部字段），不含 WHERE；
+                列顺序须与 record_type 的字段一致（按元组直接构造记录）
+            id_column: 按ID重新读取时使用的列名
+            params: params() -> 查询参数元组，每次读取时调用；
+                取值变化（如每日任务的当天日期）时整表重新加载
+        """
+        self.table_name = table_name
+        self.record_type = record_type
+        self.id_column = id_column
+        self.params = params or tuple
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._rows = None  # id -> record，None 表示尚未加载
+        self._loaded_params = None  # 加载时的查询参数
+        self._select_sql = select_sql or f"SELECT {', '.join(record_type._fields)} FROM {table_name}"
+
+    @property
+    def loaded(self):
+        return self._rows is not None
+
+    def _iter_records(self, query, params):
+        """逐批读取并直接由元组构造记录（不经过 dict）"""
+        return map(self.record_type._make, iter_query(query, params, row_mode="tuple"))
+
+    def _ensure_loaded(self):
+        params = tuple(self.params())
+        if self._rows is None or params != self._loaded_params:
+            self.misses += 1
+            self._rows = {record.id: record for record in self._iter_records(self._select_sql, params)}
+            self._loaded_params = params
+        else:
+            self.hits += 1
+
+    def all(self):
+        """返回全部记录"""
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._rows.values())
+
+    def get(self, row_id):
+        """按ID读取一条记录，不存在时返回 None"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._rows.get(row_id)
+
+    def get_many(self, row_ids):
+        """按ID读取多条记录，不存在的ID忽略"""
+        with self._lock:
+            self._ensure_loaded()
+            return [self._rows[row_id] for row_id in row_ids if row_id in self._rows]
+
+    def select(self, predicate=None, key=None, reverse=False):
+        """
+        在内存中筛选并排序
+
+        Args:
+            predicate: predicate(record) -> bool，None 表示全部
+            key: 排序键函数，None 表示不排序
+            reverse: 是否倒序
+        """
+        records = self.all()
+        if predicate is not None:
+            records = [record for record in records if predicate(record)]
+        if key is not None:
+            records.sort(key=key, reverse=reverse)
+        return records
+
+    def apply_changes(self, row_id, changes):
+        """
+        写穿透：把已提交的字段修改直接应用到缓存记录
+
+        Returns:
+            是否已应用；记录未缓存或包含未知字段时返回 False，调用方应改用 reload
+        """
+        with self._lock:
+            if self._rows is None:
+                return True  # 尚未加载，下次读取时自然是最新数据
+            record = self._rows.get(row_id)
+            if record is None or not set(changes) <= set(record._fields):
+                return False
+            self._rows[row_id] = record._replace(**changes)
+            return True
+
+    def reload(self, row_ids):
+        """从数据库重新读取指定行（新增、删除或修改内容未知的行）"""
+        row_ids = list(row_ids)
+        with self._lock:
+            if self._rows is None or not row_ids:
+                return
+            params = tuple(self.params())
+            if params != self._loaded_params:
+                # 查询参数已变化（如跨过了一天），其余行也已过期
+                self._rows = None
+                return
+            self.misses += 1
+            placeholders = ", ".join("?" * len(row_ids))
+            records = self._iter_records(f"{self._select_sql} WHERE {self.id_column} IN ({placeholders})",
+                                         params + tuple(row_ids))
+            found = set()
+            for record in records:
+                found.add(record.id)
+                self._rows[record.id] = record
+            for row_id in row_ids:
+                if row_id not in found:
+                    self._rows.pop(row_id, None)
+
+    def remove(self, row_ids):
+        """从缓存中移除指定行"""
+        with self._lock:
+            if self._rows is None:
+                return
+            for row_id in row_ids:
+                self._rows.pop(row_id, None)
+
+    def invalidate(self):
+        """整表失效，下次读取时重新加载"""
+        with self._lock:
+            self._rows = None
+
+    def stats(self):
+        """命中统计"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "rows": len(self._rows) if self._rows is not None else 0,
+        }
+
+
+class DataCache:
+    """
+    目标与每日任务的数据缓存
+
+    注册为事件监听器（排在界面监听器之前），根据事件携带的ID和修改字段同步缓存：
+    - 有修改字段：直接写入缓存记录，不查询数据库
+    - 新增或修改内容未知：按ID重新读取这些行
+    - 删除：从缓存移除
+    - 没有ID（如每日重置）：整表失效
+
+    其它进程（命令行、另一个界面）的修改不会产生事件，由 check_external_changes() 比较数据版本号发现。
+    """
+
+    def __init__(self):
+        self.goals = EntityCache("goals", GoalRecord)
+        # 每日任务的 status/completed_at 由当天（逻辑日期）的完成记录得出，日期变化后整表重新加载
+        self.daily_tasks = EntityCache(
+            "daily_tasks", DailyTaskRecord, DAILY_TASKS_WITH_STATUS_SQL, "t.id", lambda: (day_key(),)
+        )
+        self.entities = {"goal": self.goals, "daily_task": self.daily_tasks}
+        self._external_versions = None  # 上次检查时其它进程造成的版本号
+        self._version_lock = threading.Lock()
+
+    def on_data_batch(self, events):
+        """按一批数据变更事件同步缓存"""
+        for event in events:
+            cache = self.entities.get(event.entity)
+            if cache is not None:
+                self.apply_event(cache, event)
+
+    def apply_event(self, cache, event):
+        """把单个事件应用到对应实体的缓存"""
+        if not event.ids:
+            cache.invalidate()
+        elif event.event_type.endswith("_deleted"):
+            cache.remove(event.ids)
+        elif event.changes and not event.event_type.endswith("_added"):
+            stale = [row_id for row_id in event.ids if not cache.apply_changes(row_id, event.changes)]
+            cache.reload(stale)
+        else:
+            cache.reload(event.ids)
+
+    def check_external_changes(self):
+        """
+        检查自上次调用以来其它进程是否修改了数据（首次调用只记录当前版本号）
+
+        只比较 data_versions 中其它进程造成的版本号，不读取数据；本进程的修改已通过事件同步，不会重复报告。
+
+        Returns:
+            需要通知的事件类型集合，通知后缓存随事件整表失效、界面随之刷新
+        """
+        entities = tuple(EXTERNAL_CHANGE_EVENTS)
+        versions = dict(zip(entities, get_database_manager().get_external_data_versions(entities)))
+        with self._version_lock:
+            previous, self._external_versions = self._external_versions, versions
+        if previous is None:
+            return set()
+        return {EXTERNAL_CHANGE_EVENTS[entity] for entity in entities if versions[entity] != previous[entity]}
+
+    def invalidate(self):
+        """清空全部缓存"""
+        for cache in self.entities.values():
+            cache.invalidate()
+
+    def stats(self):
+        """各实体的命中统计"""
+        return {entity: cache.stats() for entity, cache in self.entities.items()}
+
+
+# 全局数据缓存实例
+_data_cache = None
+
+
+def get_data_cache():
+    """获取全局数据缓存"""
+    global _data_cache
+    if _data_cache is None:
+        _data_cache = DataCache()
+    return _data_cache
+
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据导出模块
+把数据库中的数据逐批导出为 JSONL / CSV 文件（每张表一个文件）
+"""
+
+import csv
+import json
+import os
+import time
+from src.utils.database import get_database_manager
+
+# 导出的表（派生的经验值汇总表可由 xp_events 重新生成，不导出）
+EXPORT_TABLES = ["basic_info", "goals", "daily_tasks", "task_completions", "xp_events", "summaries"]
+
+EXPORT_FORMATS = ("jsonl", "csv")
+
+# 每次从游标读取的行数
+EXPORT_CHUNK_SIZE = 1000
+
+
+def quote_identifier(name):
+    """SQL标识符加双引号（列名可能是关键字或含特殊字符）"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+class DataExporter:
+    """
+    数据导出器
+
+    - 每张表通过 iter_query 按ID顺序 fetchmany 分批读取（元组行），边读边写，内存占用与数据量无关
+    - 所有表在同一个只读快照（DatabaseManager.read_snapshot）中导出，得到同一时刻的一致快照（WAL 模式下不阻塞界面写入）
+    - 先写入临时文件，完成后再替换目标文件，中途失败不会留下不完整的导出
+    """
+
+    def __init__(self, db_manager=None, chunk_size=EXPORT_CHUNK_SIZE):
+        self.db_manager = db_manager or get_database_manager()
+        self.chunk_size = chunk_size
+
+    def table_columns(self, table):
+        """表的列名（按建表顺序）"""
+        return [row[1] for row in self.db_manager.iter_query(
+            f"PRAGMA table_info({quote_identifier(table)})", row_mode="tuple"
+        )]
+
+    def export_table(self, table, path, fmt):
+        """导出一张表到文件，返回导出的行数"""
+        columns = self.table_columns(table)
+        rows = self.db_manager.iter_query(
+            f"SELECT {', '.join(quote_identifier(column) for column in columns)} "
+            f"FROM {quote_identifier(table)} ORDER BY id",
+            chunk_size=self.chunk_size, row_mode="tuple"
+        )
+        count = 0
+        temp_path = path + ".tmp"
+        try:
+            if fmt == "csv":
+                # 带BOM，Excel 可直接打开中文
+                with open(temp_path, 'w', newline='', encoding='utf-8-sig') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(columns)
+                    for row in rows:
+                        writer.writerow(row)
+                        count += 1
+            else:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    for row in rows:
+                        f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n")
+                        count += 1
+            os.replace(temp_path, path)
+        except BaseException:
+            rows.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return count
+
+    def export(self, out_dir, fmt="jsonl", tables=None):
+        """
+        导出到目录（<表名>.jsonl 或 <表名>.csv）
+
+        Returns:
+            {'tables': {表名: 行数}, 'rows', 'bytes', 'seconds'}
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"不支持的导出格式: {fmt}（仅支持 {' / '.join(EXPORT_FORMATS)}）")
+        tables = tables or EXPORT_TABLES
+        unknown = [table for table in tables if table not in EXPORT_TABLES]
+        if unknown:
+            raise ValueError(f"不支持导出的表: {', '.join(unknown)}")
+
+        os.makedirs(out_dir, exist_ok=True)
+        start_time = time.perf_counter()
+        report = {"tables": {}, "rows": 0, "bytes": 0}
+
+        with self.db_manager.read_snapshot():
+            for table in tables:
+                path = os.path.join(out_dir, f"{table}.{fmt}")
+                count = self.export_table(table, path, fmt)
+                report["tables"][table] = count
+                report["rows"] += count
+                report["bytes"] += os.path.getsize(path)
+                print(f"📤 {table}: {count} 行 -> {path}")
+
+        report["seconds"] = time.perf_counter() - start_time
+        print(f"✅ 数据导出完成: {report['rows']} 行, {report['bytes'] / 1024:.0f} KB, "
+              f"耗时 {report['seconds']:.2f}s")
+        return report
+
+
+# 全局数据导出器实例
+_data_exporter = None
+
+def get_data_exporter():
+    """获取数据导出器实例"""
+    global _data_exporter
+    if _data_exporter is None:
+        _data_exporter = DataExporter()
+    return _data_exporter
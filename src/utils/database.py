@@ -5,65 +5,245 @@
 提供数据库连接、查询和更新功能
 """
 
+import glob
 import sqlite3
 import os
 import threading
 import time
-from datetime import datetime, date
-from src.utils.config import DATABASE_NAME, DATABASE_TABLES
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+from src.utils.config import DATABASE_NAME, DATABASE_CONFIG, DAILY_TASK_CONFIG
+from src.utils.migrations import run_migrations, ensure_search_index
+from src.utils.scheduler import get_scheduler
+
+# iter_query 的行格式
+ROW_MODES = ("row", "tuple", "namedtuple", "dict")
+
+
+def process_alive(pid):
+    """进程是否仍在运行（用于判断运行标记是否为已退出进程留下的）"""
+    if pid <= 0:
+        return False
+    if os.name == "nt":
+        # Windows 上 os.kill 会结束进程，改为查询进程退出码
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        try:
+            exit_code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+            return exit_code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
 
 class DatabaseManager:
-    """数据库管理器"""
+    """
+    数据库管理器
+    
+    连接池说明：
+    - 每个线程持有一个独立的连接（首次使用时创建），避免跨线程共享sqlite3对象
+    - 数据库使用WAL日志模式，GUI线程、每日重置线程等可以同时读写
+    - close() 会关闭连接池中的全部连接
+    
+    事务说明：
+    - 连接处于自动提交模式，单条 execute_update/execute_insert 各自提交
+    - transaction() 内的所有语句在退出时统一提交一次（一次fsync），出错则整体回滚
+    - transaction() 可以嵌套，内层使用SAVEPOINT，只回滚内层的修改
+    - 事务内执行失败的语句会抛出异常，以便外层事务回滚
+    - read_snapshot() 内的多次查询读到同一时刻的数据（只读，不获取写锁）
+    - call_after_commit() 登记的回调在最外层事务提交后执行，回滚时丢弃
+    - 事务持有写锁期间记录本进程提交引起的数据版本号增量，
+      据此区分其它进程的修改（见 get_external_data_versions）
+    """
     
     def __init__(self, db_path=None):
         self.db_path = db_path or DATABASE_NAME
-        self.connection = None
+        self._local = threading.local()
+        self._connections = []
+        self._pool_lock = threading.Lock()
+        self._own_versions = {}  # 实体 -> 本进程提交引起的版本号增量
+        self._version_lock = threading.Lock()
+        self._track_versions = False  # 迁移完成（data_versions 存在）后才开始记录
         self.init_database()
     
+    @property
+    def connection(self):
+        """当前线程的数据库连接"""
+        return self.get_connection()
+    
+    def get_connection(self):
+        """获取（必要时创建）当前线程的数据库连接"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._create_connection()
+            self._local.connection = connection
+            with self._pool_lock:
+                self._connections.append(connection)
+        return connection
+    
+    def release_connection(self):
+        """关闭并归还当前线程的数据库连接（线程结束前调用）"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            return
+        self._local.connection = None
+        with self._pool_lock:
+            if connection in self._connections:
+                self._connections.remove(connection)
+        connection.close()
+    
+    def _create_connection(self):
+        """创建新的数据库连接并设置连接参数"""
+        # 连接只在创建它的线程中使用，关闭时可能由其他线程统一关闭，故关闭同线程检查
+        connection = sqlite3.connect(
+            self.db_path,
+            timeout=DATABASE_CONFIG["busy_timeout"] / 1000,
+            check_same_thread=False,
+            isolation_level=None  # 自动提交模式，事务由 transaction() 显式管理
+        )
+        connection.row_factory = sqlite3.Row  # 使查询结果可以通过列名访问
+        connection.execute(f"PRAGMA busy_timeout = {int(DATABASE_CONFIG['busy_timeout'])}")
+        connection.execute(f"PRAGMA synchronous = {DATABASE_CONFIG['synchronous']}")
+        return connection
+    
+    @property
+    def dirty_marker_path(self):
+        """本进程的运行标记文件路径：打开数据库时创建，正常关闭时删除（文件名带进程号，每个进程一个）"""
+        return f"{self.db_path}.running.{os.getpid()}"
+    
+    def _stale_dirty_markers(self):
+        """
+        已退出的进程留下的运行标记（即上次未正常关闭）
+        
+        仍在运行的其它进程（如同时打开的图形界面和命令行）的标记不算在内，也不会被删除。
+        """
+        stale = []
+        prefix = self.db_path + ".running"
+        for path in glob.glob(glob.escape(prefix) + "*"):
+            suffix = path[len(prefix):]
+            try:
+                if suffix:
+                    pid = int(suffix.lstrip("."))
+                else:
+                    # 旧版本的标记文件不带进程号，进程号写在文件内容中
+                    with open(path, encoding="utf-8") as f:
+                        pid = int(f.read().strip() or 0)
+            except (OSError, ValueError):
+                pid = 0
+            if pid != os.getpid() and not process_alive(pid):
+                stale.append(path)
+        return stale
+    
     def init_database(self):
-        """初始化数据库"""
+        """
+        初始化数据库（快速启动）
+        
+        启动阶段：
+        1. 打开连接并读取文件头（文件头损坏时将数据库移到一旁并重建）
+        2. 仅当存在已退出的进程留下的运行标记（上次未正常关闭）时，执行 PRAGMA quick_check
+        3. 执行迁移；结构版本已是最新时跳过所有DDL和默认数据检查（缺少全文索引且当前SQLite支持时补建）
+        每个阶段的耗时记录在 self.startup_timings 中（毫秒）
+        """
+        self.startup_timings = {}
+        phase_start = time.perf_counter()
+        
+        def finish_phase(name):
+            nonlocal phase_start
+            now = time.perf_counter()
+            self.startup_timings[name] = (now - phase_start) * 1000
+            phase_start = now
+        
         try:
             # 确保数据库目录存在
             os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            stale_markers = self._stale_dirty_markers()
+            was_dirty = bool(stale_markers) and os.path.exists(self.db_path)
+            
+            # 连接数据库，并切换到WAL日志模式（该设置持久保存在数据库文件中，同时会校验文件头）
+            try:
+                journal_mode = self._open_database()
+            except sqlite3.DatabaseError as e:
+                print(f"数据库文件损坏（{e}），正在备份并重新创建: {self.db_path}")
+                self._discard_corrupt_database()
+                journal_mode = self._open_database()
+                was_dirty = False
+            finish_phase("打开")
             
-            # 检查数据库文件是否损坏
-            if os.path.exists(self.db_path):
+            # 上次未正常关闭时检查数据库完整性
+            if was_dirty:
+                print("⚠️ 检测到上次未正常关闭，正在检查数据库完整性...")
                 try:
-                    # 尝试连接数据库
-                    test_conn = sqlite3.connect(self.db_path)
-                    test_conn.execute("SELECT 1")
-                    test_conn.close()
-                except sqlite3.DatabaseError:
-                    print(f"数据库文件损坏，正在删除并重新创建: {self.db_path}")
-                    os.remove(self.db_path)
+                    result = self.connection.execute("PRAGMA quick_check").fetchone()[0]
+                except sqlite3.DatabaseError as e:
+                    result = str(e)
+                if result != "ok":
+                    print(f"数据库完整性检查失败（{result}），正在备份并重新创建: {self.db_path}")
+                    # 先关闭仍打开着损坏文件的连接，否则改名后连接仍读写旧文件（Windows 上无法改名）
+                    self.close()
+                    self._discard_corrupt_database()
+                    journal_mode = self._open_database()
+                finish_phase("完整性检查")
             
-            # 连接数据库
-            self.connection = sqlite3.connect(self.db_path)
-            self.connection.row_factory = sqlite3.Row  # 使查询结果可以通过列名访问
+            # 清除已处理的旧标记，写入本进程的运行标记
+            for path in stale_markers:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            with open(self.dirty_marker_path, "w", encoding="utf-8") as f:
+                f.write(str(os.getpid()))
             
-            # 创建表
-            self.create_tables()
+            # 创建表（版本最新时不执行DDL）
+            applied = self.create_tables()
+            # v5 时不支持 FTS5 trigram 而未创建的全文索引，在支持后补建
+            ensure_search_index(self)
+            self._track_versions = True
+            finish_phase("迁移")
             
-            # 初始化默认数据
-            self.init_default_data()
+            # 新建或升级后的数据库才需要初始化默认数据
+            if applied:
+                self.init_default_data()
+                finish_phase("默认数据")
             
-            print(f"✅ 数据库初始化完成: {self.db_path}")
+            timings_text = " | ".join(f"{name} {ms:.1f}ms" for name, ms in self.startup_timings.items())
+            print(f"✅ 数据库初始化完成: {self.db_path}（日志模式 {journal_mode}；{timings_text}）")
             
         except Exception as e:
             print(f"❌ 数据库初始化失败: {e}")
             raise
     
+    def _open_database(self):
+        """打开当前线程的连接并设置日志模式，返回实际的日志模式"""
+        connection = self.get_connection()
+        try:
+            return connection.execute(
+                f"PRAGMA journal_mode = {DATABASE_CONFIG['journal_mode']}"
+            ).fetchone()[0]
+        except sqlite3.DatabaseError:
+            self.close()
+            raise
+    
+    def _discard_corrupt_database(self):
+        """将损坏的数据库文件（及WAL日志）改名备份，以便重新创建"""
+        suffix = datetime.now().strftime("%Y%m%d%H%M%S")
+        for path in (self.db_path, self.db_path + "-wal", self.db_path + "-shm"):
+            if os.path.exists(path):
+                os.replace(path, f"{path}.corrupt-{suffix}")
+    
     def create_tables(self):
-        """创建数据库表"""
+        """创建/升级数据库表（结构版本已是最新时不执行任何DDL），返回应用的迁移数量"""
         try:
-            cursor = self.connection.cursor()
-            
-            # 创建所有表
-            for table_name, create_sql in DATABASE_TABLES.items():
-                cursor.execute(create_sql)
-                print(f"✅ 表 {table_name} 创建成功")
-            
-            self.connection.commit()
+            return run_migrations(self)
             
         except Exception as e:
             print(f"❌ 创建表失败: {e}")
@@ -95,12 +275,165 @@ class DatabaseManager:
                             datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                         ))
                 
-                self.connection.commit()
                 print("✅ 默认数据初始化完成")
             
         except Exception as e:
             print(f"❌ 初始化默认数据失败: {e}")
     
+    def in_transaction(self):
+        """当前线程是否处于 transaction() 中"""
+        return getattr(self._local, "transaction_depth", 0) > 0
+    
+    def call_after_commit(self, callback):
+        """
+        在当前事务提交后调用 callback（不在事务中时立即调用）
+        
+        事务或所在的SAVEPOINT回滚时，回调被丢弃。用于在数据确实写入后才更新内存状态。
+        """
+        depth = getattr(self._local, "transaction_depth", 0)
+        if depth == 0:
+            callback()
+            return
+        if not hasattr(self._local, "after_commit"):
+            self._local.after_commit = []
+        self._local.after_commit.append((depth, callback))
+    
+    @contextmanager
+    def transaction(self):
+        """
+        事务上下文管理器
+        
+        用法：
+            with db_manager.transaction():
+                db_manager.execute_update(...)
+                db_manager.execute_insert(...)
+        
+        最外层使用 BEGIN IMMEDIATE 提前获取写锁，避免读后写时的锁升级冲突；
+        嵌套调用使用SAVEPOINT。
+        """
+        connection = self.connection
+        depth = getattr(self._local, "transaction_depth", 0)
+        savepoint = f"las_sp_{depth}"
+        
+        versions_before = None
+        if depth == 0:
+            connection.execute("BEGIN IMMEDIATE")
+            if self._track_versions:
+                versions_before = self._read_versions(connection)
+        else:
+            connection.execute(f"SAVEPOINT {savepoint}")
+        self._local.transaction_depth = depth + 1
+        
+        try:
+            yield connection
+        except BaseException:
+            self._local.transaction_depth = depth
+            # 丢弃本层及内层登记的提交回调
+            pending = getattr(self._local, "after_commit", [])
+            self._local.after_commit = [item for item in pending if item[0] <= depth]
+            if depth == 0:
+                connection.execute("ROLLBACK")
+            else:
+                connection.execute(f"ROLLBACK TO {savepoint}")
+                connection.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            self._local.transaction_depth = depth
+            if depth == 0:
+                # 仍持有写锁，期间的版本号变化都来自本事务
+                own_changes = None
+                if versions_before is not None:
+                    versions_after = self._read_versions(connection)
+                    own_changes = {entity: version - versions_before.get(entity, 0)
+                                   for entity, version in versions_after.items()
+                                   if version != versions_before.get(entity, 0)}
+                connection.execute("COMMIT")
+                if own_changes:
+                    with self._version_lock:
+                        for entity, delta in own_changes.items():
+                            self._own_versions[entity] = self._own_versions.get(entity, 0) + delta
+                callbacks = getattr(self._local, "after_commit", [])
+                self._local.after_commit = []
+                for _, callback in callbacks:
+                    try:
+                        callback()
+                    except Exception as e:
+                        print(f"❌ 提交回调执行失败: {e}")
+            else:
+                connection.execute(f"RELEASE {savepoint}")
+                # 内层提交后，回调并入外层，随外层一起提交或回滚
+                pending = getattr(self._local, "after_commit", [])
+                self._local.after_commit = [(min(item[0], depth), item[1]) for item in pending]
+    
+    @contextmanager
+    def read_snapshot(self):
+        """
+        只读快照上下文管理器
+        
+        用法：
+            with db_manager.read_snapshot():
+                ...  # 多次查询读到同一时刻的数据
+        
+        使用普通的 BEGIN（不获取写锁），WAL 模式下不阻塞其它连接的写入；
+        已处于事务（或快照）中时直接沿用当前事务。退出时总会结束自己开始的事务。
+        """
+        connection = self.connection
+        if connection.in_transaction:
+            yield connection
+            return
+        
+        connection.execute("BEGIN")
+        try:
+            yield connection
+        finally:
+            # 只读事务，提交与回滚效果相同；回滚保证不会留下意外的写入
+            connection.execute("ROLLBACK")
+    
+    def get_state(self, key, default=None):
+        """读取 app_state 中的值"""
+        rows = self.execute_query("SELECT value FROM app_state WHERE key = ?", (key,))
+        return rows[0]['value'] if rows else default
+    
+    def set_state(self, key, value):
+        """写入 app_state 中的值"""
+        return self.execute_update(
+            "INSERT INTO app_state (key, value, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+            (key, value, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        )
+    
+    def get_data_versions(self, entities):
+        """
+        读取实体的数据版本号（见 data_versions，由触发器在数据变更时递增）
+        
+        Returns:
+            版本号元组，与 entities 顺序一致
+        """
+        placeholders = ", ".join("?" * len(entities))
+        rows = self.connection.execute(
+            f"SELECT entity, version FROM data_versions WHERE entity IN ({placeholders})", tuple(entities)
+        ).fetchall()
+        versions = {row[0]: row[1] for row in rows}
+        return tuple(versions.get(entity, 0) for entity in entities)
+    
+    def _read_versions(self, connection):
+        """读取全部实体的数据版本号 {实体: 版本号}"""
+        return {row[0]: row[1] for row in connection.execute("SELECT entity, version FROM data_versions")}
+    
+    def get_external_data_versions(self, entities):
+        """
+        其它进程（命令行、另一个界面等）造成的数据版本号：当前版本号减去本进程提交引起的增量
+        
+        与上次读取的值不同，说明其它进程修改了该实体。本进程绕过 transaction() / execute_* 直接在
+        连接上执行的写入无法区分，也计入其它进程（只会多一次不必要的刷新）。
+        
+        Returns:
+            版本号元组，与 entities 顺序一致
+        """
+        versions = self.get_data_versions(entities)
+        with self._version_lock:
+            return tuple(version - self._own_versions.get(entity, 0) for entity, version in zip(entities, versions))
+    
     def execute_query(self, query, params=None):
         """执行查询语句"""
         try:
@@ -115,44 +448,145 @@ class DatabaseManager:
             
         except Exception as e:
             print(f"❌ 查询执行失败: {e}")
+            if self.in_transaction():
+                raise
             return []
     
+    def iter_query(self, query, params=None, chunk_size=None, row_mode="row"):
+        """
+        逐批读取查询结果的生成器（fetchmany），不一次性读出全部行，也不逐行转换为 dict
+        
+        Args:
+            chunk_size: 每次从游标读取的行数
+            row_mode: 行格式
+                'row'        sqlite3.Row，可按列名或下标读取（默认）
+                'tuple'      普通元组，开销最小，按 SELECT 的列顺序读取
+                'namedtuple' 以列名为字段的 namedtuple
+                'dict'       与 execute_query 相同
+        
+        与 execute_query 不同，查询失败时直接抛出异常。
+        生成器持有游标直到迭代结束或被关闭，迭代期间同一连接上的写入可能出现在尚未读取的行中。
+        """
+        if row_mode not in ROW_MODES:
+            raise ValueError(f"不支持的行格式: {row_mode}（可选 {' / '.join(ROW_MODES)}）")
+        chunk_size = chunk_size or DATABASE_CONFIG["iter_chunk_size"]
+        
+        cursor = self.connection.cursor()
+        if row_mode != "row":
+            cursor.row_factory = None  # 直接返回元组，跳过 sqlite3.Row 的构造
+        try:
+            cursor.execute(query, params or ())
+            convert = None
+            if row_mode == "namedtuple":
+                convert = namedtuple("QueryRow", [column[0] for column in cursor.description], rename=True)._make
+            elif row_mode == "dict":
+                columns = [column[0] for column in cursor.description]
+                convert = lambda row: dict(zip(columns, row))
+            
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                if convert is None:
+                    yield from rows
+                else:
+                    yield from map(convert, rows)
+        finally:
+            cursor.close()
+    
+    @contextmanager
+    def _single_write(self):
+        """单条写入：事务内直接执行；事务外单独作为一个事务提交（以便记录本进程的版本号增量）"""
+        if self.in_transaction():
+            yield self.connection
+        else:
+            with self.transaction() as connection:
+                yield connection
+    
     def execute_update(self, query, params=None):
-        """执行更新语句"""
+        """执行更新语句（事务外立即提交，事务内随事务提交）"""
         try:
-            cursor = self.connection.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+            with self._single_write() as connection:
+                connection.execute(query, params or ())
             
-            self.connection.commit()
             return True
             
         except Exception as e:
             print(f"❌ 更新执行失败: {e}")
+            if self.in_transaction():
+                raise
             return False
     
     def execute_insert(self, query, params=None):
-        """执行插入语句并返回插入的ID"""
+        """执行插入语句并返回插入的ID（事务外立即提交，事务内随事务提交）"""
         try:
-            cursor = self.connection.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+            with self._single_write() as connection:
+                cursor = connection.execute(query, params or ())
             
-            self.connection.commit()
             return cursor.lastrowid
             
         except Exception as e:
             print(f"❌ 插入执行失败: {e}")
+            if self.in_transaction():
+                raise
             return None
     
+    def execute_many(self, query, params_list):
+        """
+        批量执行同一条语句（executemany），整体只提交一次
+        
+        Args:
+            query: SQL语句
+            params_list: 参数序列（可以是生成器）
+            
+        Returns:
+            受影响的行数，失败时返回 None
+        """
+        try:
+            with self.transaction() as connection:
+                cursor = connection.executemany(query, params_list)
+                return cursor.rowcount
+        except Exception as e:
+            print(f"❌ 批量执行失败: {e}")
+            if self.in_transaction():
+                raise
+            return None
+    
+    def execute_batch(self, statements):
+        """
+        在一个事务中依次执行多条语句，整体只提交一次
+        
+        Args:
+            statements: (query, params) 元组列表，params 可以为 None
+            
+        Returns:
+            全部成功返回 True，失败（已回滚）返回 False
+        """
+        try:
+            with self.transaction() as connection:
+                for query, params in statements:
+                    connection.execute(query, params or ())
+            return True
+        except Exception as e:
+            print(f"❌ 批处理执行失败: {e}")
+            if self.in_transaction():
+                raise
+            return False
+    
     def close(self):
-        """关闭数据库连接"""
-        if self.connection:
-            self.connection.close()
+        """关闭连接池中的所有数据库连接，并清除本进程的运行标记"""
+        with self._pool_lock:
+            connections = self._connections
+            self._connections = []
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception as e:
+                print(f"❌ 关闭数据库连接失败: {e}")
+        self._local = threading.local()
+        
+        if connections and os.path.exists(self.dirty_marker_path):
+            os.remove(self.dirty_marker_path)
 
 
 # 全局数据库管理器实例
@@ -165,11 +599,30 @@ def get_database_manager():
         _db_manager = DatabaseManager()
     return _db_manager
 
+def open_database_manager(db_path):
+    """改用指定的数据库文件（命令行 --db 参数，需在读写数据之前调用）"""
+    global _db_manager
+    close_database_manager()
+    _db_manager = DatabaseManager(db_path)
+    return _db_manager
+
+def close_database_manager():
+    """关闭数据库管理器（程序正常退出时调用）"""
+    global _db_manager
+    if _db_manager is not None:
+        _db_manager.close()
+        _db_manager = None
+
 def execute_query(query, params=None):
     """执行查询语句"""
     db_manager = get_database_manager()
     return db_manager.execute_query(query, params)
 
+def iter_query(query, params=None, chunk_size=None, row_mode="row"):
+    """逐批读取查询结果（生成器）"""
+    db_manager = get_database_manager()
+    return db_manager.iter_query(query, params, chunk_size, row_mode)
+
 def execute_update(query, params=None):
     """执行更新语句"""
     db_manager = get_database_manager()
@@ -180,65 +633,153 @@ def execute_insert(query, params=None):
     db_manager = get_database_manager()
     return db_manager.execute_insert(query, params)
 
+def execute_many(query, params_list):
+    """批量执行同一条语句"""
+    db_manager = get_database_manager()
+    return db_manager.execute_many(query, params_list)
+
+def execute_batch(statements):
+    """在一个事务中执行多条语句"""
+    db_manager = get_database_manager()
+    return db_manager.execute_batch(statements)
+
+def get_app_state(key, default=None):
+    """读取应用状态"""
+    return get_database_manager().get_state(key, default)
+
+
+def set_app_state(key, value):
+    """写入应用状态"""
+    return get_database_manager().set_state(key, value)
+
+
+def call_after_commit(callback):
+    """在当前事务提交后调用 callback（不在事务中时立即调用）"""
+    return get_database_manager().call_after_commit(callback)
+
+
+def transaction():
+    """获取事务上下文管理器"""
+    db_manager = get_database_manager()
+    return db_manager.transaction()
+
+def fetch_page_by_created(table_name, after_key=None, limit=200, select_sql=None, params=(),
+                          id_column="id", created_column="created_at"):
+    """
+    按 (created_at, id) 倒序做键集分页查询（走 created_at 索引，打开速度与表的总行数无关）
+    
+    Args:
+        table_name: 表名（goals / daily_tasks 等含 created_at 列的表，仅限代码内常量）
+        after_key: 上一页最后一行的 (created_at, id)，为 None 时从第一页开始
+        limit: 每页行数
+        select_sql: 查询语句（不含 WHERE / ORDER BY，仅限代码内常量），默认 SELECT * FROM table_name
+        params: select_sql 中占位符的参数
+        id_column / created_column: 分页使用的列（查询带表别名时如 t.id / t.created_at）
+        
+    Returns:
+        行字典列表；created_at 为空的行排在最后
+    """
+    select_sql = select_sql or f"SELECT * FROM {table_name}"
+    params = tuple(params)
+    if after_key is None:
+        rows = execute_query(
+            f"{select_sql} WHERE {created_column} IS NOT NULL "
+            f"ORDER BY {created_column} DESC, {id_column} DESC LIMIT ?", params + (limit,))
+        last_id = None
+    elif after_key[0] is not None:
+        rows = execute_query(
+            f"{select_sql} WHERE ({created_column}, {id_column}) < (?, ?) "
+            f"ORDER BY {created_column} DESC, {id_column} DESC LIMIT ?", params + (after_key[0], after_key[1], limit))
+        last_id = None
+    else:
+        rows = []
+        last_id = after_key[1]
+    
+    # 不足一页时，继续读取 created_at 为空的行
+    remaining = limit - len(rows)
+    if remaining > 0:
+        if last_id is None:
+            rows += execute_query(
+                f"{select_sql} WHERE {created_column} IS NULL ORDER BY {id_column} DESC LIMIT ?",
+                params + (remaining,))
+        else:
+            rows += execute_query(
+                f"{select_sql} WHERE {created_column} IS NULL AND {id_column} < ? ORDER BY {id_column} DESC LIMIT ?",
+                params + (last_id, remaining))
+    return rows
+
+
+def fetch_rows_by_ids(table_name, row_ids, select_sql=None, params=(), id_column="id"):
+    """
+    按ID读取多行
+    
+    Args:
+        table_name: 表名（仅限代码内常量）
+        row_ids: 行ID序列
+        select_sql / params / id_column: 同 fetch_page_by_created
+        
+    Returns:
+        行字典列表；不存在的ID不返回
+    """
+    row_ids = list(row_ids)
+    if not row_ids:
+        return []
+    select_sql = select_sql or f"SELECT * FROM {table_name}"
+    placeholders = ", ".join("?" * len(row_ids))
+    return execute_query(f"{select_sql} WHERE {id_column} IN ({placeholders})", tuple(params) + tuple(row_ids))
+
 
 class DailyResetManager:
     """
     每日重置管理器
     
     功能说明：
-    - 每天0点自动重置每日任务的完成状态
-    - 将所有已完成的任务重置为"未完成"状态
-    - 未完成的任务保持原状态不变
-    - 这样可以实现每日计划的循环使用
+    - 每天 DAILY_TASK_CONFIG["auto_reset_hour"] 点开始新的一天，实现每日计划的循环使用
+    - 任务的当天状态由 task_completions 中当天的完成记录决定，
+      新的一天没有完成记录，所有任务自然变为"未完成"，历史完成记录全部保留
+    - 重置只记录 app_state.last_reset_date 并通知界面刷新，不批量改写任务表
+    - 由调度器在到期时间唤醒，不再每分钟轮询；启动时若上次重置早于今天则立即补做
+      （"今天"为逻辑日期，见 completion_manager.logical_date）
     """
     
-    def __init__(self, main_system):
+    JOB_NAME = "daily_reset"
+    
+    def __init__(self, main_system, scheduler=None):
         self.main_system = main_system
-        self.reset_thread = None
-        self.stop_flag = False
+        self.scheduler = scheduler or get_scheduler()
         
     def start_daily_reset(self):
-        """启动每日重置线程"""
-        if self.reset_thread is None or not self.reset_thread.is_alive():
-            self.stop_flag = False
-            self.reset_thread = threading.Thread(target=self._daily_reset_loop, daemon=True)
-            self.reset_thread.start()
-            print("🔄 每日重置管理器已启动")
+        """补做错过的重置，并注册每日重置任务"""
+        self.catch_up()
+        self.scheduler.add_daily_job(self.JOB_NAME, self._perform_daily_reset, DAILY_TASK_CONFIG["auto_reset_hour"])
+        self.scheduler.start()
+        print("🔄 每日重置管理器已启动")
     
     def stop_daily_reset(self):
-        """停止每日重置线程"""
-        self.stop_flag = True
-        if self.reset_thread and self.reset_thread.is_alive():
-            self.reset_thread.join(timeout=1)
-    
-    def _daily_reset_loop(self):
-        """每日重置循环"""
-        while not self.stop_flag:
-            try:
-                current_time = datetime.now()
-                
-                # 检查是否到了重置时间（每天0点）
-                if current_time.hour == 0 and current_time.minute == 0:
-                    self._perform_daily_reset()
-                    # 等待1分钟，避免重复执行
-                    time.sleep(60)
-                else:
-                    # 每分钟检查一次
-                    time.sleep(60)
-                    
-            except Exception as e:
-                print(f"每日重置循环出错: {e}")
-                time.sleep(60)
+        """停止每日重置"""
+        self.scheduler.remove_job(self.JOB_NAME)
+        self.scheduler.stop()
+    
+    def catch_up(self):
+        """
+        应用关闭期间错过的重置：上次重置日期早于今天（逻辑日期）时立即重置一次
+        
+        逻辑日期在 auto_reset_hour 点才变化，午夜之后、重置时间之前启动不会提前重置
+        """
+        from src.utils.completion_manager import day_key
+        last_reset = get_app_state("last_reset_date")
+        today = day_key()
+        if last_reset is None or last_reset < today:
+            print(f"🔄 补做每日重置（上次重置: {last_reset or '无记录'}）")
+            self._perform_daily_reset()
     
     def _perform_daily_reset(self):
         """
         执行每日重置
         
         重置逻辑：
-        1. 查找所有已完成的任务
-        2. 将这些任务的状态重置为"未完成"
-        3. 未完成的任务保持原状态
-        4. 这样用户可以在新的一天重新完成这些任务
+        1. 记录新一天的日期（app_state.last_reset_date）
+        2. 通知数据变更，界面按当天的完成记录重新显示任务状态
         """
         try:
             print("🔄 开始执行每日重置...")
@@ -252,23 +793,14 @@ class DailyResetManager:
             print(f"❌ 每日重置失败: {e}")
     
     def _reset_daily_tasks(self):
-        """重置每日任务状态"""
+        """开始新的一天（逻辑重置，不改写任务表）"""
+        from src.utils.completion_manager import day_key
         try:
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            # 将所有已完成的每日任务状态重置为未完成
-            # 这样用户可以在新的一天重新完成这些任务
-            query = """
-                UPDATE daily_tasks 
-                SET status = '未完成', updated_at = ?
-                WHERE status = '已完成'
-            """
-            
-            success = execute_update(query, (current_time,))
+            today = day_key()
+            success = set_app_state("last_reset_date", today)
             
             if success:
-                print("✅ 每日任务状态重置完成")
-                print("📝 说明：已将所有已完成的任务重置为未完成状态")
+                print(f"✅ 每日任务状态重置完成（{today}）")
                 # 通知数据变更
                 self.main_system.notify_data_changed("daily_reset")
             else:
@@ -280,6 +812,9 @@ class DailyResetManager:
 
 def init_daily_reset_manager(main_system):
     """初始化每日重置管理器"""
+    if not DAILY_TASK_CONFIG["enable_daily_reset"]:
+        print("每日重置已在配置中关闭")
+        return None
     try:
         reset_manager = DailyResetManager(main_system)
         reset_manager.start_daily_reset()
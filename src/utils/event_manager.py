@@ -5,56 +5,235 @@
 提供数据变更通知功能
 """
 
+import threading
+from src.utils.config import UI_CONFIG
+
+
+# 事件类型分组：监听器按分组声明自己关心的事件
+# data_changed 表示"全部数据可能已变更"，所有分组都包含它
+GOAL_EVENTS = frozenset(["goal_added", "goal_changed", "goal_deleted", "goal_edited", "data_changed"])
+DAILY_TASK_EVENTS = frozenset(["daily_task_added", "daily_task_changed", "daily_task_deleted",
+                               "daily_task_edited", "daily_reset", "day_changed", "data_changed"])
+EXPERIENCE_EVENTS = frozenset(["experience_changed", "data_changed"])
+SUMMARY_EVENTS = frozenset(["summary_added", "data_changed"])
+# 统计信息依赖目标、任务和经验值
+STATS_EVENTS = GOAL_EVENTS | DAILY_TASK_EVENTS | EXPERIENCE_EVENTS
+
+# 事件类型对应的实体类型
+ENTITY_GOAL = "goal"
+ENTITY_DAILY_TASK = "daily_task"
+ENTITY_EXPERIENCE = "experience"
+ENTITY_SUMMARY = "summary"
+
+EVENT_ENTITIES = {
+    "goal_added": ENTITY_GOAL,
+    "goal_changed": ENTITY_GOAL,
+    "goal_deleted": ENTITY_GOAL,
+    "goal_edited": ENTITY_GOAL,
+    "daily_task_added": ENTITY_DAILY_TASK,
+    "daily_task_changed": ENTITY_DAILY_TASK,
+    "daily_task_deleted": ENTITY_DAILY_TASK,
+    "daily_task_edited": ENTITY_DAILY_TASK,
+    "daily_reset": ENTITY_DAILY_TASK,
+    "day_changed": ENTITY_DAILY_TASK,  # 到了新的一天（逻辑日期），任务的当天状态随之变化
+    "experience_changed": ENTITY_EXPERIENCE,
+    "summary_added": ENTITY_SUMMARY,
+}
+
+
+class DataChangeEvent:
+    """
+    数据变更事件
+    
+    Attributes:
+        event_type: 事件类型，如 goal_changed
+        entity: 实体类型（goal / daily_task / experience / summary），None 表示不确定
+        ids: 变更行的ID元组，为空表示"可能涉及任意行"
+        changes: 变更的字段及新值，为空表示"未知，可能是任意字段"
+    """
+    
+    def __init__(self, event_type="data_changed", entity=None, ids=None, changes=None):
+        self.event_type = event_type
+        self.entity = entity or EVENT_ENTITIES.get(event_type)
+        self.ids = tuple(int(row_id) for row_id in ids) if ids else ()
+        self.changes = dict(changes) if changes else {}
+    
+    def __repr__(self):
+        if not self.ids:
+            return self.event_type
+        return f"{self.event_type}{list(self.ids)}"
+
+
+def collect_patch_ids(events, order_fields=()):
+    """
+    汇总一批事件中可以局部更新的行ID
+    
+    以下情况返回 None，表示需要整表刷新：
+    - 事件没有携带行ID
+    - 新增行（需要确定插入位置）
+    - 修改了影响排序的字段，或没有说明修改了哪些字段
+    
+    Args:
+        events: DataChangeEvent 列表
+        order_fields: 视图的排序字段
+    """
+    ids = set()
+    for event in events:
+        if not event.ids or event.event_type.endswith("_added"):
+            return None
+        if not event.event_type.endswith("_deleted"):
+            if not event.changes or set(order_fields) & set(event.changes):
+                return None
+        ids.update(event.ids)
+    return ids
+
 
 class EventManager:
-    """事件管理器"""
+    """
+    事件管理器
+    
+    事件合并说明：
+    - notify_data_changed 只把事件放入队列，在Tk下一个空闲周期统一分发
+    - 同一周期内的多次变更合并为一批，每个监听器每批只收到一次通知
+    - 监听器可声明关心的事件类型（注册时传入 event_types，或定义 event_types 属性），
+      不相关的事件不会触发刷新
+    - 监听器实现 on_data_batch(events) 时按批接收 DataChangeEvent 列表；
+      否则对每种事件类型调用一次 on_data_changed(event_type)
+    """
     
     def __init__(self, main_system):
         self.main_system = main_system
         self.listeners = []
         self.windows = []
+        self.interests = {}  # id(监听器) -> 关心的事件类型集合（None表示全部）
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._flush_scheduled = False
     
-    def add_event_listener(self, listener):
+    def add_event_listener(self, listener, event_types=None):
         """添加事件监听器"""
         if listener not in self.listeners:
             self.listeners.append(listener)
+            self._set_interest(listener, event_types)
     
     def remove_event_listener(self, listener):
         """移除事件监听器"""
         if listener in self.listeners:
             self.listeners.remove(listener)
+            self.interests.pop(id(listener), None)
     
-    def register_window_for_updates(self, window):
+    def register_window_for_updates(self, window, event_types=None):
         """注册窗口以接收更新通知"""
         if window not in self.windows:
             self.windows.append(window)
+            self._set_interest(window, event_types)
     
     def unregister_window(self, window):
         """取消注册窗口"""
         if window in self.windows:
             self.windows.remove(window)
+            self.interests.pop(id(window), None)
+    
+    def _set_interest(self, listener, event_types):
+        """记录监听器关心的事件类型"""
+        if event_types is None:
+            event_types = getattr(listener, 'event_types', None)
+        self.interests[id(listener)] = frozenset(event_types) if event_types is not None else None
     
-    def notify_data_changed(self, event_type="data_changed"):
-        """通知所有监听器数据已变更"""
-        print(f"📢 事件管理器收到数据变更通知: {event_type}")
+    def notify_data_changed(self, event_type="data_changed", entity=None, ids=None, changes=None):
+        """
+        通知数据已变更（合并到下一个空闲周期统一分发）
+        
+        Args:
+            event_type: 事件类型，也可以直接传入 DataChangeEvent
+            entity: 实体类型（默认由事件类型推断）
+            ids: 变更行的ID
+            changes: 变更的字段及新值
+        """
+        if isinstance(event_type, DataChangeEvent):
+            event = event_type
+        else:
+            event = DataChangeEvent(event_type, entity, ids, changes)
+        print(f"📢 事件管理器收到数据变更通知: {event}")
+        
+        with self._pending_lock:
+            self._pending.append(event)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        
+        root = getattr(self.main_system, 'root', None)
+        if root is None:
+            # 无界面环境：立即分发
+            self.flush()
+            return
+        
+        runner = getattr(self.main_system, 'background_runner', None)
+        if runner is not None and not runner.in_ui_thread():
+            # 后台线程（调度器、工作线程）中的通知转交Tk线程排定
+            runner.call_in_ui(self._schedule_flush, root)
+        else:
+            self._schedule_flush(root)
+    
+    def _schedule_flush(self, root):
+        """在Tk线程中排定一次分发"""
+        delay = UI_CONFIG["event_debounce_ms"]
+        if delay > 0:
+            root.after(delay, self.flush)
+        else:
+            root.after_idle(self.flush)
+    
+    def flush(self):
+        """分发队列中的全部事件"""
+        with self._pending_lock:
+            pending = self._pending
+            self._pending = []
+            self._flush_scheduled = False
+        
+        if not pending:
+            return
+        
+        if len(pending) > 1:
+            print(f"📦 合并 {len(pending)} 个数据变更事件: {pending}")
         
         # 通知所有监听器
-        for listener in self.listeners:
+        for listener in self.listeners[:]:
             try:
-                if hasattr(listener, 'on_data_changed'):
-                    listener.on_data_changed(event_type)
+                self._dispatch(listener, pending)
             except Exception as e:
                 print(f"通知监听器失败: {e}")
         
         # 通知所有注册的窗口
         for window in self.windows[:]:  # 使用切片避免在迭代时修改列表
             try:
-                if hasattr(window, 'on_data_changed'):
-                    window.on_data_changed(event_type)
+                # 窗口已关闭时取消注册
+                if hasattr(window, 'window') and not window.window.winfo_exists():
+                    self.unregister_window(window)
+                    continue
+                self._dispatch(window, pending)
             except Exception as e:
                 print(f"通知窗口失败: {e}")
                 # 如果窗口已关闭，从列表中移除
-                self.windows.remove(window)
+                self.unregister_window(window)
+    
+    def _dispatch(self, listener, events):
+        """按监听器关心的事件类型分发一批事件"""
+        interest = self.interests.get(id(listener))
+        relevant = [event for event in events if interest is None or event.event_type in interest]
+        if not relevant:
+            return
+        
+        if hasattr(listener, 'on_data_batch'):
+            listener.on_data_batch(relevant)
+        elif hasattr(listener, 'on_data_changed'):
+            # 旧接口只接收事件类型字符串，去重后逐个通知
+            for event_type in dict.fromkeys(event.event_type for event in relevant):
+                listener.on_data_changed(event_type)
+
+
+# 主窗口列表的排序字段：这些字段变化时行的位置可能改变，需要整表刷新
+MAIN_GOALS_ORDER_FIELDS = ("priority", "created_at")
+MAIN_DAILY_TASKS_ORDER_FIELDS = ("created_at",)
 
 
 class EventHandlers:
@@ -65,22 +244,36 @@ class EventHandlers:
     
     def on_data_changed(self, event_type="data_changed"):
         """处理数据变更事件"""
-        print(f"🏠 主窗口收到数据变更通知: {event_type}")
+        self.on_data_batch([DataChangeEvent(event_type)])
+    
+    def on_data_batch(self, events):
+        """处理一批数据变更事件：能局部更新的只更新变更行，每个视图最多刷新一次"""
+        print(f"🏠 主窗口收到数据变更通知: {events}")
+        data_manager = self.main_system.data_manager
         
         # 根据事件类型刷新相应的数据
-        if event_type in ["goal_added", "goal_changed", "goal_deleted", "goal_edited", "data_changed"]:
-            # 刷新目标列表
-            self.main_system.data_manager.refresh_goals()
-            print("✅ 主窗口目标列表已刷新")
+        goal_events = [event for event in events if event.event_type in GOAL_EVENTS]
+        if goal_events:
+            goal_ids = collect_patch_ids(goal_events, MAIN_GOALS_ORDER_FIELDS)
+            if goal_ids is not None and data_manager.patch_goals(goal_ids):
+                print(f"✅ 主窗口目标列表已局部更新: {sorted(goal_ids)}")
+            else:
+                data_manager.refresh_goals()
+                print("✅ 主窗口目标列表已刷新")
         
-        if event_type in ["daily_task_added", "daily_task_changed", "daily_task_deleted", "daily_task_edited", "data_changed"]:
-            # 刷新每日任务列表
-            self.main_system.data_manager.refresh_daily_tasks()
-            print("✅ 主窗口每日任务列表已刷新")
+        task_events = [event for event in events if event.event_type in DAILY_TASK_EVENTS]
+        if task_events:
+            task_ids = collect_patch_ids(task_events, MAIN_DAILY_TASKS_ORDER_FIELDS)
+            if task_ids is not None and data_manager.patch_daily_tasks(task_ids):
+                print(f"✅ 主窗口每日任务列表已局部更新: {sorted(task_ids)}")
+            else:
+                data_manager.refresh_daily_tasks()
+                print("✅ 主窗口每日任务列表已刷新")
         
-        # 刷新统计信息
-        self.main_system.data_manager.refresh_stats_display()
-        print("✅ 主窗口统计信息已刷新")
+        if any(event.event_type in STATS_EVENTS for event in events):
+            # 刷新统计信息
+            data_manager.refresh_stats_display()
+            print("✅ 主窗口统计信息已刷新")
     
     def on_goal_type_changed(self):
         """目标类型选择改变时的处理"""
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+经验值管理模块
+提供原子化的经验值增加接口，并记录经验值流水与按日/按周汇总
+"""
+
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from src.utils.database import get_database_manager
+from src.utils.level_state import get_level_state
+from src.utils.completion_manager import logical_date, day_key
+from src.utils.config import LEVEL_SYSTEM_CONFIG
+
+# SQLite 3.35.0 起支持 UPDATE ... RETURNING
+SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# 经验值来源
+XP_SOURCE_GOAL = "goal"
+XP_SOURCE_DAILY_TASK = "daily_task"
+XP_SOURCE_SUMMARY = "summary"
+XP_SOURCE_MANUAL = "manual"
+
+# 经验值与等级在同一条语句中计算，SET 右侧引用的是更新前的值；
+# 等级按 min_level/max_level 限定范围，与 level_state.level_for_experience 一致
+_ADD_EXPERIENCE_SQL = """
+    UPDATE basic_info
+    SET experience = COALESCE(experience, 0) + :exp_gain,
+        level = MIN(MAX((COALESCE(experience, 0) + :exp_gain) / :exp_per_level + 1, :min_level), :max_level),
+        updated_at = :updated_at
+    WHERE id = 1
+"""
+
+_INSERT_EVENT_SQL = """
+    INSERT INTO xp_events (source, entity_id, amount, created_at)
+    VALUES (:source, :entity_id, :exp_gain, :updated_at)
+"""
+
+# 汇总表随流水增量更新，历史/趋势查询只需读取汇总行
+_UPSERT_DAILY_SQL = """
+    INSERT INTO xp_daily_rollup (day, total_exp, event_count)
+    VALUES (:day, :exp_gain, 1)
+    ON CONFLICT(day) DO UPDATE SET
+        total_exp = total_exp + excluded.total_exp,
+        event_count = event_count + 1
+"""
+
+_UPSERT_WEEKLY_SQL = """
+    INSERT INTO xp_weekly_rollup (week, total_exp, event_count)
+    VALUES (:week, :exp_gain, 1)
+    ON CONFLICT(week) DO UPDATE SET
+        total_exp = total_exp + excluded.total_exp,
+        event_count = event_count + 1
+"""
+
+
+def week_key(day):
+    """获取日期所在的ISO周标识，例如 2025-W31"""
+    return day.strftime("%G-W%V")
+
+
+class ExperienceManager:
+    """
+    经验值管理器
+
+    - 经验值的增加通过 `experience = experience + ?` 在数据库内完成，
+      不再先读后写，多个奖励同时发生时不会丢失更新
+    - 每次奖励追加一条 xp_events 流水，并增量更新日/周汇总表，
+      与经验值更新在同一事务中提交
+    - 事务提交后把新的经验值和等级写入等级状态（回滚时不写入）
+    """
+
+    def __init__(self, db_manager=None, level_state=None):
+        self.db_manager = db_manager or get_database_manager()
+        self.level_state = level_state or get_level_state()
+
+    def add_experience(self, exp_gain, source=XP_SOURCE_MANUAL, entity_id=None):
+        """
+        增加经验值并同步计算等级
+
+        Args:
+            exp_gain: 增加的经验值（为0时只更新时间，不记录流水）
+            source: 经验值来源，如 goal / daily_task / summary
+            entity_id: 来源实体ID（目标ID、任务ID等）
+
+        Returns:
+            (新经验值, 新等级)，未找到用户基本信息时返回 None
+        """
+        now = datetime.now()
+        # 日/周汇总按逻辑日期划分（与任务的当天状态、每日重置一致）
+        today = logical_date(now)
+        params = {
+            "exp_gain": exp_gain,
+            "exp_per_level": LEVEL_SYSTEM_CONFIG["exp_per_level"],
+            "min_level": LEVEL_SYSTEM_CONFIG["min_level"],
+            # 没有上限时用最大整数代替（SQLite 的 MIN 遇到 NULL 返回 NULL）
+            "max_level": sys.maxsize if LEVEL_SYSTEM_CONFIG["max_level"] is None else LEVEL_SYSTEM_CONFIG["max_level"],
+            "updated_at": now.strftime("%Y-%m-%d %H:%M:%S"),
+            "source": source,
+            "entity_id": entity_id,
+            "day": day_key(today),
+            "week": week_key(today)
+        }
+
+        with self.db_manager.transaction() as connection:
+            if SUPPORTS_RETURNING:
+                # RETURNING 语句需要取完结果后才会执行完毕
+                rows = connection.execute(_ADD_EXPERIENCE_SQL + " RETURNING experience, level", params).fetchall()
+                result = (rows[0]["experience"], rows[0]["level"]) if rows else None
+            else:
+                # 旧版SQLite：在同一个事务中更新并读回
+                cursor = connection.execute(_ADD_EXPERIENCE_SQL, params)
+                result = None
+                if cursor.rowcount:
+                    row = connection.execute("SELECT experience, level FROM basic_info WHERE id = 1").fetchone()
+                    result = (row["experience"], row["level"])
+
+            if result is not None and exp_gain:
+                connection.execute(_INSERT_EVENT_SQL, params)
+                connection.execute(_UPSERT_DAILY_SQL, params)
+                connection.execute(_UPSERT_WEEKLY_SQL, params)
+
+            if result is not None:
+                experience, level = result
+                self.db_manager.call_after_commit(lambda: self.level_state.update(experience, level))
+
+        return result
+
+    def get_daily_history(self, days=30):
+        """获取最近若干天的经验值汇总（按日期升序）"""
+        start_day = day_key(logical_date() - timedelta(days=days - 1))
+        return self.db_manager.execute_query(
+            "SELECT day, total_exp, event_count FROM xp_daily_rollup WHERE day >= ? ORDER BY day",
+            (start_day,)
+        )
+
+    def get_weekly_history(self, weeks=12):
+        """获取最近若干周的经验值汇总（按周升序）"""
+        start_week = week_key(logical_date() - timedelta(weeks=weeks - 1))
+        return self.db_manager.execute_query(
+            "SELECT week, total_exp, event_count FROM xp_weekly_rollup WHERE week >= ? ORDER BY week",
+            (start_week,)
+        )
+
+    def get_recent_events(self, limit=50):
+        """获取最近的经验值流水"""
+        return self.db_manager.execute_query(
+            "SELECT id, source, entity_id, amount, created_at FROM xp_events ORDER BY id DESC LIMIT ?",
+            (limit,)
+        )
+
+
+# 全局经验值管理器实例
+_experience_manager = None
+
+def get_experience_manager():
+    """获取经验值管理器实例"""
+    global _experience_manager
+    if _experience_manager is None:
+        _experience_manager = ExperienceManager()
+    return _experience_manager
+
+def add_experience(exp_gain, source=XP_SOURCE_MANUAL, entity_id=None):
+    """增加经验值，返回 (新经验值, 新等级)"""
+    return get_experience_manager().add_experience(exp_gain, source, entity_id)
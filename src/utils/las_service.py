@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+业务服务模块
+目标、每日任务、经验值、总结和统计的业务操作，不依赖图形界面（界面和命令行共用）
+"""
+
+from datetime import datetime
+from src.utils.database import get_database_manager, execute_query, execute_update, execute_insert, transaction
+from src.utils.data_cache import get_data_cache
+from src.utils.data_manager import is_active_goal, is_active_daily_task, goals_order_key, daily_tasks_order_key
+from src.utils.level_state import get_level_state
+from src.utils.completion_manager import get_completion_manager, day_key
+from src.utils.experience_manager import add_experience, XP_SOURCE_GOAL, XP_SOURCE_DAILY_TASK, XP_SOURCE_MANUAL
+from src.utils.event_manager import DataChangeEvent
+from src.utils.stats_engine import StatisticsEngine
+from src.utils.summary_store import get_summary_store
+from src.utils.summary_importer import get_summary_importer
+from src.utils.bulk_importer import get_bulk_importer, check_choice
+from src.utils.data_exporter import get_data_exporter
+from src.utils.search_manager import get_search_manager, SEARCH_LIMIT
+from src.utils.config import GOAL_CONFIG, DAILY_TASK_CONFIG
+
+
+def now_str():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def priority_reward(config, priority):
+    """按优先级获取经验值奖励（优先级无效时使用中等优先级的奖励）"""
+    try:
+        return config["experience_reward"][config["priority_levels"].index(priority)]
+    except (ValueError, IndexError):
+        return config["experience_reward"][1]
+
+
+def normalize_summary_date(summary_date):
+    """
+    总结日期 YYYY.MM.DD / YYYY-MM-DD -> YYYY-MM-DD
+
+    Raises:
+        ValueError: 日期格式不正确
+    """
+    date_parts = summary_date.strip().split('.')
+    if len(date_parts) == 3:
+        summary_date = f"{date_parts[0]}-{date_parts[1].zfill(2)}-{date_parts[2].zfill(2)}"
+    datetime.strptime(summary_date, "%Y-%m-%d")
+    return summary_date
+
+
+def apply_to_cache(event_type, entity=None, ids=None, changes=None):
+    """没有事件管理器时（命令行、脚本）直接把变更同步到本进程的数据缓存"""
+    get_data_cache().on_data_batch([DataChangeEvent(event_type, entity, ids, changes)])
+
+
+class LASService:
+    """
+    业务服务
+
+    - 每个操作在一个事务中完成，经验值奖励与状态修改一起提交
+    - 提交后通过 notify(事件类型, ids=, changes=) 上报变更：界面中为 main_system.notify_data_changed，
+      命令行中默认只同步数据缓存
+    - 输入无效时抛出 ValueError，目标/任务不存在时返回 None，由调用方决定如何提示
+    """
+
+    def __init__(self, notify=None, db_manager=None):
+        self.notify = notify or apply_to_cache
+        self.db_manager = db_manager or get_database_manager()
+
+    # ==================== 目标 ====================
+
+    def list_goals(self, goal_type=None, include_completed=False):
+        """目标列表（按优先级、创建时间倒序）"""
+        return get_data_cache().goals.select(
+            lambda record: (goal_type is None or record.goal_type == goal_type)
+            and (include_completed or is_active_goal(record)),
+            key=goals_order_key, reverse=True
+        )
+
+    def add_goal(self, title, goal_type, description="", priority=None):
+        """添加目标，返回目标ID"""
+        title = (title or "").strip()
+        if not title:
+            raise ValueError("请输入目标标题")
+        if not goal_type:
+            raise ValueError("请选择目标类型")
+        check_choice("goal_type", goal_type, GOAL_CONFIG["goal_types"])
+        priority = check_choice("priority", priority or GOAL_CONFIG["default_priority"], GOAL_CONFIG["priority_levels"])
+
+        current_time = now_str()
+        goal_id = execute_insert("""
+            INSERT INTO goals (title, goal_type, description, status, priority, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            title, goal_type, description, GOAL_CONFIG["default_status"],
+            priority, current_time, current_time
+        ))
+        if goal_id:
+            self.notify("goal_added", ids=[goal_id])
+        return goal_id
+
+    def update_goal(self, goal_id, title, goal_type, description, status, priority, original=None):
+        """
+        修改目标
+
+        Args:
+            original: 修改前的记录（用于只上报实际修改的字段），默认从缓存读取
+
+        Returns:
+            实际修改的字段，目标不存在时返回 False（不上报变更）
+        """
+        title = (title or "").strip()
+        if not title:
+            raise ValueError("请输入目标标题")
+        check_choice("goal_type", goal_type, GOAL_CONFIG["goal_types"])
+        check_choice("status", status, GOAL_CONFIG["status_options"])
+        check_choice("priority", priority, GOAL_CONFIG["priority_levels"])
+        original = original or get_data_cache().goals.get(goal_id) or {}
+
+        current_time = now_str()
+        with transaction() as connection:
+            updated = connection.execute("""
+                UPDATE goals
+                SET title = ?, goal_type = ?, description = ?, status = ?,
+                    priority = ?, updated_at = ?
+                WHERE id = ?
+            """, (title, goal_type, description, status, priority, current_time, goal_id)).rowcount
+        if not updated:
+            return False
+
+        edited = {"title": title, "goal_type": goal_type, "description": description, "status": status, "priority": priority}
+        changes = {field: value for field, value in edited.items() if original.get(field) != value}
+        changes["updated_at"] = current_time
+        self.notify("goal_edited", ids=[goal_id], changes=changes)
+        return changes
+
+    def set_goal_status(self, goal_id, status, exp_reward=None):
+        """
+        修改目标状态；从未完成变为"已完成"时奖励经验值（与状态修改同一事务提交）
+
+        Args:
+            exp_reward: 完成奖励，默认按目标优先级
+
+        Returns:
+            (目标标题, 获得的经验值)，目标不存在时返回 None
+        """
+        check_choice("status", status, GOAL_CONFIG["status_options"])
+        current_time = now_str()
+        with transaction():
+            result = self._write_goal_status(goal_id, status, exp_reward, current_time)
+        if result is None:
+            return None
+
+        self.notify("goal_changed", ids=[goal_id], changes={"status": status, "updated_at": current_time})
+        return result
+
+    def _write_goal_status(self, goal_id, status, exp_reward, current_time):
+        """在调用方的事务中修改目标状态并奖励经验值，返回 (目标标题, 获得的经验值)，目标不存在时返回 None"""
+        rows = execute_query("SELECT title, status, priority FROM goals WHERE id = ?", (goal_id,))
+        if not rows:
+            return None
+        goal = rows[0]
+        execute_update("UPDATE goals SET status = ?, updated_at = ? WHERE id = ?", (status, current_time, goal_id))
+
+        exp_gain = 0
+        if status == '已完成' and goal['status'] != '已完成':
+            exp_gain = exp_reward if exp_reward is not None else priority_reward(GOAL_CONFIG, goal['priority'])
+            add_experience(exp_gain, XP_SOURCE_GOAL, goal_id)
+        return goal['title'], exp_gain
+
+    def complete_goal(self, goal_id, exp_reward=None):
+        """标记目标为已完成，返回 (目标标题, 获得的经验值)"""
+        return self.set_goal_status(goal_id, '已完成', exp_reward)
+
+    def reopen_goal(self, goal_id):
+        """标记目标为进行中"""
+        return self.set_goal_status(goal_id, '进行中')
+
+    def toggle_goal(self, goal_id, exp_reward=None):
+        """
+        切换目标完成状态（已完成 <-> 进行中）
+
+        Returns:
+            (目标标题, 新状态, 获得的经验值)，目标不存在时返回 None
+        """
+        current_time = now_str()
+        # 读取当前状态与修改在同一写事务中，并发切换时不会重复奖励经验值
+        with transaction():
+            rows = execute_query("SELECT status FROM goals WHERE id = ?", (goal_id,))
+            if not rows:
+                return None
+            new_status = '已完成' if rows[0]['status'] != '已完成' else '进行中'
+            title, exp_gain = self._write_goal_status(goal_id, new_status, exp_reward, current_time)
+
+        self.notify("goal_changed", ids=[goal_id], changes={"status": new_status, "updated_at": current_time})
+        return title, new_status, exp_gain
+
+    def delete_goal(self, goal_id):
+        """删除目标，返回是否删除了记录"""
+        with transaction() as connection:
+            deleted = connection.execute("DELETE FROM goals WHERE id = ?", (goal_id,)).rowcount
+        if deleted:
+            self.notify("goal_deleted", ids=[goal_id])
+        return bool(deleted)
+
+    def import_goals(self, path):
+        """从 CSV / JSONL 文件批量导入目标，全部导入后只通知一次，返回导入报告"""
+        report = get_bulk_importer().import_goals(path)
+        if report["inserted"]:
+            self.notify("goal_added")
+        return report
+
+    # ==================== 每日任务 ====================
+
+    def list_daily_tasks(self, include_completed=False):
+        """每日任务列表（状态为当天的完成情况）"""
+        return get_data_cache().daily_tasks.select(
+            lambda record: include_completed or is_active_daily_task(record),
+            key=daily_tasks_order_key, reverse=True
+        )
+
+    def add_daily_task(self, title, description="", priority=None):
+        """添加每日任务（经验值奖励按优先级），返回任务ID"""
+        title = (title or "").strip()
+        if not title:
+            raise ValueError("请输入任务标题")
+
+        priority = check_choice("priority", priority or DAILY_TASK_CONFIG["default_priority"],
+                                DAILY_TASK_CONFIG["priority_levels"])
+        current_time = now_str()
+        task_id = execute_insert("""
+            INSERT INTO daily_tasks (title, description, status, priority,
+                                   experience_reward, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            title, description, DAILY_TASK_CONFIG["default_status"], priority,
+            priority_reward(DAILY_TASK_CONFIG, priority), current_time, current_time
+        ))
+        if task_id:
+            self.notify("daily_task_added", ids=[task_id])
+        return task_id
+
+    def update_daily_task(self, task_id, title, description, status, priority, original=None):
+        """
+        修改每日任务；手动修改状态时同步当天的完成记录（不奖励经验值）
+
+        Returns:
+            实际修改的字段，任务不存在时返回 False（不上报变更）
+        """
+        title = (title or "").strip()
+        if not title:
+            raise ValueError("请输入任务标题")
+        check_choice("status", status, DAILY_TASK_CONFIG["status_options"])
+        check_choice("priority", priority, DAILY_TASK_CONFIG["priority_levels"])
+        original = original or get_data_cache().daily_tasks.get(task_id) or {}
+
+        exp_reward = priority_reward(DAILY_TASK_CONFIG, priority)
+        current_time = now_str()
+        status_changed = original.get("status") != status
+        with transaction() as connection:
+            updated = connection.execute("""
+                UPDATE daily_tasks
+                SET title = ?, description = ?, status = ?,
+                    priority = ?, experience_reward = ?, updated_at = ?
+                WHERE id = ?
+            """, (title, description, status, priority, exp_reward, current_time, task_id)).rowcount
+            if not updated:
+                return False
+
+            if status_changed and status == '已完成':
+                get_completion_manager().record_completion(task_id, 0, current_time)
+            elif status_changed:
+                get_completion_manager().remove_completion(task_id)
+
+        edited = {"title": title, "description": description, "status": status,
+                  "priority": priority, "experience_reward": exp_reward}
+        changes = {field: value for field, value in edited.items() if original.get(field) != value}
+        if status_changed:
+            changes["completed_at"] = current_time if status == '已完成' else None
+        changes["updated_at"] = current_time
+        self.notify("daily_task_edited", ids=[task_id], changes=changes)
+        return changes
+
+    def complete_daily_tasks(self, task_ids):
+        """
+        批量完成每日任务（同一事务）；当天已完成的任务不重复记录，也不重复奖励经验值
+
+        Returns:
+            {任务ID: (任务标题, 获得的经验值)}，不存在的任务不返回
+        """
+        task_ids = list(task_ids)
+        if not task_ids:
+            return {}
+        completions = get_completion_manager()
+        current_time = now_str()
+        results = {}
+        with transaction():
+            placeholders = ", ".join("?" * len(task_ids))
+            rows = execute_query(
+                f"SELECT id, title, priority, experience_reward FROM daily_tasks WHERE id IN ({placeholders})",
+                tuple(task_ids)
+            )
+            for task in rows:
+                execute_update(
+                    "UPDATE daily_tasks SET status = '已完成', completed_at = ?, updated_at = ? WHERE id = ?",
+                    (current_time, current_time, task['id'])
+                )
+                exp_reward = task['experience_reward'] or priority_reward(DAILY_TASK_CONFIG, task['priority'])
+                exp_gain = 0
+                if completions.record_completion(task['id'], exp_reward, current_time):
+                    exp_gain = exp_reward
+                    add_experience(exp_gain, XP_SOURCE_DAILY_TASK, task['id'])
+                results[task['id']] = (task['title'], exp_gain)
+
+        if results:
+            self.notify(
+                "daily_task_changed", ids=list(results),
+                changes={"status": "已完成", "completed_at": current_time, "updated_at": current_time}
+            )
+        return results
+
+    def complete_daily_task(self, task_id):
+        """完成每日任务，返回 (任务标题, 获得的经验值)，任务不存在时返回 None"""
+        return self.complete_daily_tasks([task_id]).get(task_id)
+
+    def reopen_daily_task(self, task_id):
+        """撤销每日任务当天的完成，返回是否找到任务"""
+        current_time = now_str()
+        with transaction():
+            updated = self.db_manager.connection.execute(
+                "UPDATE daily_tasks SET status = '未完成', completed_at = NULL, updated_at = ? WHERE id = ?",
+                (current_time, task_id)
+            ).rowcount
+            get_completion_manager().remove_completion(task_id)
+        if updated:
+            self.notify(
+                "daily_task_changed", ids=[task_id],
+                changes={"status": "未完成", "completed_at": None, "updated_at": current_time}
+            )
+        return bool(updated)
+
+    def toggle_daily_task(self, task_id):
+        """
+        切换每日任务当天的完成状态
+
+        Returns:
+            (任务标题, 新状态, 获得的经验值)，任务不存在时返回 None
+        """
+        if get_completion_manager().is_completed(task_id):
+            rows = execute_query("SELECT title FROM daily_tasks WHERE id = ?", (task_id,))
+            if not rows or not self.reopen_daily_task(task_id):
+                return None
+            return rows[0]['title'], '未完成', 0
+        result = self.complete_daily_task(task_id)
+        return (result[0], '已完成', result[1]) if result else None
+
+    def delete_daily_task(self, task_id):
+        """删除每日任务，返回是否删除了记录"""
+        with transaction() as connection:
+            deleted = connection.execute("DELETE FROM daily_tasks WHERE id = ?", (task_id,)).rowcount
+        if deleted:
+            self.notify("daily_task_deleted", ids=[task_id])
+        return bool(deleted)
+
+    def import_daily_tasks(self, path):
+        """从 CSV / JSONL 文件批量导入每日任务，全部导入后只通知一次，返回导入报告"""
+        report = get_bulk_importer().import_daily_tasks(path)
+        if report["inserted"]:
+            self.notify("daily_task_added")
+        return report
+
+    def daily_reset(self):
+        """开始新的一天（逻辑重置：记录日期，任务状态由当天的完成记录决定）"""
+        today = day_key()
+        self.db_manager.set_state("last_reset_date", today)
+        self.notify("daily_reset")
+        return today
+
+    # ==================== 经验值与统计 ====================
+
+    def add_experience(self, exp_gain, source=XP_SOURCE_MANUAL, entity_id=None):
+        """增加经验值，返回 (新经验值, 新等级)"""
+        return add_experience(exp_gain, source, entity_id)
+
+    def level_info(self):
+        """(经验值, 等级)"""
+        return get_level_state().snapshot()
+
+    def statistics_text(self):
+        """"数据统计"选项卡的文本"""
+        engine = StatisticsEngine()
+        return engine.render(engine.compute())
+
+    # ==================== 总结 ====================
+
+    def add_summary(self, summary_date, content):
+        """
+        保存总结（当年的md文件记为待生成，见 SummaryStore.render_dirty）
+
+        Returns:
+            新条目的ID；当天已有相同内容时返回 None
+        """
+        content = (content or "").strip()
+        if not content:
+            raise ValueError("请输入总结内容")
+        summary_date = normalize_summary_date(summary_date)
+        summary_id = get_summary_store().add(summary_date, content)
+        if summary_id is not None:
+            self.notify("summary_added", ids=[summary_id])
+        return summary_id
+
+    def import_summaries(self):
+        """导入doc目录下旧的总结文件，返回导入报告"""
+        report = get_summary_importer().import_all()
+        if report["inserted"]:
+            self.notify("summary_added")
+        return report
+
+    def search(self, query, limit=None):
+        """搜索总结、目标和每日任务"""
+        return get_search_manager().search(query, limit or SEARCH_LIMIT)
+
+    # ==================== 导出 ====================
+
+    def export_data(self, out_dir, fmt="jsonl", tables=None):
+        """把数据导出到目录（每张表一个 JSONL / CSV 文件），返回导出报告"""
+        return get_data_exporter().export(out_dir, fmt, tables)
+
+
+# 全局业务服务实例（命令行、脚本使用；界面使用 main_system.service）
+_las_service = None
+
+def get_las_service():
+    """获取业务服务实例"""
+    global _las_service
+    if _las_service is None:
+        _las_service = LASService()
+    return _las_service
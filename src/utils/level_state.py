@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+等级状态模块
+在内存中保存用户的经验值和等级，侧边栏、统计和奖励流程读取等级时不再查询数据库
+"""
+
+import threading
+from src.utils.database import get_database_manager
+from src.utils.config import LEVEL_SYSTEM_CONFIG
+
+
+def level_for_experience(experience):
+    """根据经验值计算等级（按 LEVEL_SYSTEM_CONFIG 配置）"""
+    level = experience // LEVEL_SYSTEM_CONFIG["exp_per_level"] + 1
+    level = max(level, LEVEL_SYSTEM_CONFIG["min_level"])
+    if LEVEL_SYSTEM_CONFIG["max_level"] is not None:
+        level = min(level, LEVEL_SYSTEM_CONFIG["max_level"])
+    return level
+
+
+class LevelState:
+    """
+    用户等级状态
+
+    - 第一次读取时从 basic_info 加载一次经验值，之后只在内存中读取
+    - 经验值奖励提交后由 ExperienceManager 调用 update() 写入新值
+    - 数值变化时通知订阅者（如侧边栏的等级标签）
+    """
+
+    def __init__(self, db_manager=None):
+        self.db_manager = db_manager
+        self._lock = threading.Lock()
+        self._experience = None
+        self._level = None
+        self._subscribers = []
+
+    def _read_experience(self):
+        db_manager = self.db_manager or get_database_manager()
+        result = db_manager.execute_query("SELECT experience FROM basic_info WHERE id = 1")
+        experience = result[0]['experience'] if result else None
+        if experience is None:
+            experience = LEVEL_SYSTEM_CONFIG["default_exp"]
+        return experience
+
+    def _ensure_loaded(self):
+        if self._experience is not None:
+            return
+        self._experience = self._read_experience()
+        self._level = level_for_experience(self._experience)
+
+    @property
+    def experience(self):
+        return self.snapshot()[0]
+
+    @property
+    def level(self):
+        return self.snapshot()[1]
+
+    def snapshot(self):
+        """返回 (经验值, 等级)"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._experience, self._level
+
+    def update(self, experience, level=None):
+        """
+        写入新的经验值（奖励提交后调用），数值变化时通知订阅者
+
+        Args:
+            experience: 新经验值
+            level: 新等级，为 None 时按经验值计算
+        """
+        if level is None:
+            level = level_for_experience(experience)
+        with self._lock:
+            changed = (experience, level) != (self._experience, self._level)
+            self._experience, self._level = experience, level
+            subscribers = list(self._subscribers)
+
+        if changed:
+            for callback in subscribers:
+                try:
+                    callback(experience, level)
+                except Exception as e:
+                    print(f"❌ 等级状态通知失败: {e}")
+
+    def reload(self):
+        """丢弃内存中的值，下次读取时重新从数据库加载"""
+        with self._lock:
+            self._experience = None
+            self._level = None
+
+    def sync(self):
+        """重新从数据库读取经验值（其它进程修改后调用），数值变化时通知订阅者"""
+        self.update(self._read_experience())
+
+    def subscribe(self, callback):
+        """订阅等级变化：callback(经验值, 等级)"""
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """取消订阅"""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+
+# 全局等级状态实例
+_level_state = None
+
+def get_level_state():
+    """获取等级状态实例"""
+    global _level_state
+    if _level_state is None:
+        _level_state = LevelState()
+    return _level_state
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据库结构迁移模块
+按 PRAGMA user_version 记录的版本号，依次在事务中执行尚未应用的迁移
+"""
+
+
+def get_schema_version(connection):
+    """获取数据库当前结构版本"""
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def column_exists(connection, table_name, column_name):
+    """检查表中是否存在指定列"""
+    columns = connection.execute(f"PRAGMA table_info({table_name})").fetchall()
+    return any(column[1] == column_name for column in columns)
+
+
+# v1 的基础表结构与索引（已发布，保持不变；后续的结构变更请追加迁移）
+# 迁移只使用这里冻结的副本，不读取可变的配置，旧数据库升级时总能得到相同的 v1 结构
+V1_TABLES = {
+    "basic_info": '''
+        CREATE TABLE IF NOT EXISTS basic_info (
+            id INTEGER PRIMARY KEY,
+            start_date TEXT,
+            experience INTEGER DEFAULT 0,
+            level INTEGER DEFAULT 1,
+            created_at TEXT,
+            updated_at TEXT
+        )
+    ''',
+    "goals": '''
+        CREATE TABLE IF NOT EXISTS goals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT,
+            goal_type TEXT,
+            description TEXT,
+            status TEXT DEFAULT '进行中',
+            priority TEXT DEFAULT '中',
+            created_at TEXT,
+            updated_at TEXT
+        )
+    ''',
+    "daily_tasks": '''
+        CREATE TABLE IF NOT EXISTS daily_tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT,
+            description TEXT,
+            priority TEXT DEFAULT '中',
+            status TEXT DEFAULT '未完成',
+            experience_reward INTEGER DEFAULT 10,
+            created_at TEXT,
+            updated_at TEXT
+        )
+    ''',
+    "xp_events": '''
+        CREATE TABLE IF NOT EXISTS xp_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,
+            entity_id INTEGER,
+            amount INTEGER NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    ''',
+    "xp_daily_rollup": '''
+        CREATE TABLE IF NOT EXISTS xp_daily_rollup (
+            day TEXT PRIMARY KEY,
+            total_exp INTEGER NOT NULL DEFAULT 0,
+            event_count INTEGER NOT NULL DEFAULT 0
+        )
+    ''',
+    "xp_weekly_rollup": '''
+        CREATE TABLE IF NOT EXISTS xp_weekly_rollup (
+            week TEXT PRIMARY KEY,
+            total_exp INTEGER NOT NULL DEFAULT 0,
+            event_count INTEGER NOT NULL DEFAULT 0
+        )
+    ''',
+}
+
+V1_INDEXES = {
+    # 主窗口目标列表：按类型筛选未完成目标，按优先级、创建时间排序（覆盖索引，无需回表和临时排序）
+    "idx_goals_active_type_priority": '''
+        CREATE INDEX IF NOT EXISTS idx_goals_active_type_priority
+        ON goals (goal_type, priority, created_at, title, description, status)
+        WHERE status != '已完成'
+    ''',
+    # 主窗口计划列表：未完成任务按创建时间排序（覆盖索引）
+    "idx_daily_tasks_active_created": '''
+        CREATE INDEX IF NOT EXISTS idx_daily_tasks_active_created
+        ON daily_tasks (created_at, title, description, status, priority, experience_reward)
+        WHERE status != '已完成'
+    ''',
+    # 管理窗口：全部目标/任务按创建时间排序
+    "idx_goals_created": '''
+        CREATE INDEX IF NOT EXISTS idx_goals_created ON goals (created_at)
+    ''',
+    "idx_daily_tasks_created": '''
+        CREATE INDEX IF NOT EXISTS idx_daily_tasks_created ON daily_tasks (created_at)
+    ''',
+}
+
+
+def _migrate_v1(connection):
+    """创建基础表与刷新查询索引"""
+    for create_sql in V1_TABLES.values():
+        connection.execute(create_sql)
+    for create_sql in V1_INDEXES.values():
+        connection.execute(create_sql)
+
+
+def _migrate_v2(connection):
+    """daily_tasks 增加 completed_at 列（记录完成时间）"""
+    if not column_exists(connection, "daily_tasks", "completed_at"):
+        connection.execute("ALTER TABLE daily_tasks ADD COLUMN completed_at TEXT")
+
+
+def _migrate_v3(connection):
+    """
+    新增 task_completions（每日任务完成记录）和 app_state（应用状态键值）
+
+    每日任务"当天是否已完成"以 task_completions 中当天的记录为准，
+    daily_tasks.status 只保留最后一次操作的结果，每日重置不再批量改写该列。
+    """
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS task_completions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id INTEGER NOT NULL,
+            completed_on TEXT NOT NULL,
+            completed_at TEXT,
+            experience INTEGER DEFAULT 0,
+            UNIQUE (task_id, completed_on)
+        )
+    """)
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_task_completions_day ON task_completions(completed_on, task_id)"
+    )
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS app_state (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            updated_at TEXT
+        )
+    """)
+    # 保留升级前已完成的任务（按完成时间记到对应日期）
+    connection.execute("""
+        INSERT OR IGNORE INTO task_completions (task_id, completed_on, completed_at, experience)
+        SELECT id, substr(COALESCE(completed_at, updated_at), 1, 10), COALESCE(completed_at, updated_at),
+               COALESCE(experience_reward, 0)
+        FROM daily_tasks
+        WHERE status = '已完成' AND COALESCE(completed_at, updated_at) IS NOT NULL
+    """)
+
+
+def _migrate_v4(connection):
+    """
+    新增 summaries（总结条目）
+
+    总结保存时只插入一行，doc/<年份>.md 由条目按时间倒序重新生成。
+    (summary_date, content_hash) 唯一，导入旧的md文件时可以安全地重复执行。
+    """
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS summaries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            summary_date TEXT NOT NULL,
+            content TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            created_at TEXT,
+            UNIQUE (summary_date, content_hash)
+        )
+    """)
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_summaries_year ON summaries(substr(summary_date, 1, 4), id)"
+    )
+
+
+# 全文索引中各实体的编号：索引行的 rowid = 实体ID * SEARCH_ENTITY_COUNT + 编号，
+# 触发器据此按 rowid 直接定位索引行
+SEARCH_ENTITY_CODES = {"goal": 1, "daily_task": 2, "summary": 3}
+SEARCH_ENTITY_COUNT = 4
+
+# (实体, 表名, 标题列表达式, 正文列表达式)
+SEARCH_SOURCES = [
+    ("goal", "goals", "title", "description"),
+    ("daily_task", "daily_tasks", "title", "description"),
+    ("summary", "summaries", "summary_date", "content"),
+]
+
+
+def fts5_trigram_available(connection):
+    """当前SQLite是否支持 FTS5 trigram 分词（3.34.0 起）"""
+    try:
+        connection.execute("CREATE VIRTUAL TABLE temp.las_fts_probe USING fts5(x, tokenize='trigram')")
+        connection.execute("DROP TABLE temp.las_fts_probe")
+        return True
+    except Exception:
+        return False
+
+
+def _migrate_v5(connection):
+    """
+    新增全文搜索索引 search_index（FTS5，trigram 分词，支持中文子串搜索）
+
+    由触发器随 goals / daily_tasks / summaries 的增删改增量维护。
+    SQLite 不支持 FTS5 trigram 时不创建索引，搜索退回 LIKE 查询。
+    """
+    if not fts5_trigram_available(connection):
+        print("⚠️ 当前SQLite不支持FTS5 trigram分词，搜索将使用LIKE查询")
+        return
+    create_search_index(connection)
+
+
+def search_index_exists(connection):
+    """数据库中是否已有全文搜索索引 search_index"""
+    return connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+    ).fetchone() is not None
+
+
+def create_search_index(connection):
+    """创建 search_index、维护它的触发器，并为已有数据建立索引"""
+    connection.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(entity UNINDEXED, title, body, tokenize='trigram')"
+    )
+    for entity, table_name, title_column, body_column in SEARCH_SOURCES:
+        code = SEARCH_ENTITY_CODES[entity]
+        rowid = f"{{row}}.id * {SEARCH_ENTITY_COUNT} + {code}"
+        insert_sql = (
+            f"INSERT INTO search_index (rowid, entity, title, body) "
+            f"VALUES ({rowid.format(row='new')}, '{entity}', new.{title_column}, new.{body_column});"
+        )
+        delete_sql = f"DELETE FROM search_index WHERE rowid = {rowid.format(row='old')};"
+        connection.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table_name}_search_insert AFTER INSERT ON {table_name}
+            BEGIN {insert_sql} END
+        """)
+        connection.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table_name}_search_delete AFTER DELETE ON {table_name}
+            BEGIN {delete_sql} END
+        """)
+        connection.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table_name}_search_update
+            AFTER UPDATE OF {title_column}, {body_column} ON {table_name}
+            BEGIN {delete_sql} {insert_sql} END
+        """)
+        # 为已有数据建立索引
+        connection.execute(f"""
+            INSERT INTO search_index (rowid, entity, title, body)
+            SELECT id * {SEARCH_ENTITY_COUNT} + {code}, '{entity}', {title_column}, {body_column} FROM {table_name}
+        """)
+
+
+def _migrate_v6(connection):
+    """
+    总结按 (日期, ID) 排序生成md文件
+
+    导入的旧总结ID晚于已有条目，不能再按ID代表时间先后。
+    """
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_summaries_date ON summaries(summary_date, id)")
+    connection.execute("DROP INDEX IF EXISTS idx_summaries_year")
+
+
+# 数据版本号：(实体, 表名)，表中数据每变更一行，对应实体的版本号加1
+DATA_VERSION_SOURCES = [
+    ("goal", "goals"),
+    ("daily_task", "daily_tasks"),
+    ("task_completion", "task_completions"),
+    ("summary", "summaries"),
+    ("experience", "basic_info"),
+]
+
+
+def _migrate_v7(connection):
+    """
+    新增 data_versions（各实体的数据版本号）
+
+    由触发器在增删改时递增，本地接口据此生成 ETag，不必读取数据就能判断列表是否变化。
+    """
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            entity TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    for entity, table_name in DATA_VERSION_SOURCES:
+        connection.execute("INSERT OR IGNORE INTO data_versions (entity, version) VALUES (?, 0)", (entity,))
+        for operation in ("INSERT", "UPDATE", "DELETE"):
+            connection.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table_name}_version_{operation.lower()}
+                AFTER {operation} ON {table_name}
+                BEGIN
+                    UPDATE data_versions SET version = version + 1 WHERE entity = '{entity}';
+                END
+            """)
+
+
+# 迁移列表：(版本号, 说明, 迁移函数)，版本号必须严格递增
+# 新的表、列、索引请追加新的迁移，不要修改已发布的迁移
+MIGRATIONS = [
+    (1, "创建基础表与刷新查询索引", _migrate_v1),
+    (2, "daily_tasks 增加 completed_at 列", _migrate_v2),
+    (3, "新增 task_completions 与 app_state", _migrate_v3),
+    (4, "新增 summaries", _migrate_v4),
+    (5, "新增全文搜索索引 search_index", _migrate_v5),
+    (6, "summaries 改为按日期索引", _migrate_v6),
+    (7, "新增 data_versions", _migrate_v7),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def ensure_search_index(db_manager):
+    """
+    补建全文搜索索引
+
+    执行 v5 时SQLite不支持 FTS5 trigram 则没有创建索引；之后换用支持的SQLite时在启动时补建。
+    索引已存在时只查询一次 sqlite_master。
+
+    Returns:
+        是否新建了索引
+    """
+    connection = db_manager.connection
+    if get_schema_version(connection) < 5 or search_index_exists(connection):
+        return False
+    if not fts5_trigram_available(connection):
+        return False
+    with db_manager.transaction() as connection:
+        create_search_index(connection)
+    print("✅ 已补建全文搜索索引 search_index")
+    return True
+
+
+def run_migrations(db_manager):
+    """
+    执行所有未应用的迁移
+
+    每个迁移与版本号更新在同一事务中提交，失败时回滚该迁移并抛出异常。
+    版本已是最新时只读取一次 user_version，不执行任何DDL。
+
+    Args:
+        db_manager: 数据库管理器
+
+    Returns:
+        本次应用的迁移数量
+    """
+    connection = db_manager.connection
+    current_version = get_schema_version(connection)
+    if current_version >= LATEST_VERSION:
+        return 0
+
+    applied = 0
+    for version, description, migrate in MIGRATIONS:
+        if version <= current_version:
+            continue
+        with db_manager.transaction() as connection:
+            migrate(connection)
+            connection.execute(f"PRAGMA user_version = {version}")
+        applied += 1
+        print(f"✅ 数据库迁移 v{version}: {description}")
+
+    print(f"✅ 数据库结构已升级: v{current_version} -> v{LATEST_VERSION}")
+    return applied
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+定时任务调度模块
+后台线程睡眠到最近一个任务的到期时间，而不是每分钟轮询一次
+"""
+
+import threading
+from datetime import datetime, timedelta
+from src.utils.config import SCHEDULER_CONFIG
+
+
+def next_daily_run(hour=0, minute=0, now=None):
+    """计算下一次每天 hour:minute 的时间点（严格晚于 now）"""
+    now = now or datetime.now()
+    run_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return run_at
+
+
+class ScheduledJob:
+    """
+    定时任务
+
+    Attributes:
+        name: 任务名称（唯一）
+        callback: 到期时调用的函数
+        next_run: 下一次运行时间
+        compute_next: compute_next(now) -> 下一次运行时间
+    """
+
+    def __init__(self, name, callback, next_run, compute_next):
+        self.name = name
+        self.callback = callback
+        self.next_run = next_run
+        self.compute_next = compute_next
+
+    def __repr__(self):
+        return f"{self.name}@{self.next_run:%Y-%m-%d %H:%M:%S}"
+
+
+class Scheduler:
+    """
+    定时任务调度器
+
+    - 后台线程在 threading.Event 上等待到最近的到期时间，stop() 或新增任务会立即唤醒
+    - 单次等待不超过 SCHEDULER_CONFIG["max_wait_seconds"]，醒来后按墙上时钟重新判断，
+      系统休眠或修改时间后也不会错过任务
+    - 错过的任务（如休眠跨过了到期时间）醒来后只补执行一次
+    - 任务在调度线程中执行，需要操作界面的任务应自行切换到Tk线程
+    """
+
+    def __init__(self, max_wait=None):
+        self.max_wait = max_wait or SCHEDULER_CONFIG["max_wait_seconds"]
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def add_job(self, name, callback, compute_next, first_run=None):
+        """
+        注册定时任务（同名任务会被替换）
+
+        Args:
+            name: 任务名称
+            callback: 到期时调用的函数
+            compute_next: compute_next(now) -> 下一次运行时间
+            first_run: 第一次运行时间，默认为 compute_next(当前时间)
+        """
+        job = ScheduledJob(name, callback, first_run or compute_next(datetime.now()), compute_next)
+        with self._lock:
+            self.jobs[name] = job
+        self._wakeup.set()
+        return job
+
+    def add_daily_job(self, name, callback, hour=0, minute=0):
+        """注册每天 hour:minute 运行的任务"""
+        return self.add_job(name, callback, lambda now: next_daily_run(hour, minute, now))
+
+    def add_interval_job(self, name, callback, seconds):
+        """注册每隔 seconds 秒运行的任务"""
+        return self.add_job(name, callback, lambda now: now + timedelta(seconds=seconds))
+
+    def remove_job(self, name):
+        """取消定时任务"""
+        with self._lock:
+            return self.jobs.pop(name, None) is not None
+
+    def start(self):
+        """启动调度线程"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._wakeup.clear()
+            self._thread = threading.Thread(target=self._run, name="las-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=1):
+        """停止调度线程（立即唤醒，不必等到下一个到期时间）"""
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+
+    def run_pending(self, now=None):
+        """执行所有已到期的任务，返回执行的任务名称列表"""
+        now = now or datetime.now()
+        with self._lock:
+            due = [job for job in self.jobs.values() if job.next_run <= now]
+            for job in due:
+                job.next_run = job.compute_next(now)
+
+        for job in due:
+            try:
+                job.callback()
+            except Exception as e:
+                print(f"❌ 定时任务 {job.name} 执行失败: {e}")
+        return [job.name for job in due]
+
+    def seconds_until_next(self, now=None):
+        """距离最近一个任务到期的秒数（不超过最长等待时间）"""
+        now = now or datetime.now()
+        with self._lock:
+            if not self.jobs:
+                return self.max_wait
+            next_run = min(job.next_run for job in self.jobs.values())
+        return min(max((next_run - now).total_seconds(), 0), self.max_wait)
+
+    def _run(self):
+        while not self._stopped:
+            # 先清除唤醒标记，执行期间新增的任务会让下一次等待立即返回
+            self._wakeup.clear()
+            self.run_pending()
+            self._wakeup.wait(self.seconds_until_next())
+
+
+# 全局调度器实例
+_scheduler = None
+
+def get_scheduler():
+    """获取调度器实例"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler()
+    return _scheduler
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+搜索模块
+在总结、目标和每日任务中搜索关键词，优先使用 FTS5 全文索引 search_index
+"""
+
+from src.utils.database import get_database_manager
+from src.utils.migrations import SEARCH_ENTITY_COUNT, SEARCH_SOURCES, search_index_exists
+
+# 默认最多返回的结果数
+SEARCH_LIMIT = 50
+
+# trigram 分词只能匹配不少于3个字符的关键词
+TRIGRAM_MIN_LENGTH = 3
+
+ENTITY_NAMES = {"goal": "目标", "daily_task": "每日任务", "summary": "总结"}
+
+
+def _like_pattern(term):
+    """LIKE 子串匹配模式（转义 % 和 _）"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _match_expression(terms):
+    """FTS5 查询表达式：每个关键词作为短语，全部匹配"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _snippet(text, term, width=30):
+    """截取关键词前后的一段文本"""
+    text = (text or "").replace("\n", " ")
+    position = text.find(term) if term else -1
+    if position < 0:
+        return text[:width * 2] + ("…" if len(text) > width * 2 else "")
+    start = max(position - width, 0)
+    end = position + len(term) + width
+    return ("…" if start > 0 else "") + text[start:end] + ("…" if end < len(text) else "")
+
+
+class SearchManager:
+    """
+    搜索管理器
+
+    - 索引由数据库触发器随数据增删改同步维护，搜索时不需要重建
+    - 关键词按空白拆分，结果需包含全部关键词；全文索引匹配时按相关度排序
+    - 关键词短于3个字符（如两个汉字）时在索引表上做 LIKE 子串匹配
+    - 当前SQLite不支持 FTS5 trigram 时（未创建索引），直接在各数据表上做 LIKE 匹配
+    """
+
+    def __init__(self, db_manager=None):
+        self.db_manager = db_manager or get_database_manager()
+        self._has_index = None
+
+    def has_index(self):
+        """数据库中是否有全文索引"""
+        if self._has_index is None:
+            self._has_index = search_index_exists(self.db_manager.connection)
+        return self._has_index
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """
+        搜索
+
+        Returns:
+            结果列表，每项为 {'entity', 'entity_id', 'title', 'snippet'}
+        """
+        terms = query.split()
+        if not terms:
+            return []
+
+        if not self.has_index():
+            results = self._search_tables(terms, limit)
+        elif all(len(term) >= TRIGRAM_MIN_LENGTH for term in terms):
+            results = self._search_match(terms, limit)
+        else:
+            results = self._search_index_like(terms, limit)
+
+        for result in results:
+            result['snippet'] = _snippet(result.pop('body'), terms[0])
+        return results
+
+    def _search_match(self, terms, limit):
+        """全文索引匹配，按相关度排序"""
+        return self.db_manager.execute_query(
+            f"SELECT entity, rowid / {SEARCH_ENTITY_COUNT} AS entity_id, title, body "
+            "FROM search_index WHERE search_index MATCH ? ORDER BY rank LIMIT ?",
+            (_match_expression(terms), limit)
+        )
+
+    def _search_index_like(self, terms, limit):
+        """在索引表上做子串匹配，按ID倒序（最新在前）"""
+        conditions = " AND ".join(
+            "(title LIKE ? ESCAPE '\\' OR body LIKE ? ESCAPE '\\')" for _ in terms
+        )
+        params = []
+        for term in terms:
+            params.extend([_like_pattern(term)] * 2)
+        return self.db_manager.execute_query(
+            f"SELECT entity, rowid / {SEARCH_ENTITY_COUNT} AS entity_id, title, body "
+            f"FROM search_index WHERE {conditions} ORDER BY rowid DESC LIMIT ?",
+            tuple(params) + (limit,)
+        )
+
+    def _search_tables(self, terms, limit):
+        """没有全文索引时在各数据表上做子串匹配"""
+        results = []
+        for entity, table_name, title_column, body_column in SEARCH_SOURCES:
+            conditions = " AND ".join(
+                f"({title_column} LIKE ? ESCAPE '\\' OR {body_column} LIKE ? ESCAPE '\\')" for _ in terms
+            )
+            params = []
+            for term in terms:
+                params.extend([_like_pattern(term)] * 2)
+            results.extend(self.db_manager.execute_query(
+                f"SELECT '{entity}' AS entity, id AS entity_id, {title_column} AS title, {body_column} AS body "
+                f"FROM {table_name} WHERE {conditions} ORDER BY id DESC LIMIT ?",
+                tuple(params) + (limit,)
+            ))
+        return results[:limit]
+
+
+# 全局搜索管理器实例
+_search_manager = None
+
+def get_search_manager():
+    """获取搜索管理器实例"""
+    global _search_manager
+    if _search_manager is None:
+        _search_manager = SearchManager()
+    return _search_manager
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+统计模块
+从数据缓存和等级状态中一次遍历计算"数据统计"选项卡的全部数据
+"""
+
+from src.utils.data_cache import get_data_cache
+from src.utils.level_state import get_level_state
+
+
+class StatisticsSnapshot:
+    """一次统计的结果，相等比较用于判断是否需要重新渲染"""
+
+    def __init__(self, goal_counts, task_counts, experience, level):
+        self.goal_counts = goal_counts  # goal_type -> (总计, 已完成, 进行中)
+        self.task_counts = task_counts  # (总计, 已完成, 未完成)
+        self.experience = experience
+        self.level = level
+
+    def _key(self):
+        return self.goal_counts, self.task_counts, self.experience, self.level
+
+    def __eq__(self, other):
+        return isinstance(other, StatisticsSnapshot) and self._key() == other._key()
+
+
+def completion_rate(completed, total):
+    """完成率（百分比）"""
+    return (completed / total) * 100 if total > 0 else 0
+
+
+class StatisticsEngine:
+    """
+    统计引擎
+
+    - 目标和任务各遍历一次缓存记录，同时得到全部计数，不再分别查询数据库
+    - 等级信息来自等级状态
+    - 渲染结果与上一次相同时 changed 为 False，调用方无需重绘文本控件
+    """
+
+    def __init__(self, data_cache=None, level_state=None):
+        self.data_cache = data_cache or get_data_cache()
+        self.level_state = level_state or get_level_state()
+        self.last_snapshot = None
+
+    def compute(self):
+        """计算全部统计数据"""
+        goal_counts = {}
+        for goal in self.data_cache.goals.all():
+            counts = goal_counts.setdefault(goal.goal_type, [0, 0, 0])
+            counts[0] += 1
+            if goal.status == '已完成':
+                counts[1] += 1
+            elif goal.status == '进行中':
+                counts[2] += 1
+
+        total = completed = incomplete = 0
+        for task in self.data_cache.daily_tasks.all():
+            total += 1
+            if task.status == '已完成':
+                completed += 1
+            elif task.status == '未完成':
+                incomplete += 1
+
+        experience, level = self.level_state.snapshot()
+        # 与 GROUP BY goal_type 的顺序一致：空类型在前，其余按名称排序
+        ordered = sorted(goal_counts.items(), key=lambda item: (item[0] is not None, item[0] or ""))
+        return StatisticsSnapshot(
+            tuple((goal_type, tuple(counts)) for goal_type, counts in ordered),
+            (total, completed, incomplete),
+            experience, level
+        )
+
+    def refresh(self):
+        """
+        重新计算统计数据
+
+        Returns:
+            (快照, 是否与上一次不同)
+        """
+        snapshot = self.compute()
+        changed = snapshot != self.last_snapshot
+        self.last_snapshot = snapshot
+        return snapshot, changed
+
+    def format_goal_statistics(self, snapshot):
+        """格式化目标统计"""
+        lines = []
+        for goal_type, (total, completed, in_progress) in snapshot.goal_counts:
+            lines.append(
+                f"{goal_type or '未知'}: 总计{total}个, 已完成{completed}个, 进行中{in_progress}个, "
+                f"完成率{completion_rate(completed, total):.1f}%\n"
+            )
+        return "".join(lines) if lines else "暂无目标数据"
+
+    def format_daily_task_statistics(self, snapshot):
+        """格式化每日任务统计"""
+        total, completed, incomplete = snapshot.task_counts
+        return (f"任务统计: 总计{total}个, 已完成{completed}个, 未完成{incomplete}个, "
+                f"完成率{completion_rate(completed, total):.1f}%")
+
+    def format_user_level_info(self, snapshot):
+        """格式化用户等级信息"""
+        return f"当前等级: {snapshot.level}\n当前经验: {snapshot.experience}\n"
+
+    def render(self, snapshot):
+        """生成"数据统计"选项卡的完整文本"""
+        return f"""
+=== 目标统计 ===
+{self.format_goal_statistics(snapshot)}
+
+=== 每日任务统计 ===
+{self.format_daily_task_statistics(snapshot)}
+
+=== 用户等级信息 ===
+{self.format_user_level_info(snapshot)}
+"""
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+总结导入模块
+把旧版本写入的 doc/<年份>.md 逐行解析后批量导入 summaries 表
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime
+from src.utils.summary_store import get_summary_store, content_hash
+
+# 每批插入的条目数（同一天的条目总在同一批中）
+IMPORT_BATCH_SIZE = 500
+
+# 条目之间至少隔3个空行（旧版本写入 "内容\n" + "\n\n\n"）
+SEPARATOR_BLANK_LINES = 3
+
+# 日期行，例如 2025-08-01（也接受 2025.08.01 / 2025/8/1）
+DATE_HEADER_PATTERN = re.compile(r"^(\d{4})[-./](\d{1,2})[-./](\d{1,2})$")
+
+# 可导入的文件名：<年份>.md 或 <年份>.legacy.md
+MARKDOWN_FILE_PATTERN = re.compile(r"^(\d{4})(\.legacy)?\.md$")
+
+
+def parse_date_header(line):
+    """日期行 -> YYYY-MM-DD，不是日期行时返回 None"""
+    match = DATE_HEADER_PATTERN.match(line.strip())
+    if not match:
+        return None
+    try:
+        return datetime(*(int(part) for part in match.groups())).strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def iter_entries(f, default_date, offset=0, hasher=None):
+    """
+    逐行解析总结文件（二进制方式打开，已定位到 offset）
+
+    文件按行读取，任何时候只保留当前条目的内容。
+
+    Args:
+        default_date: 没有日期行的条目使用的日期（文件所属的年份）
+        hasher: 已包含 offset 之前内容的 sha1
+
+    Yields:
+        (日期, 内容, 条目起始偏移, 条目起始处的前缀哈希)
+    """
+    hasher = hasher or hashlib.sha1()
+    lines = []
+    blank_run = 0
+    entry_date = entry_start = entry_hash = None
+
+    for raw in f:
+        text = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+        if not text.strip():
+            blank_run += 1
+        else:
+            if entry_start is not None and blank_run >= SEPARATOR_BLANK_LINES:
+                content = "\n".join(lines).strip()
+                if content:
+                    yield entry_date, content, entry_start, entry_hash
+                entry_start = None
+
+            if entry_start is None:
+                entry_start, entry_hash = offset, hasher.copy()
+                header = parse_date_header(text)
+                entry_date = header or default_date
+                lines = [] if header else [text]
+            else:
+                lines.extend([""] * blank_run)
+                lines.append(text)
+            blank_run = 0
+
+        hasher.update(raw)
+        offset += len(raw)
+
+    if entry_start is not None:
+        content = "\n".join(lines).strip()
+        if content:
+            yield entry_date, content, entry_start, entry_hash
+
+
+def hash_prefix(f, length, chunk_size=1 << 16):
+    """文件前 length 字节的 sha1（分块读取）"""
+    hasher = hashlib.sha1()
+    f.seek(0)
+    remaining = length
+    while remaining > 0:
+        chunk = f.read(min(chunk_size, remaining))
+        if not chunk:
+            break
+        hasher.update(chunk)
+        remaining -= len(chunk)
+    return hasher
+
+
+class SummaryImporter:
+    """
+    旧总结文件导入器
+
+    - 逐行解析，不把整个文件读入内存；每批条目在一个事务中 executemany 插入
+    - (日期, 内容哈希) 唯一，重复导入同一条目会被忽略
+    - 每个文件在 app_state 中记录检查点（大小、修改时间、已导入的偏移和该偏移之前内容的哈希），
+      与检查点一致的文件直接跳过；只在末尾追加了内容的文件从偏移处继续解析，
+      其它改动（如在开头插入新条目）重新解析整个文件
+    - 某年的旧内容全部导入后，生成 <年份>.md 时不再附加 <年份>.legacy.md
+    """
+
+    def __init__(self, summary_store=None, batch_size=IMPORT_BATCH_SIZE):
+        self.store = summary_store or get_summary_store()
+        self.db_manager = self.store.db_manager
+        self.batch_size = batch_size
+
+    def checkpoint_key(self, path):
+        return f"summary_import:{os.path.basename(path)}"
+
+    def load_checkpoint(self, path):
+        value = self.db_manager.get_state(self.checkpoint_key(path))
+        return json.loads(value) if value else None
+
+    def _save_batch(self, path, rows, checkpoint):
+        """插入一批条目并更新检查点（同一事务），返回新增的条目数"""
+        inserted = 0
+        with self.db_manager.transaction():
+            if rows:
+                cursor = self.db_manager.connection.executemany(
+                    "INSERT OR IGNORE INTO summaries (summary_date, content, content_hash, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                inserted = cursor.rowcount
+            self.db_manager.set_state(self.checkpoint_key(path), json.dumps(checkpoint))
+        return inserted
+
+    def import_file(self, path, year):
+        """
+        导入一个总结文件
+
+        Returns:
+            (解析的条目数, 新增的条目数)
+        """
+        stat = os.stat(path)
+        checkpoint = self.load_checkpoint(path)
+        if (checkpoint and checkpoint.get("complete") and checkpoint["size"] == stat.st_size
+                and checkpoint["mtime_ns"] == stat.st_mtime_ns):
+            return 0, 0
+
+        parsed = inserted = 0
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        base = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "complete": False}
+
+        with open(path, 'rb') as f:
+            offset, hasher = 0, None
+            if checkpoint and 0 < checkpoint["offset"] <= stat.st_size:
+                prefix = hash_prefix(f, checkpoint["offset"])
+                if prefix.hexdigest() == checkpoint["prefix_hash"]:
+                    offset, hasher = checkpoint["offset"], prefix
+            f.seek(offset)
+
+            pending = []
+            last = None
+            for summary_date, content, start, start_hash in iter_entries(f, str(year), offset, hasher):
+                # 只在日期变化处分批，同一天的条目倒序插入后ID仍与时间先后一致
+                if len(pending) >= self.batch_size and summary_date != pending[-1][0]:
+                    inserted += self._save_batch(
+                        path, pending[::-1],
+                        dict(base, offset=start, prefix_hash=start_hash.hexdigest())
+                    )
+                    pending = []
+                pending.append((summary_date, content, content_hash(content), created_at))
+                last = (start, start_hash)
+                parsed += 1
+
+            # 最后一个条目之后可能还会被追加内容，检查点停在它的开头，下次从这里重新解析
+            final_offset, final_hash = last if last else (0, hashlib.sha1())
+            inserted += self._save_batch(
+                path, pending[::-1],
+                dict(base, offset=final_offset, prefix_hash=final_hash.hexdigest(), complete=True)
+            )
+        return parsed, inserted
+
+    def find_sources(self):
+        """doc目录下的旧总结文件 -> {年份: [文件路径]}"""
+        sources = {}
+        if not os.path.isdir(self.store.doc_dir):
+            return sources
+        for name in sorted(os.listdir(self.store.doc_dir)):
+            match = MARKDOWN_FILE_PATTERN.match(name)
+            if not match:
+                continue
+            year, legacy = match.groups()
+            # 已由数据库生成的 <年份>.md 不是旧内容
+            if not legacy and self.db_manager.get_state(f"summary_markdown_managed:{year}"):
+                continue
+            sources.setdefault(year, []).append(os.path.join(self.store.doc_dir, name))
+        return sources
+
+    def import_all(self):
+        """
+        导入doc目录下全部旧总结文件，并重新生成对应年份的md文件
+
+        Returns:
+            {'files', 'parsed', 'inserted', 'years', 'seconds'}
+        """
+        start_time = time.perf_counter()
+        report = {"files": 0, "parsed": 0, "inserted": 0, "years": []}
+        for year, paths in self.find_sources().items():
+            year_inserted = 0
+            for path in paths:
+                parsed, inserted = self.import_file(path, year)
+                report["files"] += 1
+                report["parsed"] += parsed
+                year_inserted += inserted
+                if parsed:
+                    print(f"📥 {os.path.basename(path)}: 解析 {parsed} 条, 新增 {inserted} 条")
+            report["inserted"] += year_inserted
+            if not year_inserted and self.store.legacy_imported(year):
+                continue
+
+            # 旧内容已在数据库中：<年份>.md 改名保留后由数据库重新生成，不再附加旧内容
+            self.store.preserve_legacy(year)
+            self.store.mark_legacy_imported(year)
+            self.store.render_year(year)
+            report["years"].append(year)
+
+        report["seconds"] = time.perf_counter() - start_time
+        print(f"✅ 总结导入完成: {report['files']} 个文件, 新增 {report['inserted']} 条, "
+              f"耗时 {report['seconds']:.2f}s")
+        return report
+
+
+# 全局总结导入器实例
+_summary_importer = None
+
+def get_summary_importer():
+    """获取总结导入器实例"""
+    global _summary_importer
+    if _summary_importer is None:
+        _summary_importer = SummaryImporter()
+    return _summary_importer
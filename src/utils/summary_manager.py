@@ -7,67 +7,11 @@
 
 import tkinter as tk
 from tkinter import messagebox
-from datetime import datetime
-import os
-from src.utils.database import execute_query, execute_update
+from src.utils.summary_store import get_summary_store
+from src.utils.summary_importer import get_summary_importer
+from src.utils.las_service import normalize_summary_date
 from src.utils.config import EXP_REWARD_CONFIG
-
-
-def read_summary_file(file_path: str) -> str:
-    """
-    读取总结文件内容
-    
-    Args:
-        file_path: 文件路径
-        
-    Returns:
-        文件内容字符串
-    """
-    if not os.path.exists(file_path):
-        return ""
-    
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
-    except Exception as e:
-        print(f"读取文件失败: {e}")
-        return ""
-
-
-def write_summary_to_file(file_path: str, content: str, date: str = ""):
-    """
-    将总结内容写入文件，在开头添加新内容，在结尾添加空行
-    
-    Args:
-        file_path: 文件路径
-        content: 总结内容
-        date: 日期（可选）
-    """
-    # 确保doc文件夹存在
-    doc_dir = os.path.dirname(file_path)
-    if doc_dir and not os.path.exists(doc_dir):
-        os.makedirs(doc_dir, exist_ok=True)
-    
-    # 读取现有内容
-    existing_content = read_summary_file(file_path)
-    
-    # 构建新内容，使用Markdown格式
-    new_entry = ""
-    if date:
-        new_entry += f"{date}\n"
-    new_entry += f"{content}\n"
-    new_entry += '\n\n\n'
-    
-    # 确保文件结尾有空行
-    if not existing_content.endswith('\n'):
-        new_entry += '\n'
-    
-    # 写入文件：新内容在开头，现有内容在后面，确保结尾有空行
-    try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(new_entry + existing_content)
-    except Exception as e:
-        print(f"写入文件失败: {e}")
+from src.utils.experience_manager import XP_SOURCE_SUMMARY
 
 
 class SummaryManager:
@@ -75,24 +19,44 @@ class SummaryManager:
     
     def __init__(self, main_system):
         self.main_system = main_system
+        self.saving = False
         
     def save_summary(self, content, summary_date):
-        """保存总结到md文件"""
-        try:
-            if not content.strip():
-                messagebox.showwarning("警告", "请输入总结内容")
-                return False
-            
-            # 直接写入md文件
-            self.write_summary_to_md_file(content, summary_date)
-            messagebox.showinfo("成功", "总结已保存到md文件！")
-            # 给予经验值奖励
-            self.give_summary_reward()
-            return True
-                    
-        except Exception as e:
-            messagebox.showerror("错误", f"保存总结失败: {e}")
+        """保存总结（写入数据库只追加一行，在后台线程中进行；md文件在程序关闭时统一生成）"""
+        if not content.strip():
+            messagebox.showwarning("警告", "请输入总结内容")
             return False
+        if self.saving:
+            messagebox.showwarning("警告", "上一条总结正在保存，请稍候")
+            return False
+        
+        self.saving = True
+        self.main_system.background_runner.submit(
+            get_summary_store().add, summary_date, content,
+            on_success=lambda summary_id: self.on_summary_saved(summary_id, summary_date),
+            on_error=self.on_summary_failed
+        )
+        return True
+    
+    def on_summary_saved(self, summary_id, summary_date):
+        """总结保存完成（Tk线程）"""
+        self.saving = False
+        if summary_id is None:
+            messagebox.showinfo("提示", "当天已保存过相同的总结")
+            return
+        
+        messagebox.showinfo("成功", "总结已保存！")
+        # 给予经验值奖励
+        self.give_summary_reward()
+        # 清空表单
+        self.clear_summary_form()
+        # 通知数据变更
+        self.main_system.notify_data_changed("summary_added")
+    
+    def on_summary_failed(self, error):
+        """总结保存失败（Tk线程），保留表单内容以便重试"""
+        self.saving = False
+        messagebox.showerror("错误", f"保存总结失败: {error}")
     
     def give_summary_reward(self):
         """给予总结完成奖励"""
@@ -100,37 +64,32 @@ class SummaryManager:
             exp_reward = EXP_REWARD_CONFIG["summary_completion"]
             
             if hasattr(self.main_system, 'data_manager'):
-                self.main_system.data_manager.update_user_experience(exp_reward)
+                self.main_system.data_manager.update_user_experience(exp_reward, XP_SOURCE_SUMMARY)
                 print(f"📝 总结完成奖励经验值: {exp_reward}")
+                
+                # 经验值有变化时才需要刷新统计信息
+                if exp_reward:
+                    self.main_system.notify_data_changed("experience_changed")
             
         except Exception as e:
             print(f"给予总结奖励失败: {e}")
 
-    def write_summary_to_md_file(self, content, summary_date):
-        """将总结写入md文件"""
-        try:
-            # 使用正确的路径配置获取应用程序路径
-            from src.utils.config import get_app_path
-            app_path = get_app_path()
-            doc_dir = os.path.join(app_path, "doc")
-            
-            # 确保doc目录存在
-            if not os.path.exists(doc_dir):
-                os.makedirs(doc_dir)
-            
-            # 根据年份创建md文件
-            year = summary_date.split('-')[0]
-            md_file_path = os.path.join(doc_dir, f"{year}.md")
-            
-            # 确保文件存在，如果不存在则创建
-            if not os.path.exists(md_file_path):
-                open(md_file_path, 'w', encoding='utf-8')
-            # 写入md文件
-            write_summary_to_file(md_file_path, content, summary_date)
-            print(f"总结已写入md文件: {md_file_path}")
-            
-        except Exception as e:
-            print(f"写入md文件失败: {e}")
+    def import_summary_files(self):
+        """在后台导入doc目录下旧版本写入的总结文件"""
+        self.main_system.background_runner.submit(
+            get_summary_importer().import_all,
+            on_success=self.on_summary_files_imported,
+            on_error=lambda e: messagebox.showerror("错误", f"导入旧总结失败: {e}")
+        )
+    
+    def on_summary_files_imported(self, report):
+        """旧总结导入完成（Tk线程）"""
+        messagebox.showinfo(
+            "导入完成",
+            f"已检查 {report['files']} 个文件，新增 {report['inserted']} 条总结"
+        )
+        if report['inserted']:
+            self.main_system.notify_data_changed("summary_added")
     
     def clear_summary_form(self):
         """清空总结表单"""
@@ -165,27 +124,13 @@ class SummaryManager:
             # 验证日期格式
             try:
                 # 将 YYYY.MM.DD 格式转换为 YYYY-MM-DD 格式
-                date_parts = summary_date.split('.')
-                if len(date_parts) == 3:
-                    formatted_date = f"{date_parts[0]}-{date_parts[1].zfill(2)}-{date_parts[2].zfill(2)}"
-                else:
-                    formatted_date = summary_date
-                
-                # 验证日期格式
-                datetime.strptime(formatted_date, "%Y-%m-%d")
+                formatted_date = normalize_summary_date(summary_date)
             except ValueError:
                 messagebox.showerror("错误", "日期格式不正确，请使用 YYYY.MM.DD 格式")
                 return
             
-            # 保存总结
-            success = self.save_summary(content, formatted_date)
+            # 保存总结（完成后清空表单并通知数据变更）
+            self.save_summary(content, formatted_date)
             
-            if success:
-                # 清空表单
-                self.clear_summary_form()
-                
-                # 通知数据变更
-                self.main_system.notify_data_changed("summary_added")
-                
         except Exception as e:
             messagebox.showerror("错误", f"保存总结失败: {e}")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+总结存储模块
+总结条目保存在数据库的 summaries 表中，doc/<年份>.md 按需从条目生成
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+from datetime import datetime
+from src.utils.database import get_database_manager
+from src.utils.config import get_app_path
+
+# 待生成md文件的年份在 app_state 中的键前缀
+DIRTY_STATE_PREFIX = "summary_markdown_dirty:"
+
+# 每页读取的条目数（生成md文件时分批读取，不一次载入整年内容）
+RENDER_BATCH_SIZE = 200
+
+
+def content_hash(content):
+    """总结内容的哈希（用于去重）"""
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def year_range(year):
+    """某年的 summary_date 范围 [开始, 结束)，包含只记录了年份的条目"""
+    return str(year), str(int(year) + 1)
+
+
+def format_entry(summary_date, content):
+    """单条总结的Markdown文本（与原先写入md文件的格式一致；只有年份的条目不写日期行）"""
+    entry = f"{summary_date}\n" if summary_date and len(summary_date) > 4 else ""
+    return entry + f"{content}\n" + '\n\n\n'
+
+
+class SummaryStore:
+    """
+    总结存储
+
+    - 保存一条总结只插入一行，耗时与已有总结的多少无关；md文件不随每次保存重新生成，
+      只把该年记为待生成（app_state.summary_markdown_dirty:<年份>），
+      由 render_dirty() 在退出时（图形界面关闭、命令行命令结束）每年生成一次
+    - doc/<年份>.md 按时间倒序（最新在前）生成，先写入临时文件再 os.replace 替换，
+      写入中途崩溃不会截断原文件
+    - 第一次生成某年的md文件前，手写/旧版本写入的内容改名为 <年份>.legacy.md 保留，
+      并附在生成的文件末尾（旧内容都早于数据库中的条目）；旧内容导入数据库后不再附加
+      （见 summary_importer）
+    """
+
+    def __init__(self, db_manager=None, doc_dir=None):
+        self.db_manager = db_manager or get_database_manager()
+        self.doc_dir = doc_dir or os.path.join(get_app_path(), "doc")
+
+    def add(self, summary_date, content):
+        """
+        保存一条总结
+
+        Returns:
+            新条目的ID；同一天已有完全相同的内容时返回 None
+        """
+        with self.db_manager.transaction():
+            cursor = self.db_manager.connection.execute(
+                "INSERT OR IGNORE INTO summaries (summary_date, content, content_hash, created_at) VALUES (?, ?, ?, ?)",
+                (summary_date, content, content_hash(content), datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            if not cursor.rowcount:
+                return None
+            self.mark_dirty(summary_date[:4])
+            return cursor.lastrowid
+
+    def mark_dirty(self, year):
+        """把某年记为待生成md文件"""
+        self.db_manager.set_state(f"{DIRTY_STATE_PREFIX}{year}", "1")
+
+    def dirty_years(self):
+        """待生成md文件的年份"""
+        rows = self.db_manager.execute_query(
+            "SELECT key FROM app_state WHERE key LIKE ? ORDER BY key", (f"{DIRTY_STATE_PREFIX}%",)
+        )
+        return [row['key'][len(DIRTY_STATE_PREFIX):] for row in rows]
+
+    def render_dirty(self):
+        """
+        生成所有待生成的md文件（每年一次）
+
+        Returns:
+            生成的文件路径列表
+        """
+        return [self.render_year(year) for year in self.dirty_years()]
+
+    def iter_year(self, year):
+        """按日期倒序（同一天按保存顺序倒序）分批读取某年的总结"""
+        start, end = year_range(year)
+        last = None
+        while True:
+            if last is None:
+                rows = self.db_manager.execute_query(
+                    "SELECT id, summary_date, content FROM summaries "
+                    "WHERE summary_date >= ? AND summary_date < ? "
+                    "ORDER BY summary_date DESC, id DESC LIMIT ?",
+                    (start, end, RENDER_BATCH_SIZE)
+                )
+            else:
+                rows = self.db_manager.execute_query(
+                    "SELECT id, summary_date, content FROM summaries "
+                    "WHERE summary_date >= ? AND (summary_date, id) < (?, ?) "
+                    "ORDER BY summary_date DESC, id DESC LIMIT ?",
+                    (start, last['summary_date'], last['id'], RENDER_BATCH_SIZE)
+                )
+            yield from rows
+            if len(rows) < RENDER_BATCH_SIZE:
+                return
+            last = rows[-1]
+
+    def markdown_path(self, year):
+        return os.path.join(self.doc_dir, f"{year}.md")
+
+    def legacy_path(self, year):
+        return os.path.join(self.doc_dir, f"{year}.legacy.md")
+
+    def legacy_imported(self, year):
+        """旧的总结文件是否已导入数据库（已导入时生成md文件不再附加旧内容）"""
+        return bool(self.db_manager.get_state(f"summary_legacy_imported:{year}"))
+
+    def mark_legacy_imported(self, year):
+        self.db_manager.set_state(f"summary_legacy_imported:{year}", "1")
+
+    def preserve_legacy(self, year):
+        """第一次生成某年的md文件前，把非本模块生成的内容改名保留"""
+        state_key = f"summary_markdown_managed:{year}"
+        if self.db_manager.get_state(state_key):
+            return
+        md_path = self.markdown_path(year)
+        if os.path.exists(md_path) and not os.path.exists(self.legacy_path(year)):
+            os.replace(md_path, self.legacy_path(year))
+            print(f"📦 旧的总结文件已保留为: {self.legacy_path(year)}")
+        self.db_manager.set_state(state_key, "1")
+
+    def render_year(self, year):
+        """
+        重新生成 doc/<年份>.md（原子替换）
+
+        Returns:
+            生成的文件路径
+        """
+        os.makedirs(self.doc_dir, exist_ok=True)
+        self.preserve_legacy(year)
+        # 先清除待生成标记：生成期间的新保存会重新标记，不会遗漏
+        dirty_key = f"{DIRTY_STATE_PREFIX}{year}"
+        self.db_manager.execute_update("DELETE FROM app_state WHERE key = ?", (dirty_key,))
+
+        md_path = self.markdown_path(year)
+        temp_path = f"{md_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for row in self.iter_year(year):
+                    f.write(format_entry(row['summary_date'], row['content']))
+                legacy_path = self.legacy_path(year)
+                if os.path.exists(legacy_path) and not self.legacy_imported(year):
+                    with open(legacy_path, 'r', encoding='utf-8') as legacy:
+                        shutil.copyfileobj(legacy, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, md_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            self.mark_dirty(year)
+            raise
+        return md_path
+
+
+# 全局总结存储实例
+_summary_store = None
+
+def get_summary_store():
+    """获取总结存储实例"""
+    global _summary_store
+    if _summary_store is None:
+        _summary_store = SummaryStore()
+    return _summary_store
+
+def open_summary_store(doc_dir):
+    """改用指定的md文件目录（命令行 --db 参数：与数据库文件放在同一目录）"""
+    global _summary_store
+    _summary_store = SummaryStore(doc_dir=doc_dir)
+    return _summary_store
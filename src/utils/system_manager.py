@@ -7,12 +7,21 @@
 
 import tkinter as tk
 from datetime import datetime
-from src.utils.database import get_database_manager
-from src.utils.config import DATABASE_NAME, WINDOW_CONFIG
+from src.utils.database import get_database_manager, close_database_manager
+from src.utils.config import DATABASE_NAME, WINDOW_CONFIG, API_SERVER_CONFIG, DAILY_TASK_CONFIG
 from src.utils.database import init_daily_reset_manager
 from src.utils.data_manager import DataManager
 from src.utils.summary_manager import SummaryManager
-from src.utils.event_manager import EventManager
+from src.utils.summary_store import get_summary_store
+from src.utils.event_manager import EventManager, GOAL_EVENTS, DAILY_TASK_EVENTS
+from src.utils.data_cache import get_data_cache
+from src.utils.task_runner import BackgroundRunner
+from src.utils.level_state import get_level_state
+from src.utils.las_service import LASService
+from src.utils.scheduler import get_scheduler
+
+# 新的一天开始时通知界面刷新的定时任务
+DAY_CHANGE_JOB = "day_change"
 
 
 class SystemManager:
@@ -21,11 +30,15 @@ class SystemManager:
     def __init__(self, main_system):
         self.main_system = main_system
         self.root = main_system.root
+        self._external_check_pending = False
         
     def init_system(self):
         """初始化系统"""
         # 初始化管理器
+        self.main_system.background_runner = BackgroundRunner(self.root)
+        self.main_system.background_runner.start()
         self.main_system.event_manager = EventManager(self.main_system)
+        self.main_system.service = LASService(notify=self.main_system.notify_data_changed)
         self.main_system.data_manager = DataManager(self.main_system)
         self.main_system.summary_manager = SummaryManager(self.main_system)
         
@@ -35,9 +48,20 @@ class SystemManager:
         # 初始化每日重置管理器
         self.init_daily_reset()
         
-        # 注册事件监听器
+        # 新的一天开始时刷新每日任务状态（与是否开启每日重置无关）
+        self.init_day_change()
+        
+        # 启动本地接口（配置开启时）
+        self.init_api_server()
+        
+        # 注册事件监听器（数据缓存最先收到事件，界面刷新时读到的已是最新数据）
+        self.main_system.data_cache = get_data_cache()
+        self.main_system.event_manager.add_event_listener(self.main_system.data_cache, GOAL_EVENTS | DAILY_TASK_EVENTS)
         self.main_system.add_event_listener(self.main_system)
         
+        # 窗口获得焦点时检查其它进程（命令行等）对数据的修改
+        self.root.bind("<FocusIn>", self.on_focus_in, add="+")
+        
     def init_database(self):
         """初始化数据库"""
         self.main_system.db_path = DATABASE_NAME
@@ -68,17 +92,108 @@ class SystemManager:
         except Exception as e:
             print(f"❌ 每日重置管理器初始化失败: {e}")
     
+    def init_day_change(self):
+        """每天 auto_reset_hour 点（逻辑日期变化）通知数据缓存和界面，任务的当天状态随之更新"""
+        scheduler = get_scheduler()
+        scheduler.add_daily_job(DAY_CHANGE_JOB, self.on_day_change, DAILY_TASK_CONFIG["auto_reset_hour"])
+        scheduler.start()
+    
+    def on_day_change(self):
+        """新的一天开始（调度线程中调用，通知在Tk线程中分发）"""
+        self.main_system.notify_data_changed("day_changed")
+    
+    def init_api_server(self):
+        """启动本地HTTP/JSON接口（通过界面使用的业务服务读写，变更同样通知界面刷新）"""
+        self.main_system.api_server = None
+        if not API_SERVER_CONFIG["enabled"]:
+            return
+        try:
+            from src.utils.api_server import ApiServer
+            self.main_system.api_server = ApiServer(self.main_system.service)
+            self.main_system.api_server.start_in_thread()
+        except Exception as e:
+            self.main_system.api_server = None
+            print(f"❌ 本地接口启动失败: {e}")
+    
+    def shutdown(self):
+        """正常退出：停止后台线程，生成待生成的总结md文件，再关闭数据库（清除运行标记）"""
+        try:
+            if getattr(self.main_system, 'daily_reset_manager', None):
+                self.main_system.daily_reset_manager.stop_daily_reset()
+            get_scheduler().remove_job(DAY_CHANGE_JOB)
+            get_scheduler().stop()
+            if getattr(self.main_system, 'api_server', None):
+                self.main_system.api_server.stop()
+            if getattr(self.main_system, 'background_runner', None):
+                self.main_system.background_runner.shutdown()
+            self.render_summaries()
+            close_database_manager()
+            print("✅ 系统已正常关闭")
+        except Exception as e:
+            print(f"❌ 系统关闭失败: {e}")
+    
+    def render_summaries(self):
+        """生成本次运行中有新总结的年份的md文件（每年一次）"""
+        try:
+            for md_path in get_summary_store().render_dirty():
+                print(f"总结已写入md文件: {md_path}")
+        except Exception as e:
+            print(f"生成md文件失败: {e}")
+    
     def load_data(self):
-        """加载数据"""
+        """加载数据（数据库读取在后台线程中进行，完成后再填充列表）"""
         self.main_system.gui.update_time_display()
-        self.main_system.gui.load_user_level()
         self.main_system.gui.update_countdown_display()
+        self.main_system.background_runner.submit(
+            self.warm_up_caches,
+            on_success=lambda _: self.show_loaded_data(),
+            on_error=self.on_load_failed
+        )
+    
+    def warm_up_caches(self):
+        """预先加载数据缓存和等级状态（在工作线程中执行）"""
+        cache = get_data_cache()
+        # 先记录数据版本号，之后其它进程的修改都能被发现
+        cache.check_external_changes()
+        cache.goals.all()
+        cache.daily_tasks.all()
+        get_level_state().snapshot()
+    
+    def show_loaded_data(self):
+        """数据加载完成后填充界面"""
+        self.main_system.gui.load_user_level()
         self.main_system.data_manager.refresh_goals()
         self.main_system.data_manager.refresh_daily_tasks()
         
         # 初始化新选项卡的内容
         self.main_system.data_manager.refresh_stats_display()
     
+    def on_load_failed(self, error):
+        """后台加载失败时仍在界面线程中尝试加载"""
+        print(f"❌ 后台加载数据失败: {error}")
+        self.show_loaded_data()
+    
+    def on_focus_in(self, event):
+        """焦点在控件之间移动也会触发，同一空闲周期内只检查一次"""
+        if not self._external_check_pending:
+            self._external_check_pending = True
+            self.root.after_idle(self.check_external_changes)
+    
+    def check_external_changes(self):
+        """其它进程修改过的数据：重新读取等级，并通知缓存失效、界面刷新"""
+        self._external_check_pending = False
+        try:
+            event_types = self.main_system.data_cache.check_external_changes()
+            if not event_types:
+                return
+            print(f"🔄 检测到其它进程修改了数据: {sorted(event_types)}")
+            if "experience_changed" in event_types:
+                get_level_state().sync()
+            for event_type in sorted(event_types):
+                self.main_system.notify_data_changed(event_type)
+        except Exception as e:
+            print(f"❌ 检查外部数据变更失败: {e}")
+    
     def get_current_date_str(self):
         """获取当前日期字符串"""
         return datetime.now().strftime("%Y.%m.%d")
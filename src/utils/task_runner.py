@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台任务模块
+耗时操作（数据库加载、文件写入、导出等）在线程池中执行，结果通过 root.after_idle 回到Tk线程处理
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.config import BACKGROUND_CONFIG
+
+
+class BackgroundRunner:
+    """
+    后台任务执行器
+
+    用法：
+        runner.submit(load_rows, goal_type,
+                      on_success=lambda rows: tree_sync.sync(rows),
+                      on_error=lambda e: print(e))
+
+    - submit 立即返回 concurrent.futures.Future，任务在工作线程中执行
+    - on_success / on_error 总是在Tk线程中调用，可以直接操作界面
+    - 回调先放入队列；只有队列由空变为非空时才排定一次 after_idle 处理，空闲时不占用Tk线程
+      （跨线程调用 after_idle 依赖 Python 自带的多线程版 Tcl，在 mainloop 运行后才会发生：
+      start() 先排定一次处理，在它执行之前工作线程只入队，不调用Tk）
+    - 没有Tk根窗口时（命令行、测试）回调在工作线程中直接调用
+    - 工作线程访问数据库时使用各自的线程连接（见 DatabaseManager 连接池）
+    """
+
+    def __init__(self, root=None, max_workers=None):
+        self.root = root
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or BACKGROUND_CONFIG["max_workers"],
+            thread_name_prefix="las-worker"
+        )
+        self._callbacks = queue.SimpleQueue()
+        self._ui_thread = threading.current_thread()
+        self._lock = threading.Lock()
+        self._started = False
+        self._drain_scheduled = False  # 已排定、尚未执行的队列处理
+        self._closed = False
+
+    def start(self):
+        """开始在Tk线程中处理回调队列（在Tk线程中调用）"""
+        if self.root is None or self._started:
+            return
+        self._started = True
+        with self._lock:
+            self._drain_scheduled = True
+        # mainloop 开始后的第一个空闲周期处理此前入队的回调
+        self.root.after_idle(self._drain)
+
+    def in_ui_thread(self):
+        """当前是否为Tk线程"""
+        return threading.current_thread() is self._ui_thread
+
+    def call_in_ui(self, callback, *args):
+        """在Tk线程中调用 callback（可从任意线程调用）"""
+        if self.root is None or (self.in_ui_thread() and not self._started):
+            callback(*args)
+            return
+        with self._lock:
+            self._callbacks.put((callback, args))
+            if self._drain_scheduled or self._closed:
+                return
+            self._drain_scheduled = True
+        self._schedule_drain()
+
+    def _schedule_drain(self):
+        """排定一次队列处理"""
+        try:
+            self.root.after_idle(self._drain)
+        except Exception as e:
+            # 根窗口已销毁：回调留在队列中被丢弃
+            print(f"⚠️ 无法排定后台任务回调: {e}")
+
+    def submit(self, func, *args, on_success=None, on_error=None, **kwargs):
+        """
+        在工作线程中执行 func(*args, **kwargs)
+
+        Args:
+            on_success: on_success(结果)，在Tk线程中调用
+            on_error: on_error(异常)，在Tk线程中调用；未提供时只打印错误
+
+        Returns:
+            concurrent.futures.Future
+        """
+        future = self.executor.submit(func, *args, **kwargs)
+
+        def done(finished):
+            error = finished.exception()
+            if error is not None:
+                if on_error is not None:
+                    self.call_in_ui(on_error, error)
+                else:
+                    print(f"❌ 后台任务 {getattr(func, '__name__', func)} 失败: {error}")
+            elif on_success is not None:
+                self.call_in_ui(on_success, finished.result())
+
+        future.add_done_callback(done)
+        return future
+
+    def _drain(self):
+        """处理回调队列中的全部回调；队列为空时结束，直到下一个回调入队时再排定"""
+        while True:
+            while True:
+                try:
+                    callback, args = self._callbacks.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    callback(*args)
+                except Exception as e:
+                    print(f"❌ 后台任务回调失败: {e}")
+
+            # 与 call_in_ui 的入队在同一把锁下判断，避免回调在清除标记前入队而无人处理
+            with self._lock:
+                if self._callbacks.empty() or self._closed:
+                    self._drain_scheduled = False
+                    return
+
+    def shutdown(self, wait=True):
+        """关闭线程池（等待已提交的任务完成，未处理的界面回调被丢弃）"""
+        self._closed = True
+        self.executor.shutdown(wait=wait, cancel_futures=True)
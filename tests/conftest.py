@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+测试公共夹具：每个测试使用临时目录中的独立数据库，并重置各模块的全局实例
+"""
+
+import os
+import sys
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import (database, data_cache, level_state, las_service, summary_store, summary_importer,
+                       search_manager, experience_manager, completion_manager, bulk_importer, data_exporter)
+
+# 持有数据库管理器引用的全局实例（模块, 变量名）
+SINGLETONS = [
+    (data_cache, "_data_cache"),
+    (level_state, "_level_state"),
+    (las_service, "_las_service"),
+    (summary_store, "_summary_store"),
+    (summary_importer, "_summary_importer"),
+    (search_manager, "_search_manager"),
+    (experience_manager, "_experience_manager"),
+    (completion_manager, "_completion_manager"),
+    (bulk_importer, "_bulk_importer"),
+    (data_exporter, "_data_exporter"),
+]
+
+
+def reset_singletons():
+    for module, name in SINGLETONS:
+        setattr(module, name, None)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "las_database.db")
+
+
+@pytest.fixture
+def db(db_path, tmp_path):
+    """全新的数据库（已执行全部迁移），总结md文件写在同一临时目录"""
+    reset_singletons()
+    manager = database.open_database_manager(db_path)
+    summary_store.open_summary_store(str(tmp_path))
+    yield manager
+    database.close_database_manager()
+    reset_singletons()
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""本地接口：ETag/304、批量请求、错误状态码，以及经由HTTP的完整请求"""
+
+import http.client
+import json
+from http import HTTPStatus
+
+import pytest
+
+from src.utils.api_server import ApiServer, ApiError
+from src.utils.config import API_SERVER_CONFIG
+from src.utils.data_cache import get_data_cache
+from src.utils.las_service import get_las_service
+
+
+@pytest.fixture
+def server(db):
+    server = ApiServer(service=get_las_service(), token="")
+    yield server
+    server.executor.shutdown()
+
+
+def test_unchanged_list_returns_304_with_the_same_etag(server):
+    status, payload, etag = server.dispatch("GET", "/api/goals")
+    assert (status, payload) == (HTTPStatus.OK, {"goals": []})
+    assert etag
+
+    assert server.dispatch("GET", "/api/goals", if_none_match=etag) == (HTTPStatus.NOT_MODIFIED, None, etag)
+    assert server.dispatch("GET", "/api/goals", if_none_match=f'"other", {etag}')[0] == HTTPStatus.NOT_MODIFIED
+    assert server.dispatch("GET", "/api/goals", if_none_match="*")[0] == HTTPStatus.NOT_MODIFIED
+
+
+def test_write_changes_the_etag_of_affected_lists_only(server):
+    _, _, goals_etag = server.dispatch("GET", "/api/goals")
+    _, _, tasks_etag = server.dispatch("GET", "/api/tasks")
+
+    assert server.dispatch("POST", "/api/goals", {"title": "读书", "goal_type": "年计划"})[0] == HTTPStatus.CREATED
+    status, payload, new_etag = server.dispatch("GET", "/api/goals", if_none_match=goals_etag)
+    assert status == HTTPStatus.OK
+    assert new_etag != goals_etag
+    assert [goal["title"] for goal in payload["goals"]] == ["读书"]
+    assert server.dispatch("GET", "/api/tasks", if_none_match=tasks_etag)[0] == HTTPStatus.NOT_MODIFIED
+
+
+def test_external_write_invalidates_the_cached_list(server, db):
+    server.dispatch("GET", "/api/goals")
+    # 绕过业务服务直接写入（相当于其它进程的修改）
+    db.connection.execute("INSERT INTO goals (title, goal_type) VALUES ('外部目标', '月计划')")
+    _, payload, _ = server.dispatch("GET", "/api/goals")
+    assert [goal["title"] for goal in payload["goals"]] == ["外部目标"]
+
+
+def test_own_write_keeps_the_cache_loaded(server):
+    server.dispatch("GET", "/api/goals")
+    assert server.dispatch("POST", "/api/goals", {"title": "读书", "goal_type": "年计划"})[0] == HTTPStatus.CREATED
+    misses = get_data_cache().goals.stats()["misses"]
+    _, payload, _ = server.dispatch("GET", "/api/goals")
+    assert [goal["title"] for goal in payload["goals"]] == ["读书"]
+    # 本进程的写入已通过事件同步到缓存，不需要重新整表加载
+    assert get_data_cache().goals.stats()["misses"] == misses
+
+
+@pytest.mark.parametrize("method, target, body, expected", [
+    ("GET", "/api/unknown", None, HTTPStatus.NOT_FOUND),
+    ("PUT", "/api/goals", None, HTTPStatus.METHOD_NOT_ALLOWED),
+    ("POST", "/api/goals/99/complete", None, HTTPStatus.NOT_FOUND),
+    ("DELETE", "/api/tasks/99", None, HTTPStatus.NOT_FOUND),
+    ("POST", "/api/goals", {"goal_type": "年计划"}, HTTPStatus.BAD_REQUEST),
+    ("POST", "/api/goals", ["不是对象"], HTTPStatus.BAD_REQUEST),
+    ("POST", "/api/tasks/complete", {"ids": ["1"]}, HTTPStatus.BAD_REQUEST),
+    ("POST", "/api/xp", {"amount": "10"}, HTTPStatus.BAD_REQUEST),
+    ("GET", "/api/summaries?year=abc", None, HTTPStatus.BAD_REQUEST),
+])
+def test_error_status_codes(server, method, target, body, expected):
+    status, payload, etag = server.dispatch(method, target, body)
+    assert status == expected
+    assert "error" in payload
+    assert etag is None
+
+
+def test_batch_runs_requests_in_order(server):
+    status, payload = server.dispatch_batch({"requests": [
+        {"method": "POST", "path": "/api/tasks", "body": {"title": "跑步", "priority": "高"}},
+        {"method": "POST", "path": "/api/tasks/1/complete"},
+        {"path": "/api/level"},
+        {"method": "GET", "path": "/api/nothing"},
+        {"method": "GET"},
+    ]})
+    assert status == HTTPStatus.OK
+    responses = payload["responses"]
+    assert [response["status"] for response in responses] == [201, 200, 200, 404, 400]
+    assert responses[1]["body"]["experience"] == 30
+    assert responses[2]["body"]["experience"] == 30
+    assert "etag" in responses[2]
+
+
+def test_batch_passes_if_none_match(server):
+    _, _, etag = server.dispatch("GET", "/api/level")
+    _, payload = server.dispatch_batch({"requests": [{"path": "/api/level", "if_none_match": etag}]})
+    assert payload["responses"] == [{"status": 304, "body": None, "etag": etag}]
+
+
+def test_batch_size_is_limited(server):
+    too_many = [{"path": "/api/level"}] * (API_SERVER_CONFIG["max_batch_size"] + 1)
+    with pytest.raises(ApiError):
+        server.dispatch_batch({"requests": too_many})
+    with pytest.raises(ApiError):
+        server.dispatch_batch({"requests": "不是列表"})
+
+
+@pytest.fixture
+def http_server(db):
+    server = ApiServer(service=get_las_service(), token="secret")
+    server.port = 0  # 由系统分配端口
+    server.start_in_thread()
+    yield server
+    server.stop()
+
+
+def request(connection, method, path, body=None, headers=None):
+    headers = dict({"Authorization": "Bearer secret"}, **(headers or {}))
+    data = None if body is None else json.dumps(body).encode("utf-8")
+    connection.request(method, path, body=data, headers=headers)
+    response = connection.getresponse()
+    raw = response.read()
+    return response.status, response.getheader("ETag"), json.loads(raw) if raw else None
+
+
+def test_http_keep_alive_etag_and_batch(http_server):
+    connection = http.client.HTTPConnection(http_server.host, http_server.port, timeout=5)
+    try:
+        assert request(connection, "GET", "/api/goals", headers={"Authorization": ""})[0] == 401
+
+        status, etag, payload = request(connection, "GET", "/api/goals")
+        assert (status, payload) == (200, {"goals": []})
+        assert request(connection, "GET", "/api/goals", headers={"If-None-Match": etag}) == (304, etag, None)
+
+        status, _, payload = request(connection, "POST", "/api/batch", {"requests": [
+            {"method": "POST", "path": "/api/goals", "body": {"title": "读书", "goal_type": "年计划"}},
+            {"path": "/api/goals"},
+        ]})
+        assert status == 200
+        assert [response["status"] for response in payload["responses"]] == [201, 200]
+        assert payload["responses"][1]["etag"] != etag
+    finally:
+        connection.close()
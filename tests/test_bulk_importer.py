@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""批量导入：CSV（中文列名、BOM）与 JSONL，无效行跳过并报告行号，其余行分批写入"""
+
+import json
+
+import pytest
+
+from src.utils.bulk_importer import BulkImporter, MAX_REPORTED_ERRORS, format_import_report
+
+
+def write_csv(tmp_path, text, name="plan.csv"):
+    path = tmp_path / name
+    # Excel 导出的CSV带BOM
+    path.write_text(text, encoding="utf-8-sig")
+    return str(path)
+
+
+def write_jsonl(tmp_path, lines, name="plan.jsonl"):
+    path = tmp_path / name
+    path.write_text("\n".join(line if isinstance(line, str) else json.dumps(line, ensure_ascii=False)
+                              for line in lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def goal_rows(db):
+    return [tuple(row.values()) for row in db.execute_query(
+        "SELECT title, goal_type, status, priority, created_at FROM goals ORDER BY id")]
+
+
+def test_csv_with_chinese_headers(db, tmp_path):
+    path = write_csv(tmp_path, "标题,类型,状态,优先级,创建时间\n"
+                               "读书,年计划,已完成,高,2025-01-01 08:00:00\n"
+                               " 跑步 ,月计划,,,\n")
+    report = BulkImporter().import_goals(path)
+    assert (report["parsed"], report["inserted"], report["skipped"]) == (2, 2, 0)
+    rows = goal_rows(db)
+    assert rows[0] == ("读书", "年计划", "已完成", "高", "2025-01-01 08:00:00")
+    # 空值使用默认状态和优先级，值去掉首尾空白
+    assert rows[1][:4] == ("跑步", "月计划", "进行中", "中")
+
+
+@pytest.mark.parametrize("line, reason", [
+    (",年计划,,,", "缺少标题"),
+    ("读书,周计划,,,", "goal_type"),
+    ("读书,年计划,废弃,,", "status"),
+    ("读书,年计划,,紧急,", "priority"),
+    ("读书,年计划,,,2025/01/01", "created_at"),
+])
+def test_invalid_csv_rows_are_skipped_with_line_numbers(db, tmp_path, line, reason):
+    path = write_csv(tmp_path, "标题,类型,状态,优先级,创建时间\n有效,月计划,,,\n" + line + "\n")
+    report = BulkImporter().import_goals(path)
+    assert (report["inserted"], report["skipped"]) == (1, 1)
+    assert report["errors"][0].startswith("第 3 行")
+    assert reason in report["errors"][0]
+    assert [row[0] for row in goal_rows(db)] == ["有效"]
+
+
+def test_jsonl_with_bad_lines(db, tmp_path):
+    path = write_jsonl(tmp_path, [
+        {"title": "跑步", "priority": "高"},
+        "{不是JSON",
+        "",
+        '["数组不是对象"]',
+        {"title": "冥想", "priority": "紧急"},
+        {"title": "背单词", "description": 123},
+    ])
+    report = BulkImporter().import_daily_tasks(path)
+    assert (report["parsed"], report["inserted"], report["skipped"]) == (5, 2, 3)
+    assert [error.split(":")[0] for error in report["errors"]] == ["第 2 行", "第 4 行", "第 5 行"]
+    rows = db.execute_query("SELECT title, description, status, priority, experience_reward FROM daily_tasks ORDER BY id")
+    assert [tuple(row.values()) for row in rows] == [
+        ("跑步", "", "未完成", "高", 30),
+        ("背单词", "123", "未完成", "中", 20),
+    ]
+
+
+def test_rows_are_saved_in_batches(db, tmp_path, monkeypatch):
+    path = write_jsonl(tmp_path, [{"title": f"任务{i}"} for i in range(7)])
+    importer = BulkImporter(batch_size=3)
+    batches = []
+    save_batch = importer._save_batch
+    monkeypatch.setattr(importer, "_save_batch", lambda sql, rows: batches.append(len(rows)) or save_batch(sql, rows))
+    assert importer.import_daily_tasks(path)["inserted"] == 7
+    assert batches == [3, 3, 1]
+
+
+def test_reported_errors_are_capped(db, tmp_path):
+    path = write_jsonl(tmp_path, ["坏行"] * (MAX_REPORTED_ERRORS + 5))
+    report = BulkImporter().import_goals(path)
+    assert report["skipped"] == MAX_REPORTED_ERRORS + 5
+    assert len(report["errors"]) == MAX_REPORTED_ERRORS
+    assert "另有 5 行无效" in format_import_report(report)
+
+
+def test_unsupported_file_type_and_table(db, tmp_path):
+    path = tmp_path / "plan.txt"
+    path.write_text("读书\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        BulkImporter().import_goals(str(path))
+    with pytest.raises(ValueError):
+        BulkImporter().import_file(write_jsonl(tmp_path, [{"title": "x"}]), "summaries")
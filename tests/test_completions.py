@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""每日任务完成记录与逻辑重置：当天状态由完成记录决定，重置不改写任务表"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from src.utils import completion_manager
+from src.utils.completion_manager import get_completion_manager, day_key, logical_date
+from src.utils.config import DAILY_TASK_CONFIG
+from src.utils.data_cache import get_data_cache
+from src.utils.database import DailyResetManager, get_app_state, set_app_state
+from src.utils.las_service import get_las_service
+from src.utils.level_state import get_level_state
+
+YESTERDAY = date.today() - timedelta(days=1)
+
+
+class FakeMainSystem:
+    def __init__(self):
+        self.events = []
+
+    def notify_data_changed(self, event_type="data_changed", *args, **kwargs):
+        self.events.append(event_type)
+
+
+@pytest.fixture
+def task_id(db):
+    return get_las_service().add_daily_task("跑步", priority="高")
+
+
+def completion_rows(db):
+    return db.execute_query("SELECT task_id, completed_on, experience FROM task_completions ORDER BY completed_on")
+
+
+def test_completing_twice_a_day_records_and_rewards_once(db, task_id):
+    service = get_las_service()
+    title, exp_gain = service.complete_daily_task(task_id)
+    assert (title, exp_gain) == ("跑步", 30)
+    assert service.complete_daily_task(task_id) == ("跑步", 0)
+    assert completion_rows(db) == [{"task_id": task_id, "completed_on": day_key(), "experience": 30}]
+    assert get_level_state().experience == 30
+
+
+def test_status_comes_from_todays_completion(db, task_id):
+    completions = get_completion_manager()
+    db.execute_update("UPDATE daily_tasks SET status = '已完成' WHERE id = ?", (task_id,))
+    # 任务表中的状态不影响当天状态
+    assert get_data_cache().daily_tasks.get(task_id).status == "未完成"
+
+    completions.record_completion(task_id, 30, f"{day_key(YESTERDAY)} 21:00:00")
+    assert completions.is_completed(task_id, YESTERDAY)
+    assert not completions.is_completed(task_id)
+    get_data_cache().daily_tasks.invalidate()
+    assert get_data_cache().daily_tasks.get(task_id).status == "未完成"
+
+    get_las_service().complete_daily_task(task_id)
+    assert get_data_cache().daily_tasks.get(task_id).status == "已完成"
+
+
+def test_reopen_removes_only_todays_completion(db, task_id):
+    get_completion_manager().record_completion(task_id, 30, f"{day_key(YESTERDAY)} 21:00:00")
+    service = get_las_service()
+    service.complete_daily_task(task_id)
+    assert service.toggle_daily_task(task_id) == ("跑步", "未完成", 0)
+    assert [row["completed_on"] for row in completion_rows(db)] == [day_key(YESTERDAY)]
+
+
+def test_streak_counts_consecutive_days(db, task_id):
+    completions = get_completion_manager()
+    for days_ago in (1, 2, 4):
+        completions.record_completion(task_id, 0, f"{day_key(date.today() - timedelta(days=days_ago))} 08:00:00")
+    # 今天尚未完成时从昨天算起
+    assert completions.get_streak(task_id) == 2
+    get_las_service().complete_daily_task(task_id)
+    assert completions.get_streak(task_id) == 3
+
+
+def test_daily_reset_keeps_task_rows_and_history(db, task_id):
+    service = get_las_service()
+    service.complete_daily_task(task_id)
+    before = db.execute_query("SELECT * FROM daily_tasks")
+    history = completion_rows(db)
+
+    main_system = FakeMainSystem()
+    DailyResetManager(main_system, scheduler=object()).catch_up()
+    assert main_system.events == ["daily_reset"]
+    assert get_app_state("last_reset_date") == day_key()
+    assert db.execute_query("SELECT * FROM daily_tasks") == before
+    assert completion_rows(db) == history
+
+    # 今天已经重置过，不再重复
+    DailyResetManager(main_system, scheduler=object()).catch_up()
+    assert main_system.events == ["daily_reset"]
+
+
+def test_logical_day_starts_at_the_reset_hour(monkeypatch):
+    monkeypatch.setitem(DAILY_TASK_CONFIG, "auto_reset_hour", 4)
+    assert logical_date(datetime(2025, 8, 2, 3, 59)) == date(2025, 8, 1)
+    assert logical_date(datetime(2025, 8, 2, 4, 0)) == date(2025, 8, 2)
+
+
+def test_completion_before_the_reset_hour_counts_for_the_previous_day(db, task_id, monkeypatch):
+    monkeypatch.setitem(DAILY_TASK_CONFIG, "auto_reset_hour", 4)
+    get_completion_manager().record_completion(task_id, 30, "2025-08-02 03:30:00")
+    assert [row["completed_on"] for row in completion_rows(db)] == ["2025-08-01"]
+
+
+def test_cached_status_follows_the_day_change(db, task_id, monkeypatch):
+    get_las_service().complete_daily_task(task_id)
+    cache = get_data_cache().daily_tasks
+    assert cache.get(task_id).status == "已完成"
+
+    # 到了新的一天，没有任何事件通知，缓存按新的日期重新加载
+    tomorrow = logical_date() + timedelta(days=1)
+    monkeypatch.setattr(completion_manager, "logical_date", lambda moment=None: tomorrow)
+    assert cache.get(task_id).status == "未完成"
+
+    monkeypatch.setattr(completion_manager, "logical_date", lambda moment=None: tomorrow + timedelta(days=1))
+    # 按ID重新读取时日期已变化：其余行同样过期，整表失效
+    cache.reload([task_id])
+    assert not cache.loaded
+
+
+def test_day_change_notifies_without_daily_reset(monkeypatch):
+    from src.utils import system_manager
+
+    class FakeScheduler:
+        def __init__(self):
+            self.jobs = {}
+
+        def add_daily_job(self, name, callback, hour=0, minute=0):
+            self.jobs[name] = (callback, hour)
+
+        def start(self):
+            pass
+
+    class FakeRoot:
+        pass
+
+    main_system = FakeMainSystem()
+    main_system.root = FakeRoot()
+    scheduler = FakeScheduler()
+    monkeypatch.setattr(system_manager, "get_scheduler", lambda: scheduler)
+    monkeypatch.setitem(DAILY_TASK_CONFIG, "enable_daily_reset", False)
+    monkeypatch.setitem(DAILY_TASK_CONFIG, "auto_reset_hour", 4)
+
+    system_manager.SystemManager(main_system).init_day_change()
+    callback, hour = scheduler.jobs[system_manager.DAY_CHANGE_JOB]
+    assert hour == 4
+    callback()
+    assert main_system.events == ["day_changed"]
+
+
+def test_catch_up_waits_for_the_reset_hour(db, monkeypatch):
+    monkeypatch.setitem(DAILY_TASK_CONFIG, "auto_reset_hour", 4)
+    now = datetime(2025, 8, 2, 2, 0)
+    monkeypatch.setattr(completion_manager, "logical_date",
+                        lambda moment=None, real=logical_date: real(moment or now))
+    set_app_state("last_reset_date", "2025-08-01")
+    main_system = FakeMainSystem()
+
+    # 午夜之后、重置时间之前启动：仍是 8月1日，不提前重置
+    DailyResetManager(main_system, scheduler=object()).catch_up()
+    assert main_system.events == []
+
+    now = datetime(2025, 8, 2, 4, 0)
+    DailyResetManager(main_system, scheduler=object()).catch_up()
+    assert main_system.events == ["daily_reset"]
+    assert get_app_state("last_reset_date") == "2025-08-02"
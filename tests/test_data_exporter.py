@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""数据导出：所有表取自同一只读快照，快照总会结束，列名加引号"""
+
+import csv
+import json
+
+import pytest
+
+from src.utils.database import DatabaseManager
+from src.utils.data_exporter import DataExporter
+
+
+@pytest.fixture
+def other_process(db, db_path):
+    manager = DatabaseManager(db_path)
+    yield manager
+    manager.close()
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_tables_are_exported_from_one_snapshot(db, tmp_path, other_process, monkeypatch):
+    db.execute_insert("INSERT INTO goals (title, goal_type) VALUES ('读书', '年计划')")
+    exporter = DataExporter()
+    export_table = exporter.export_table
+
+    def export_then_write(table, path, fmt):
+        count = export_table(table, path, fmt)
+        # 导出期间其它连接的写入不阻塞，也不出现在后导出的表中
+        other_process.execute_insert("INSERT INTO goals (title, goal_type) VALUES ('新目标', '月计划')")
+        other_process.execute_insert("INSERT INTO daily_tasks (title) VALUES ('新任务')")
+        return count
+
+    monkeypatch.setattr(exporter, "export_table", export_then_write)
+    report = exporter.export(str(tmp_path / "out"), tables=["goals", "daily_tasks"])
+    assert report["tables"] == {"goals": 1, "daily_tasks": 0}
+    assert not db.connection.in_transaction
+    assert len(db.execute_query("SELECT id FROM daily_tasks")) == 2
+
+
+def test_snapshot_ends_when_export_fails(db, tmp_path, monkeypatch):
+    exporter = DataExporter()
+
+    def fail(table, path, fmt):
+        raise OSError("磁盘已满")
+
+    monkeypatch.setattr(exporter, "export_table", fail)
+    with pytest.raises(OSError):
+        exporter.export(str(tmp_path / "out"))
+    assert not db.connection.in_transaction
+    assert db.execute_insert("INSERT INTO goals (title, goal_type) VALUES ('读书', '年计划')")
+
+
+def test_export_inside_a_transaction_keeps_it_open(db, tmp_path):
+    with db.transaction():
+        db.execute_insert("INSERT INTO goals (title, goal_type) VALUES ('读书', '年计划')")
+        report = DataExporter().export(str(tmp_path / "out"), tables=["goals"])
+        assert db.connection.in_transaction
+    assert report["tables"] == {"goals": 1}
+    assert len(db.execute_query("SELECT id FROM goals")) == 1
+
+
+def test_column_names_are_quoted(db, tmp_path):
+    db.connection.execute('ALTER TABLE goals ADD COLUMN "order" INTEGER')
+    db.execute_insert('INSERT INTO goals (title, goal_type, "order") VALUES (\'读书\', \'年计划\', 3)')
+    out_dir = tmp_path / "out"
+    DataExporter().export(str(out_dir), tables=["goals"])
+    assert read_jsonl(out_dir / "goals.jsonl")[0]["order"] == 3
+
+    DataExporter().export(str(out_dir), fmt="csv", tables=["goals"])
+    with open(out_dir / "goals.csv", newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    assert (rows[0]["title"], rows[0]["order"]) == ("读书", "3")
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""数据库管理器：线程连接池、WAL、事务与运行标记"""
+
+import os
+import sqlite3
+import struct
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from src.utils.database import DatabaseManager
+
+
+def test_each_thread_gets_its_own_connection(db):
+    main_connection = db.connection
+    assert db.connection is main_connection
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(db.connection))
+    thread.start()
+    thread.join()
+    assert other[0] is not main_connection
+
+
+def test_database_uses_wal(db):
+    assert db.connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_close_closes_every_pooled_connection(db):
+    connections = [db.connection]
+    thread = threading.Thread(target=lambda: connections.append(db.connection))
+    thread.start()
+    thread.join()
+
+    db.close()
+    for connection in connections:
+        with pytest.raises(Exception):
+            connection.execute("SELECT 1")
+
+
+def test_transaction_commits_once_and_rolls_back_on_error(db):
+    with db.transaction():
+        db.execute_insert("INSERT INTO goals (title, goal_type) VALUES ('a', '月计划')")
+        db.execute_insert("INSERT INTO goals (title, goal_type) VALUES ('b', '月计划')")
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.execute_insert("INSERT INTO goals (title, goal_type) VALUES ('c', '月计划')")
+            raise RuntimeError("boom")
+
+    titles = [row["title"] for row in db.execute_query("SELECT title FROM goals ORDER BY id")]
+    assert titles == ["a", "b"]
+    assert not db.in_transaction()
+
+
+def test_nested_transaction_rolls_back_only_inner_savepoint(db):
+    with db.transaction():
+        db.execute_insert("INSERT INTO goals (title, goal_type) VALUES ('outer', '月计划')")
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                db.execute_insert("INSERT INTO goals (title, goal_type) VALUES ('inner', '月计划')")
+                raise RuntimeError("boom")
+
+    titles = [row["title"] for row in db.execute_query("SELECT title FROM goals")]
+    assert titles == ["outer"]
+
+
+def test_call_after_commit_runs_only_after_commit(db):
+    called = []
+    with db.transaction():
+        db.call_after_commit(lambda: called.append("committed"))
+        assert called == []
+    assert called == ["committed"]
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.call_after_commit(lambda: called.append("rolled back"))
+            raise RuntimeError("boom")
+    assert called == ["committed"]
+
+
+def finished_pid():
+    """一个已退出进程的进程号"""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_marker_of_another_running_process_is_left_alone(db_path):
+    DatabaseManager(db_path).close()
+    other_marker = f"{db_path}.running.{os.getppid()}"
+    with open(other_marker, "w") as f:
+        f.write(str(os.getppid()))
+
+    manager = DatabaseManager(db_path)
+    assert "完整性检查" not in manager.startup_timings
+    assert os.path.exists(manager.dirty_marker_path)
+    manager.close()
+    # 只删除自己的标记
+    assert not os.path.exists(manager.dirty_marker_path)
+    assert os.path.exists(other_marker)
+
+
+def test_marker_of_an_exited_process_triggers_check_and_is_removed(db_path):
+    DatabaseManager(db_path).close()
+    stale_marker = f"{db_path}.running.{finished_pid()}"
+    legacy_marker = f"{db_path}.running"
+    for path in (stale_marker, legacy_marker):
+        with open(path, "w") as f:
+            f.write("0")
+
+    manager = DatabaseManager(db_path)
+    assert "完整性检查" in manager.startup_timings
+    assert not os.path.exists(stale_marker)
+    assert not os.path.exists(legacy_marker)
+    manager.close()
+
+
+def corrupt_freelist_count(db_path):
+    """文件头中的空闲页数加一：quick_check 返回错误报告"""
+    with open(db_path, "r+b") as f:
+        f.seek(36)
+        count = struct.unpack(">I", f.read(4))[0]
+        f.seek(36)
+        f.write(struct.pack(">I", count + 1))
+
+
+def corrupt_last_page(db_path):
+    """覆盖最后一页（目标表的数据页）：quick_check 本身出错"""
+    page_size = 4096
+    with open(db_path, "r+b") as f:
+        f.seek(os.path.getsize(db_path) - page_size)
+        f.write(b"\xff" * page_size)
+
+
+@pytest.mark.parametrize("corrupt", [corrupt_freelist_count, corrupt_last_page])
+def test_failed_integrity_check_recreates_the_database(db_path, corrupt):
+    manager = DatabaseManager(db_path)
+    manager.execute_many("INSERT INTO goals (title, goal_type, description) VALUES (?, '月计划', ?)",
+                         [(f"g{i}", "x" * 200) for i in range(2000)])
+    manager.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    manager.close()
+    # 文件头和表结构完好，只有完整性检查能发现
+    corrupt(db_path)
+    with open(f"{db_path}.running.{finished_pid()}", "w") as f:
+        f.write("0")
+
+    manager = DatabaseManager(db_path)
+    try:
+        corrupt_files = [name for name in os.listdir(os.path.dirname(db_path)) if ".corrupt-" in name]
+        assert corrupt_files
+        assert os.path.exists(db_path)
+        assert manager.execute_query("SELECT COUNT(*) AS n FROM goals")[0]["n"] == 0
+        manager.execute_insert("INSERT INTO goals (title, goal_type) VALUES ('新目标', '月计划')")
+        # 写入的是新建的数据库文件，而不是改名后的损坏文件
+        with sqlite3.connect(db_path) as connection:
+            assert connection.execute("SELECT title FROM goals").fetchall() == [("新目标",)]
+    finally:
+        manager.close()
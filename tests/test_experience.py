@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""经验值奖励：原子累加、流水与事务中的失败"""
+
+import pytest
+
+from src.utils import data_manager
+from src.utils.data_manager import DataManager
+from src.utils.experience_manager import add_experience, XP_SOURCE_MANUAL
+from src.utils.level_state import get_level_state, level_for_experience
+from src.utils.config import LEVEL_SYSTEM_CONFIG
+
+
+def current_experience(db):
+    return db.execute_query("SELECT experience FROM basic_info WHERE id = 1")[0]["experience"]
+
+
+def test_add_experience_updates_total_ledger_and_level_state(db):
+    experience, level = add_experience(250, XP_SOURCE_MANUAL)
+    assert current_experience(db) == experience == 250
+    assert get_level_state().snapshot() == (experience, level)
+    events = db.execute_query("SELECT amount, source FROM xp_events")
+    assert events == [{"amount": 250, "source": XP_SOURCE_MANUAL}]
+
+
+def test_failed_award_inside_transaction_rolls_back_the_status_change(db, monkeypatch):
+    goal_id = db.execute_insert("INSERT INTO goals (title, goal_type, status) VALUES ('g', '月计划', '进行中')")
+
+    def broken_add_experience(*args):
+        raise RuntimeError("disk full")
+    monkeypatch.setattr(data_manager, "add_experience", broken_add_experience)
+
+    manager = DataManager(main_system=None)
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.execute_update("UPDATE goals SET status = '已完成' WHERE id = ?", (goal_id,))
+            manager.update_user_experience(1000)
+
+    assert db.execute_query("SELECT status FROM goals WHERE id = ?", (goal_id,))[0]["status"] == "进行中"
+    assert current_experience(db) == 0
+
+
+def test_failed_award_outside_transaction_returns_none(db, monkeypatch):
+    def broken_add_experience(*args):
+        raise RuntimeError("disk full")
+    monkeypatch.setattr(data_manager, "add_experience", broken_add_experience)
+
+    assert DataManager(main_system=None).update_user_experience(10) is None
+
+
+@pytest.mark.parametrize("exp_gain", [250, 5000])
+def test_stored_level_is_clamped_like_level_state(db, monkeypatch, exp_gain):
+    monkeypatch.setitem(LEVEL_SYSTEM_CONFIG, "max_level", 10)
+    experience, level = add_experience(exp_gain, XP_SOURCE_MANUAL)
+    assert level == level_for_experience(experience)
+    assert db.execute_query("SELECT level FROM basic_info WHERE id = 1")[0]["level"] == level
+    assert get_level_state().level == level
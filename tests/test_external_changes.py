@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""其它进程的修改：按数据版本号发现并失效缓存，本进程的修改不重复报告"""
+
+import pytest
+
+from src.utils.database import DatabaseManager
+from src.utils.data_cache import get_data_cache
+from src.utils.event_manager import DataChangeEvent
+from src.utils.las_service import get_las_service
+from src.utils.level_state import get_level_state
+
+
+@pytest.fixture
+def other_process(db, db_path):
+    """同一数据库文件上的另一个数据库管理器（版本号增量单独记录，相当于另一个进程）"""
+    manager = DatabaseManager(db_path)
+    yield manager
+    manager.close()
+
+
+def test_first_check_only_records_versions(db):
+    assert get_data_cache().check_external_changes() == set()
+
+
+def test_own_writes_are_not_reported(db):
+    cache = get_data_cache()
+    cache.check_external_changes()
+    service = get_las_service()
+    goal_id = service.add_goal("读书", "年计划")
+    service.set_goal_status(goal_id, "已完成")
+    task_id = service.add_daily_task("跑步")
+    service.complete_daily_tasks([task_id])
+    db.execute_update("UPDATE goals SET description = 'x' WHERE id = ?", (goal_id,))
+    service.delete_goal(goal_id)
+    service.delete_daily_task(task_id)
+    assert cache.check_external_changes() == set()
+
+
+def test_other_process_writes_are_reported_per_entity(db, other_process):
+    cache = get_data_cache()
+    cache.check_external_changes()
+
+    other_process.execute_insert("INSERT INTO goals (title, goal_type) VALUES ('外部目标', '月计划')")
+    assert cache.check_external_changes() == {"goal_changed"}
+    assert cache.check_external_changes() == set()
+
+    task_id = other_process.execute_insert("INSERT INTO daily_tasks (title) VALUES ('外部任务')")
+    other_process.execute_insert("INSERT INTO task_completions (task_id, completed_on) VALUES (?, '2025-08-01')",
+                                 (task_id,))
+    other_process.execute_update("UPDATE basic_info SET experience = experience + 100 WHERE id = 1")
+    assert cache.check_external_changes() == {"daily_task_changed", "experience_changed"}
+
+
+def test_reported_event_reloads_cache_and_level(db, other_process):
+    cache = get_data_cache()
+    cache.check_external_changes()
+    assert cache.goals.all() == []
+    level_state = get_level_state()
+    level_state.snapshot()
+    notified = []
+    level_state.subscribe(lambda experience, level: notified.append(experience))
+
+    goal_id = other_process.execute_insert("INSERT INTO goals (title, goal_type) VALUES ('外部目标', '月计划')")
+    other_process.execute_update("UPDATE basic_info SET experience = 250 WHERE id = 1")
+    for event_type in cache.check_external_changes():
+        cache.on_data_batch([DataChangeEvent(event_type)])
+    level_state.sync()
+
+    assert [goal.id for goal in cache.goals.all()] == [goal_id]
+    assert notified == [250]
+
+
+def test_rolled_back_transaction_records_nothing(db, other_process):
+    cache = get_data_cache()
+    cache.check_external_changes()
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.execute_insert("INSERT INTO goals (title, goal_type) VALUES ('a', '月计划')")
+            raise RuntimeError
+    other_process.execute_insert("INSERT INTO goals (title, goal_type) VALUES ('b', '月计划')")
+    assert cache.check_external_changes() == {"goal_changed"}
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""业务服务：目标状态切换在同一写事务中读取状态，修改不存在的目标/任务不上报变更"""
+
+from src.utils import las_service
+from src.utils.las_service import LASService
+
+
+def experience(db):
+    return db.execute_query("SELECT experience FROM basic_info WHERE id = 1")[0]["experience"]
+
+
+def test_toggle_goal_reads_the_status_inside_the_transaction(db, monkeypatch):
+    service = LASService()
+    goal_id = service.add_goal("读书", "年计划")
+    in_transaction = []
+    execute_query = las_service.execute_query
+
+    def recording_query(sql, params=None):
+        in_transaction.append(db.connection.in_transaction)
+        return execute_query(sql, params)
+
+    monkeypatch.setattr(las_service, "execute_query", recording_query)
+    before = experience(db)
+    assert service.toggle_goal(goal_id, 50) == ("读书", "已完成", 50)
+    assert in_transaction and all(in_transaction)
+    assert experience(db) == before + 50
+
+    assert service.toggle_goal(goal_id, 50) == ("读书", "进行中", 0)
+    assert experience(db) == before + 50
+    assert service.toggle_goal(999) is None
+
+
+def test_updating_a_missing_row_returns_false_without_notifying(db):
+    events = []
+    service = LASService(notify=lambda event_type, **kwargs: events.append(event_type))
+    assert service.update_goal(999, "读书", "年计划", "", "进行中", "中") is False
+    assert service.update_daily_task(999, "跑步", "", "已完成", "高") is False
+    assert events == []
+    assert db.execute_query("SELECT COUNT(*) AS n FROM task_completions")[0]["n"] == 0
+
+    goal_id = service.add_goal("读书", "年计划")
+    changes = service.update_goal(goal_id, "读书", "年计划", "每天一章", "进行中", "中")
+    assert changes["description"] == "每天一章"
+    assert events == ["goal_added", "goal_edited"]
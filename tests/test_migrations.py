@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""结构迁移：全新数据库、从旧版本升级与重复执行"""
+
+import sqlite3
+
+from src.utils import config, migrations
+from src.utils.database import DatabaseManager
+from src.utils.search_manager import SearchManager
+from src.utils.migrations import LATEST_VERSION, MIGRATIONS, V1_INDEXES, V1_TABLES, get_schema_version, run_migrations
+
+
+def object_names(connection, object_type):
+    return {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = ?", (object_type,))}
+
+
+def make_old_database(db_path, version):
+    """只执行到指定版本的旧数据库"""
+    connection = sqlite3.connect(db_path)
+    for migration_version, _, migrate in MIGRATIONS:
+        if migration_version > version:
+            break
+        migrate(connection)
+    connection.execute(f"PRAGMA user_version = {version}")
+    connection.commit()
+    return connection
+
+
+def test_fresh_database_is_at_latest_version(db):
+    assert get_schema_version(db.connection) == LATEST_VERSION
+    tables = object_names(db.connection, "table")
+    assert set(V1_TABLES) <= tables
+    assert {"task_completions", "app_state", "summaries", "data_versions"} <= tables
+    assert "completed_at" in {row[1] for row in db.connection.execute("PRAGMA table_info(daily_tasks)")}
+
+
+def test_refresh_indexes_are_created(db):
+    indexes = object_names(db.connection, "index")
+    assert {"idx_goals_created", "idx_daily_tasks_created",
+            "idx_goals_active_type_priority", "idx_daily_tasks_active_created"} <= indexes
+
+
+def test_rerunning_migrations_is_a_no_op(db):
+    schema_sql = "SELECT type, name, sql FROM sqlite_master ORDER BY type, name"
+    schema = [tuple(row) for row in db.connection.execute(schema_sql)]
+    assert run_migrations(db) == 0
+    assert [tuple(row) for row in db.connection.execute(schema_sql)] == schema
+
+
+def test_upgrade_from_v1_keeps_data_and_backfills_completions(db_path):
+    connection = make_old_database(db_path, 1)
+    connection.execute(
+        "INSERT INTO daily_tasks (title, status, experience_reward, created_at, updated_at) "
+        "VALUES ('跑步', '已完成', 20, '2025-08-01 07:00:00', '2025-08-01 07:30:00')"
+    )
+    connection.execute("INSERT INTO goals (title, goal_type, created_at) VALUES ('读书', '年计划', '2025-08-01 08:00:00')")
+    connection.commit()
+    connection.close()
+
+    manager = DatabaseManager(db_path)
+    try:
+        assert get_schema_version(manager.connection) == LATEST_VERSION
+        assert manager.execute_query("SELECT title FROM goals") == [{"title": "读书"}]
+        completions = manager.execute_query("SELECT task_id, completed_on, experience FROM task_completions")
+        assert completions == [{"task_id": 1, "completed_on": "2025-08-01", "experience": 20}]
+        # 升级后新增的触发器正常工作
+        (before,) = manager.get_data_versions(["goal"])
+        manager.execute_insert("INSERT INTO goals (title, goal_type) VALUES ('写作', '月计划')")
+        assert manager.get_data_versions(["goal"]) == (before + 1,)
+    finally:
+        manager.close()
+
+
+def test_missing_search_index_is_built_at_startup(db_path, monkeypatch):
+    # 执行 v5 时不支持 FTS5 trigram，没有创建全文索引
+    monkeypatch.setattr(migrations, "fts5_trigram_available", lambda connection: False)
+    connection = make_old_database(db_path, LATEST_VERSION)
+    connection.execute("INSERT INTO goals (title, goal_type, description) VALUES ('读书计划', '年计划', '每天一章')")
+    connection.commit()
+    connection.close()
+    monkeypatch.undo()
+
+    manager = DatabaseManager(db_path)
+    try:
+        assert "search_index" in object_names(manager.connection, "table")
+        results = SearchManager(manager).search("读书计")
+        assert [(result["entity"], result["title"]) for result in results] == [("goal", "读书计划")]
+        # 之后的写入由触发器维护
+        manager.execute_insert("INSERT INTO goals (title, goal_type) VALUES ('跑步计划', '月计划')")
+        assert len(SearchManager(manager).search("计划")) == 2
+    finally:
+        manager.close()
+
+
+def normalize_sql(sql):
+    """去掉 IF NOT EXISTS（sqlite_master 中不保存）并合并空白"""
+    return " ".join(sql.replace("IF NOT EXISTS ", "").split())
+
+
+def test_v1_does_not_depend_on_config(db_path, monkeypatch):
+    # 修改配置不影响已发布迁移创建的结构
+    monkeypatch.setattr(config, "DATABASE_TABLES", {"goals": "CREATE TABLE goals (id INTEGER)"}, raising=False)
+    monkeypatch.setitem(config.GOAL_CONFIG, "default_status", "已暂停")
+    monkeypatch.setitem(config.GOAL_CONFIG, "priority_levels", ["紧急"])
+    monkeypatch.setitem(config.DAILY_TASK_CONFIG, "default_status", "已完成")
+    monkeypatch.setitem(config.DAILY_TASK_CONFIG, "experience_reward", [99])
+
+    connection = make_old_database(db_path, 1)
+    schema = {name: normalize_sql(sql) for name, sql in connection.execute(
+        "SELECT name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'")}
+    connection.close()
+    frozen = {name: normalize_sql(sql) for name, sql in {**V1_TABLES, **V1_INDEXES}.items()}
+    assert schema == frozen
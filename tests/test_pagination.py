@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""键集分页：按 (created_at, id) 倒序，created_at 为空的行排在最后"""
+
+import pytest
+
+from src.utils.database import fetch_page_by_created, fetch_rows_by_ids
+from src.utils.completion_manager import DAILY_TASKS_WITH_STATUS_SQL, day_key
+
+
+@pytest.fixture
+def goals(db):
+    # 相同的 created_at、空的 created_at 混在一起
+    created = ["2025-01-02 00:00:00", None, "2025-01-01 00:00:00", "2025-01-02 00:00:00", None,
+               "2025-01-03 00:00:00", "2025-01-01 00:00:00"]
+    db.execute_many("INSERT INTO goals (title, goal_type, created_at) VALUES (?, '月计划', ?)",
+                    [(f"g{i}", value) for i, value in enumerate(created, 1)])
+    return created
+
+
+def expected_order(created):
+    with_time = sorted(((value, row_id) for row_id, value in enumerate(created, 1) if value), reverse=True)
+    without_time = sorted((row_id for row_id, value in enumerate(created, 1) if value is None), reverse=True)
+    return [row_id for _, row_id in with_time] + without_time
+
+
+def read_all(limit, **kwargs):
+    ids, after_key = [], None
+    while True:
+        page = fetch_page_by_created("goals", after_key, limit, **kwargs)
+        ids.extend(row["id"] for row in page)
+        if len(page) < limit:
+            return ids
+        after_key = (page[-1]["created_at"], page[-1]["id"])
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 50])
+def test_pages_cover_every_row_once_in_order(goals, limit):
+    assert read_all(limit) == expected_order(goals)
+
+
+def test_rows_without_created_at_come_last_and_page_by_id(goals):
+    first = fetch_page_by_created("goals", None, 5)
+    assert [row["created_at"] for row in first][-1] is not None
+    rest = fetch_page_by_created("goals", (first[-1]["created_at"], first[-1]["id"]), 1)
+    assert rest[0]["created_at"] is None
+    last = fetch_page_by_created("goals", (None, rest[0]["id"]), 10)
+    assert [row["id"] for row in last] == [2]
+
+
+def test_rows_inserted_before_the_cursor_do_not_shift_later_pages(db, goals):
+    first = fetch_page_by_created("goals", None, 3)
+    db.execute_insert("INSERT INTO goals (title, goal_type, created_at) VALUES ('new', '月计划', '2025-02-01 00:00:00')")
+    second = fetch_page_by_created("goals", (first[-1]["created_at"], first[-1]["id"]), 3)
+    ids = [row["id"] for row in first + second]
+    assert ids == expected_order(goals)[:6]
+
+
+def test_custom_select_with_table_alias(db):
+    for i in range(5):
+        db.execute_insert("INSERT INTO daily_tasks (title, created_at) VALUES (?, ?)",
+                          (f"t{i}", f"2025-01-0{i + 1} 00:00:00"))
+    db.execute_insert("INSERT INTO task_completions (task_id, completed_on) VALUES (5, ?)", (day_key(),))
+
+    options = dict(select_sql=DAILY_TASKS_WITH_STATUS_SQL, params=(day_key(),),
+                   id_column="t.id", created_column="t.created_at")
+    page = fetch_page_by_created("daily_tasks", None, 2, **options)
+    assert [(row["id"], row["status"]) for row in page] == [(5, "已完成"), (4, "未完成")]
+    page = fetch_page_by_created("daily_tasks", (page[-1]["created_at"], page[-1]["id"]), 10, **options)
+    assert [row["id"] for row in page] == [3, 2, 1]
+
+    rows = fetch_rows_by_ids("daily_tasks", [5, 99], DAILY_TASKS_WITH_STATUS_SQL, (day_key(),), "t.id")
+    assert [(row["id"], row["status"]) for row in rows] == [(5, "已完成")]
+
+
+def test_first_page_uses_the_created_index(db):
+    plan = " ".join(row[3] for row in db.connection.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM goals WHERE created_at IS NOT NULL "
+        "ORDER BY created_at DESC, id DESC LIMIT 10"))
+    assert "idx_goals_created" in plan
+    assert "TEMP B-TREE" not in plan
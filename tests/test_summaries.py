@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""总结保存与md文件生成：保存只插入一行并标记年份，md文件每年统一生成一次"""
+
+import os
+
+import pytest
+
+from src.utils.las_service import get_las_service
+from src.utils.summary_store import get_summary_store
+
+
+def read_markdown(year):
+    with open(get_summary_store().markdown_path(year), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_saving_does_not_write_the_markdown_file(db):
+    service = get_las_service()
+    service.add_summary("2025.08.01", "第一天")
+    service.add_summary("2025.08.02", "第二天")
+    assert not os.path.exists(get_summary_store().markdown_path("2025"))
+    assert get_summary_store().dirty_years() == ["2025"]
+
+
+def test_duplicate_summary_is_ignored(db):
+    service = get_las_service()
+    assert service.add_summary("2025.08.01", "同一天") is not None
+    assert service.add_summary("2025.08.01", "同一天") is None
+
+
+def test_render_dirty_writes_each_year_once(db, monkeypatch):
+    service = get_las_service()
+    service.add_summary("2024.12.31", "去年")
+    service.add_summary("2025.08.01", "第一天")
+    service.add_summary("2025.08.02", "第二天")
+
+    store = get_summary_store()
+    rendered = []
+    render_year = store.render_year
+    monkeypatch.setattr(store, "render_year", lambda year: rendered.append(year) or render_year(year))
+    store.render_dirty()
+
+    assert rendered == ["2024", "2025"]
+    assert read_markdown("2025") == "2025-08-02\n第二天\n\n\n\n2025-08-01\n第一天\n\n\n\n"
+    assert store.dirty_years() == []
+    assert store.render_dirty() == []
+
+
+def test_failed_render_keeps_the_year_dirty(db, monkeypatch):
+    get_las_service().add_summary("2025.08.01", "第一天")
+    store = get_summary_store()
+    monkeypatch.setattr(store, "iter_year", lambda year: iter([{}]))
+    with pytest.raises(KeyError):
+        store.render_dirty()
+    assert store.dirty_years() == ["2025"]
+    assert not os.path.exists(store.markdown_path("2025"))
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""旧总结文件导入：按检查点跳过未变的文件，追加的内容从偏移处继续，其它改动重新解析"""
+
+import os
+
+import pytest
+
+from src.utils.summary_importer import SummaryImporter
+from src.utils.summary_store import format_entry, get_summary_store
+
+
+def write_entries(path, entries, mode='w'):
+    with open(path, mode, encoding='utf-8') as f:
+        for summary_date, content in entries:
+            f.write(format_entry(summary_date, content))
+
+
+def summary_rows(db):
+    return [(row["summary_date"], row["content"]) for row in db.execute_query(
+        "SELECT summary_date, content FROM summaries ORDER BY summary_date, id")]
+
+
+@pytest.fixture
+def legacy_file(db, tmp_path):
+    path = str(tmp_path / "2025.md")
+    write_entries(path, [("2025-08-03", "第三天\n\n两段内容"), ("2025-08-02", "第二天"), ("2025-08-01", "第一天")])
+    return path
+
+
+def test_entries_are_parsed_with_dates_and_blank_lines_inside(db, legacy_file):
+    assert SummaryImporter().import_file(legacy_file, 2025) == (3, 3)
+    assert summary_rows(db) == [("2025-08-01", "第一天"), ("2025-08-02", "第二天"), ("2025-08-03", "第三天\n\n两段内容")]
+
+
+def test_unchanged_file_is_skipped(db, legacy_file):
+    importer = SummaryImporter()
+    importer.import_file(legacy_file, 2025)
+    assert importer.import_file(legacy_file, 2025) == (0, 0)
+    assert len(summary_rows(db)) == 3
+
+
+def test_appended_entry_resumes_from_the_last_entry(db, legacy_file):
+    importer = SummaryImporter()
+    importer.import_file(legacy_file, 2025)
+    write_entries(legacy_file, [("2025-07-31", "追加的条目")], mode='a')
+    # 只重新解析最后一个已导入的条目和追加的条目
+    assert importer.import_file(legacy_file, 2025) == (2, 1)
+    assert ("2025-07-31", "追加的条目") in summary_rows(db)
+
+
+def test_changed_prefix_reparses_the_whole_file(db, legacy_file):
+    importer = SummaryImporter()
+    importer.import_file(legacy_file, 2025)
+    with open(legacy_file, encoding='utf-8') as f:
+        old_content = f.read()
+    write_entries(legacy_file, [("2025-08-04", "插在开头")])
+    with open(legacy_file, 'a', encoding='utf-8') as f:
+        f.write(old_content)
+    assert importer.import_file(legacy_file, 2025) == (4, 1)
+    assert len(summary_rows(db)) == 4
+
+
+def test_interrupted_import_resumes_from_the_last_batch(db, tmp_path, monkeypatch):
+    path = str(tmp_path / "2024.md")
+    write_entries(path, [(f"2024-01-{day:02d}", f"第{day}天") for day in range(6, 0, -1)])
+    importer = SummaryImporter(batch_size=2)
+    save_batch = importer._save_batch
+    calls = []
+
+    def failing_save_batch(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError("中断")
+        return save_batch(*args)
+
+    monkeypatch.setattr(importer, "_save_batch", failing_save_batch)
+    with pytest.raises(RuntimeError):
+        importer.import_file(path, 2024)
+    assert len(summary_rows(db)) == 2
+
+    monkeypatch.setattr(importer, "_save_batch", save_batch)
+    parsed, inserted = importer.import_file(path, 2024)
+    assert (parsed, inserted) == (4, 4)
+    assert summary_rows(db) == [(f"2024-01-{day:02d}", f"第{day}天") for day in range(1, 7)]
+
+
+def test_import_all_keeps_legacy_file_and_regenerates_markdown(db, legacy_file):
+    report = SummaryImporter().import_all()
+    assert (report["inserted"], report["years"]) == (3, ["2025"])
+    store = get_summary_store()
+    assert os.path.exists(store.legacy_path("2025"))
+    with open(store.markdown_path("2025"), encoding='utf-8') as f:
+        # 旧内容已导入数据库，生成的文件不再附加 legacy 文件
+        assert f.read().count("第一天") == 1
+
+    # 生成的 2025.md 不再被当作旧内容导入
+    assert SummaryImporter().import_all()["inserted"] == 0
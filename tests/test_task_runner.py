@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""后台任务执行器：回调回到Tk线程，只在队列由空变为非空时排定处理，不轮询"""
+
+import threading
+
+from src.utils.task_runner import BackgroundRunner
+
+
+class FakeRoot:
+    """记录 after_idle 调用的Tk根窗口替身，由测试手动执行空闲回调"""
+
+    def __init__(self):
+        self.idle = []
+        self.scheduling_threads = []
+
+    def after_idle(self, callback):
+        self.idle.append(callback)
+        self.scheduling_threads.append(threading.current_thread())
+
+    def run_idle(self):
+        idle, self.idle = self.idle, []
+        for callback in idle:
+            callback()
+
+
+def in_worker(func):
+    thread = threading.Thread(target=func)
+    thread.start()
+    thread.join()
+
+
+def test_without_root_callbacks_run_immediately():
+    runner = BackgroundRunner()
+    calls = []
+    runner.call_in_ui(calls.append, 1)
+    assert calls == [1]
+    runner.shutdown()
+
+
+def test_idle_runner_schedules_nothing():
+    root = FakeRoot()
+    runner = BackgroundRunner(root)
+    runner.start()
+    assert len(root.idle) == 1
+    root.run_idle()
+    # 队列为空时不再排定下一次处理
+    assert root.idle == []
+    runner.shutdown()
+
+
+def test_callbacks_before_first_drain_do_not_touch_tk_from_workers():
+    root = FakeRoot()
+    runner = BackgroundRunner(root)
+    runner.start()
+    calls = []
+    in_worker(lambda: [runner.call_in_ui(calls.append, n) for n in range(3)])
+    assert calls == []
+    assert root.scheduling_threads == [threading.current_thread()]
+    root.run_idle()
+    assert calls == [0, 1, 2]
+    runner.shutdown()
+
+
+def test_one_drain_is_scheduled_per_empty_to_non_empty_transition():
+    root = FakeRoot()
+    runner = BackgroundRunner(root)
+    runner.start()
+    root.run_idle()
+
+    calls = []
+    in_worker(lambda: [runner.call_in_ui(calls.append, n) for n in range(5)])
+    assert len(root.idle) == 1
+    root.run_idle()
+    assert calls == [0, 1, 2, 3, 4]
+    assert root.idle == []
+
+    in_worker(lambda: runner.call_in_ui(calls.append, 5))
+    assert len(root.idle) == 1
+    root.run_idle()
+    assert calls[-1] == 5
+    runner.shutdown()
+
+
+def test_submit_delivers_results_on_the_ui_thread():
+    root = FakeRoot()
+    runner = BackgroundRunner(root)
+    runner.start()
+    root.run_idle()
+
+    results = []
+    future = runner.submit(lambda: 42, on_success=lambda value: results.append((value, threading.current_thread())))
+    future.result()
+    runner.executor.shutdown(wait=True)
+    root.run_idle()
+    assert results == [(42, threading.current_thread())]
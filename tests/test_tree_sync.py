@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""Treeview 增量同步：按行ID只产生必要的插入、更新、移动和删除"""
+
+from src.gui.tree_sync import TreeviewSync
+
+
+class FakeTree:
+    """记录调用的 ttk.Treeview 替身（只实现 TreeviewSync 用到的方法）"""
+
+    def __init__(self):
+        self.children = []
+        self.items = {}
+        self.calls = []
+
+    def get_children(self):
+        return tuple(self.children)
+
+    def exists(self, iid):
+        return iid in self.items
+
+    def insert(self, parent, index, iid, values, tags):
+        self.calls.append(("insert", iid))
+        self.children.insert(index, iid)
+        self.items[iid] = (values, tags)
+
+    def item(self, iid, values, tags):
+        self.calls.append(("item", iid))
+        self.items[iid] = (values, tags)
+
+    def move(self, iid, parent, index):
+        self.calls.append(("move", iid))
+        self.children.remove(iid)
+        self.children.insert(index, iid)
+
+    def delete(self, *iids):
+        self.calls.append(("delete",) + iids)
+        for iid in iids:
+            self.children.remove(iid)
+            del self.items[iid]
+
+
+def rows(*specs):
+    return [(row_id, (title,), (row_id,)) for row_id, title in specs]
+
+
+def synced(specs):
+    tree = FakeTree()
+    sync = TreeviewSync(tree)
+    sync.sync(rows(*specs))
+    tree.calls.clear()
+    return tree, sync
+
+
+def test_first_sync_inserts_rows_in_order():
+    tree = FakeTree()
+    assert TreeviewSync(tree).sync(rows((3, "c"), (1, "a"), (2, "b"))) == (3, 0, 0, 0)
+    assert tree.children == ["3", "1", "2"]
+
+
+def test_unchanged_rows_make_no_tree_calls():
+    tree, sync = synced([(1, "a"), (2, "b")])
+    assert sync.sync(rows((1, "a"), (2, "b"))) == (0, 0, 0, 0)
+    assert tree.calls == []
+
+
+def test_changed_row_is_updated_in_place():
+    tree, sync = synced([(1, "a"), (2, "b")])
+    assert sync.sync(rows((1, "a"), (2, "B"))) == (0, 1, 0, 0)
+    assert tree.calls == [("item", "2")]
+    assert tree.items["2"][0] == ("B",)
+
+
+def test_reorder_moves_without_recreating_rows():
+    tree, sync = synced([(1, "a"), (2, "b"), (3, "c")])
+    inserted, updated, moved, deleted = sync.sync(rows((3, "c"), (1, "a"), (2, "b")))
+    assert (inserted, updated, deleted) == (0, 0, 0)
+    assert moved >= 1
+    assert tree.children == ["3", "1", "2"]
+    assert all(call[0] == "move" for call in tree.calls)
+
+
+def test_only_out_of_place_rows_are_moved():
+    specs = [(row_id, str(row_id)) for row_id in range(1, 101)]
+    tree, sync = synced(specs)
+    # 第一行移到最后：其余99行保持相对顺序，只移动一行
+    assert sync.sync(rows(*(specs[1:] + specs[:1]))) == (0, 0, 1, 0)
+    assert tree.calls == [("move", "1")]
+    assert tree.children == [str(row_id) for row_id in range(2, 101)] + ["1"]
+
+    # 交换两行并在中间插入新行
+    tree.calls.clear()
+    reordered = specs[1:] + specs[:1]
+    reordered[10], reordered[20] = reordered[20], reordered[10]
+    reordered.insert(50, (500, "new"))
+    inserted, updated, moved, deleted = sync.sync(rows(*reordered))
+    assert (inserted, updated, moved, deleted) == (1, 0, 2, 0)
+    assert tree.children == [str(row_id) for row_id, _ in reordered]
+
+
+def test_removed_rows_are_deleted_in_one_call_and_new_rows_inserted():
+    tree, sync = synced([(1, "a"), (2, "b"), (3, "c")])
+    assert sync.sync(rows((1, "a"), (4, "d"), (3, "c"))) == (1, 0, 0, 1)
+    assert tree.children == ["1", "4", "3"]
+    assert tree.calls[0] == ("delete", "2")
+
+
+def test_duplicate_ids_keep_the_first_row():
+    tree = FakeTree()
+    TreeviewSync(tree).sync(rows((1, "a"), (1, "again")))
+    assert tree.children == ["1"]
+    assert tree.items["1"][0] == ("a",)
+
+
+def test_rows_deleted_outside_the_sync_are_reinserted():
+    tree, sync = synced([(1, "a"), (2, "b")])
+    tree.delete("2")
+    tree.calls.clear()
+    assert sync.sync(rows((1, "a"), (2, "b"))) == (1, 0, 0, 0)
+    assert tree.children == ["1", "2"]
+
+
+def test_patch_updates_only_given_rows_and_reports_missing():
+    tree, sync = synced([(1, "a"), (2, "b"), (3, "c")])
+    missing = sync.patch(rows((2, "B"), (9, "new")), removed_ids=[3])
+    assert missing == [9]
+    assert tree.children == ["1", "2"]
+    assert tree.items["2"][0] == ("B",)
+    assert ("item", "1") not in tree.calls
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""业务服务的取值校验：目标类型、状态、优先级必须是配置中的选项，无效时不写入数据库"""
+
+from http import HTTPStatus
+
+import pytest
+
+from src.utils.api_server import ApiServer
+from src.utils.las_service import get_las_service
+
+
+def count_rows(db, table_name):
+    return db.execute_query(f"SELECT COUNT(*) AS n FROM {table_name}")[0]["n"]
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"goal_type": "不存在"},
+    {"goal_type": "月计划", "priority": "紧急"},
+])
+def test_add_goal_rejects_unknown_choices(db, kwargs):
+    with pytest.raises(ValueError):
+        get_las_service().add_goal("读书", **kwargs)
+    assert count_rows(db, "goals") == 0
+
+
+def test_add_goal_defaults_priority(db):
+    goal_id = get_las_service().add_goal("读书", "年计划")
+    assert db.execute_query("SELECT priority FROM goals WHERE id = ?", (goal_id,))[0]["priority"] == "中"
+
+
+@pytest.mark.parametrize("field, value", [("goal_type", "周计划"), ("status", "废弃"), ("priority", "")])
+def test_update_goal_rejects_unknown_choices(db, field, value):
+    service = get_las_service()
+    goal_id = service.add_goal("读书", "年计划")
+    edited = dict(title="读书", goal_type="年计划", description="", status="进行中", priority="中")
+    edited[field] = value
+    with pytest.raises(ValueError):
+        service.update_goal(goal_id, **edited)
+    row = db.execute_query("SELECT goal_type, status, priority FROM goals WHERE id = ?", (goal_id,))[0]
+    assert row == {"goal_type": "年计划", "status": "进行中", "priority": "中"}
+
+
+def test_set_goal_status_rejects_unknown_status(db):
+    service = get_las_service()
+    goal_id = service.add_goal("读书", "年计划")
+    with pytest.raises(ValueError):
+        service.set_goal_status(goal_id, "废弃")
+
+
+def test_daily_task_priority_and_status_are_checked(db):
+    service = get_las_service()
+    with pytest.raises(ValueError):
+        service.add_daily_task("跑步", priority="紧急")
+    assert count_rows(db, "daily_tasks") == 0
+
+    task_id = service.add_daily_task("跑步", priority="高")
+    with pytest.raises(ValueError):
+        service.update_daily_task(task_id, "跑步", "", "进行中", "高")
+    with pytest.raises(ValueError):
+        service.update_daily_task(task_id, "跑步", "", "未完成", "紧急")
+
+
+def test_api_returns_400_for_unknown_goal_type(db):
+    server = ApiServer(service=get_las_service(), token="")
+    try:
+        status, payload, _ = server.dispatch("POST", "/api/goals", {"title": "读书", "goal_type": "不存在"})
+        assert status == HTTPStatus.BAD_REQUEST
+        assert "goal_type" in payload["error"]
+        status, _, _ = server.dispatch("POST", "/api/tasks", {"title": "跑步", "priority": "紧急"})
+        assert status == HTTPStatus.BAD_REQUEST
+    finally:
+        server.executor.shutdown()
+    assert count_rows(db, "goals") == count_rows(db, "daily_tasks") == 0